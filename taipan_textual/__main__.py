@@ -2,12 +2,86 @@
 Main entry point for the Taipan game.
 """
 
+from typing import List, Optional
+import argparse
+import os
+import sys
+
 from .game_ui import TaipanApp
+from .game_state import ObservableGameState
+from .journal import Journal, record_state
+from .monitor import DEFAULT_STALL_MS, monitor
+from .profiling import profiler
+from .save import Autosaver, load_game
+from .settings import ANIMATION_SPEEDS, DEBUG, DEFAULT_ANIMATION_SPEED, LOG_LEVEL, configure_logging
 
-def main():
+def main(argv: Optional[List[str]] = None):
     """Run the Taipan game."""
-    app = TaipanApp()
-    app.run()
+    parser = argparse.ArgumentParser(prog="python -m taipan_textual", description="Play Taipan.")
+    parser.add_argument("--speed", choices=list(ANIMATION_SPEEDS), default=DEFAULT_ANIMATION_SPEED,
+                        help="battle animation speed, can be changed in game with F2 (default: normal)")
+    parser.add_argument("--seed", type=int, help="seed for the game's random numbers, to replay a game")
+    parser.add_argument("--journal", metavar="PATH", help="append a record of every game action to this file")
+    parser.add_argument("--save", metavar="PATH",
+                        help="resume the game saved in this file, if any, and save to it on every arrival in port")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="time screen handlers and rules, and write a Chrome trace to this file on exit")
+    parser.add_argument("--monitor", metavar="PATH",
+                        help="watch event loop lag, frame times and stalls, and write their histograms to this file on exit")
+    parser.add_argument("--stall-ms", type=float, default=DEFAULT_STALL_MS, metavar="MS",
+                        help=f"report code that blocks the event loop for longer than this (default: {DEFAULT_STALL_MS:g})")
+    parser.add_argument("--odds", metavar="PATH",
+                        help="recommend battle orders from this table, built with python -m taipan_textual.battle_odds")
+    args = parser.parse_args(argv)
+    
+    try:
+        configure_logging(LOG_LEVEL)
+    except ValueError as error:
+        parser.error(str(error))
+    if args.trace or DEBUG:
+        profiler.enable()
+    if args.monitor or DEBUG:
+        monitor.enable(args.stall_ms)
+    
+    game_state = None
+    if args.save and os.path.exists(args.save):
+        try:
+            game_state = load_game(args.save, ObservableGameState)
+        except ValueError as error:
+            parser.error(str(error))
+    
+    battle_odds = None
+    if args.odds:
+        try:
+            from .battle_odds import BattleOdds
+            battle_odds = BattleOdds(args.odds)
+        except (ImportError, OSError, ValueError) as error:
+            parser.error(str(error))
+    
+    journal = Journal(args.journal) if args.journal else None
+    autosaver = Autosaver(args.save) if args.save else None
+    app: Optional[TaipanApp] = None
+    try:
+        app = TaipanApp(seed=args.seed, animation_speed=args.speed, journal=journal,
+                        game_state=game_state, autosaver=autosaver, battle_odds=battle_odds)
+        app.run()
+    finally:
+        if autosaver is not None:
+            if app is not None and (autosaver.snapshots or app.resumed):
+                autosaver.save(app.game_state)  # Keep what was done since the last port
+            autosaver.close()
+            error = autosaver.take_error()
+            if error is not None:
+                print(f"The game could not be saved to {args.save}: {error}", file=sys.stderr)
+        if journal is not None:
+            if app is not None and journal.entries:
+                record_state(app.game_state)  # The final state, for replays to check
+            journal.close()
+        if args.trace:
+            profiler.write_chrome_trace(args.trace)
+        monitor.stop()
+        if args.monitor:
+            monitor.write_json(args.monitor)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,213 @@
+"""
+Precomputed battle odds for Taipan.
+
+Plays battles from every bucket of fleet size, guns, damage, enemy
+strength, ship capacity and battle type with each standing order, across
+worker processes, and stores the survival rate, damage taken and booty
+won in a memory-mapped array:
+
+    python -m taipan_textual.battle_odds battle_odds.npy --trials 64
+    python -m taipan_textual --odds battle_odds.npy
+
+The battle screen then looks up the odds of the battle it shows and
+recommends an order, without simulating anything while the game runs.
+NumPy is an optional dependency (the ``sim`` extra).
+"""
+
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import List, Optional, Sequence, Tuple
+import argparse
+import os
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError as error:  # pragma: no cover - depends on the environment
+    raise ImportError("Battle odds need NumPy, install the 'sim' extra: pip install taipan-textual[sim]") from error
+
+from .game_state import BATTLE_LOST, BATTLE_NOT_FINISHED, BATTLE_WON, GameState
+from .rng import GameRandom
+from .engine import FIGHT, GENERIC, LI_YUEN, RUN, Battle
+
+# Buckets of each dimension, by their lowest value. A cell is simulated
+# at the lowest value of its range, and a battle is looked up in the
+# bucket its value falls in.
+BATTLE_TYPES = (GENERIC, LI_YUEN)
+SHIPS = (1, 2, 3, 5, 8, 13, 25, 50, 100, 200, 400, 800, 1600, 3200, 6400)  # Up to MAX_SHIPS
+GUNS = (0, 1, 2, 4, 7, 12, 20)
+DAMAGE = (0.0, 0.2, 0.4, 0.6, 0.8)  # Fraction of capacity
+YEARS = (0, 1, 2, 4, 7)  # Years since 1860, which set the enemy's health and damage
+CAPACITY = (10, 50, 100, 200)
+
+# Orders with a table entry. Throwing cargo is not a rule of the engine yet.
+ORDERS = (FIGHT, RUN)
+
+# Statistics per order
+SURVIVAL = 0  # Fraction of battles not lost
+DAMAGE_TAKEN = 1  # Mean damage taken
+BOOTY = 2  # Mean booty won
+
+SHAPE = (len(BATTLE_TYPES), len(SHIPS), len(GUNS), len(DAMAGE), len(YEARS), len(CAPACITY), len(ORDERS), 3)
+CELLS = int(np.prod(SHAPE[:-2]))
+
+DEFAULT_TRIALS = 64
+
+# Rounds after which a battle that has not ended counts as lost
+MAX_ROUNDS = 1000
+
+
+def _bucket(values: Sequence[float], value: float) -> int:
+    return max(0, bisect_right(values, value) - 1)
+
+
+def _cell_state(cell: int) -> Tuple[int, int, int, float, int, int]:
+    """The battle type, ships, guns, damage fraction, years and capacity a cell is simulated at."""
+    index = np.unravel_index(cell, SHAPE[:-2])
+    return (
+        BATTLE_TYPES[index[0]],
+        SHIPS[index[1]],
+        GUNS[index[2]],
+        DAMAGE[index[3]],
+        YEARS[index[4]],
+        CAPACITY[index[5]],
+    )
+
+
+def simulate_cell(cell: int, trials: int, seed: int = 0) -> np.ndarray:
+    """
+    Play a cell's battles with each standing order.
+
+    Every trial plays the whole battle with the same order each round.
+    Trial seeds depend only on the cell, the trial and ``seed``, so a
+    table is the same however the cells are shared between workers. The
+    orders are played with the same seed in each trial, so they meet the
+    same fleets and the difference between them is less noisy.
+
+    Returns:
+        An array of shape (len(ORDERS), 3) with the statistics
+    """
+    battle_type, ships, guns, damage, years, capacity = _cell_state(cell)
+    stats = np.zeros((len(ORDERS), 3))
+    for o, order in enumerate(ORDERS):
+        for trial in range(trials):
+            game_state = GameState(
+                rng=GameRandom((seed * CELLS + cell) * trials + trial),
+                guns=guns,
+                capacity=capacity,
+                damage=int(damage * capacity),
+                year=1860 + years,
+                enemy_health=20.0 + 10 * years,
+                enemy_damage=0.5 + 0.5 * years,
+            )
+            battle = Battle(game_state, ships, battle_type)
+            for _ in range(MAX_ROUNDS):
+                battle.fill_slots()
+                if order == FIGHT:
+                    battle.fight()
+                else:
+                    battle.run()
+                battle.end_round()
+                if battle.finished:
+                    break
+            stats[o, SURVIVAL] += battle.result not in (BATTLE_LOST, BATTLE_NOT_FINISHED)
+            stats[o, DAMAGE_TAKEN] += game_state.damage - int(damage * capacity)
+            stats[o, BOOTY] += battle.booty if battle.result == BATTLE_WON else 0
+    return stats / trials
+
+
+def _simulate_cells(cells: range, trials: int, seed: int) -> Tuple[range, np.ndarray]:
+    return cells, np.stack([simulate_cell(cell, trials, seed) for cell in cells])
+
+
+def build_table(path: str, trials: int = DEFAULT_TRIALS, workers: int = 1, seed: int = 0) -> None:
+    """
+    Simulate every cell and write the table to a .npy file.
+
+    Cells are handed to the workers in contiguous chunks and written into
+    the memory-mapped file as they finish.
+    """
+    table = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=SHAPE)
+    flat = table.reshape(CELLS, len(ORDERS), 3)
+    chunksize = max(1, CELLS // (max(1, workers) * 16))
+    chunks = [range(start, min(start + chunksize, CELLS)) for start in range(0, CELLS, chunksize)]
+    simulate = partial(_simulate_cells, trials=trials, seed=seed)
+    if workers <= 1:
+        for cells, stats in map(simulate, chunks):
+            flat[cells.start:cells.stop] = stats
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for cells, stats in executor.map(simulate, chunks):
+                flat[cells.start:cells.stop] = stats
+    table.flush()
+    del table
+
+
+@dataclass(frozen=True)
+class Odds:
+    """Expected outcome of keeping to one order for the rest of a battle."""
+
+    order: int
+    survival: float
+    damage: float
+    booty: float
+
+
+class BattleOdds:
+    """A battle odds table, memory-mapped from disk."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.table = np.load(path, mmap_mode="r")
+        if self.table.shape != SHAPE:
+            raise ValueError(f"{path} is a battle odds table of shape {self.table.shape}, expected {SHAPE}")
+
+    def lookup(self, battle: Battle) -> List[Odds]:
+        """The odds of each order in the bucket a battle falls in."""
+        game_state = battle.game_state
+        capacity = max(1, game_state.capacity)
+        index = (
+            BATTLE_TYPES.index(battle.battle_type),
+            _bucket(SHIPS, battle.num_ships),
+            _bucket(GUNS, game_state.guns),
+            _bucket(DAMAGE, game_state.damage / capacity),
+            _bucket(YEARS, game_state.year - 1860),
+            _bucket(CAPACITY, capacity),
+        )
+        stats = self.table[index]
+        return [Odds(order, *map(float, stats[o])) for o, order in enumerate(ORDERS)]
+
+    def recommend(self, battle: Battle) -> Odds:
+        """The order most likely to survive the battle, then the one with the most booty."""
+        return max(self.lookup(battle), key=lambda odds: (round(odds.survival, 2), odds.booty))
+
+
+# For --help; the module docstring is stripped under python -OO
+DESCRIPTION = "Precomputed battle odds for Taipan."
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Build a battle odds table from the command line."""
+    parser = argparse.ArgumentParser(prog="python -m taipan_textual.battle_odds", description=DESCRIPTION)
+    parser.add_argument("path", metavar="PATH", help="table file to write, e.g. battle_odds.npy")
+    parser.add_argument("--trials", type=int, default=DEFAULT_TRIALS, help=f"battles per cell and order (default: {DEFAULT_TRIALS})")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the battles (default: 0)")
+    args = parser.parse_args(argv)
+
+    if args.trials < 1:
+        parser.error("--trials must be at least 1")
+    started = time.perf_counter()
+    build_table(args.path, args.trials, args.workers, args.seed)
+    elapsed = time.perf_counter() - started
+    battles = CELLS * len(ORDERS) * args.trials
+    print(f"{CELLS:,} cells, {battles:,} battles in {elapsed:.1f}s with {args.workers} worker(s)", file=sys.stderr)
+    print(f"Wrote {args.path} ({os.path.getsize(args.path):,} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
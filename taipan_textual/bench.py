@@ -0,0 +1,421 @@
+"""
+Keypress latency benchmarks for Taipan.
+
+Drives the real app headlessly through scripted sessions and times every
+keypress from the moment it is sent to the frame drawn after it has been
+handled:
+
+    python -m taipan_textual.bench run --output results.json
+    python -m taipan_textual.bench compare benchmarks/latency.json results.json
+
+Each script reports the p50 and p99 keypress latency and the wall time of
+the whole session, app start-up included. ``run --baseline FILE`` compares
+against a stored baseline straight away; the exit status is 1 if any
+script got slower than the threshold allows.
+
+``startup`` times how long ``python -m taipan_textual`` takes to import in
+fresh interpreters, split into Textual itself and the game's own modules,
+and fails if the game's share is over budget:
+
+    python -m taipan_textual.bench startup
+"""
+
+from dataclasses import asdict, dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from textual import __version__ as textual_version
+from textual import events
+from textual.pilot import Pilot
+
+from .game_ui import TaipanApp
+from .screens.battle_screen import BattleScreen
+from .screens.port_screen import PortScreen
+
+# Seed every script plays with; it has Li Yuen's demand on the first day and
+# no pirates on the way from Hong Kong to Shanghai
+SEED = 3
+
+# Characters of the named keys the scripts press
+KEY_CHARACTERS = {"enter": "\r", "escape": "\x1b"}
+
+# Terminal size the app is driven at
+SIZE = (100, 40)
+
+# A script is slower if a number grows past this ratio of the baseline ...
+DEFAULT_THRESHOLD = 1.25
+# ... and by more than this many milliseconds, which keeps timer noise out
+NOISE_FLOOR_MS = 1.0
+# The p99 of a few dozen keys is close to the slowest key, which a garbage
+# collection alone can double, so it gets more room
+TAIL_THRESHOLD = 2.0
+
+# Milliseconds the game's own modules may add to start-up, on top of Textual
+STARTUP_BUDGET_MS = 25.0
+
+# Run in a fresh interpreter to time the imports of one start-up
+_STARTUP_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import textual.app
+textual_loaded = time.perf_counter()
+import taipan_textual.__main__
+finished = time.perf_counter()
+print(json.dumps({
+    "textual": textual_loaded - started,
+    "game": finished - textual_loaded,
+    "modules": sorted(name for name in sys.modules if name.startswith("taipan_textual")),
+}))
+"""
+
+
+class BenchApp(TaipanApp):
+    """The game, noting the time each frame is drawn."""
+
+    frames = 0
+    last_frame = 0.0
+
+    def _display(self, screen, renderable) -> None:
+        # Called by the compositor for every update, headless or not
+        if renderable is not None:
+            self.frames += 1
+            self.last_frame = time.perf_counter()
+        super()._display(screen, renderable)
+
+
+class Session:
+    """A scripted session with one app, timing each keypress."""
+
+    def __init__(self, app: BenchApp, pilot: Pilot) -> None:
+        self.app = app
+        self.pilot = pilot
+        self.latencies: List[float] = []  # Seconds from each timed key to its frame
+        self.timing = True
+
+    async def press(self, *keys: str) -> None:
+        """
+        Press keys one at a time, waiting for the screen to settle after each.
+
+        Keys are sent straight to the driver: Pilot.press() waits for the
+        process to go idle, which sleeps for at least 40 ms and would swamp
+        the timings.
+        """
+        driver = self.app._driver
+        assert driver is not None, "The app is not running"
+        for key in keys:
+            frames = self.app.frames
+            started = time.perf_counter()
+            driver.send_event(events.Key(key, KEY_CHARACTERS.get(key, key)))
+            await self.settle()
+            finished = self.app.last_frame if self.app.frames > frames else time.perf_counter()
+            if self.timing:
+                self.latencies.append(finished - started)
+
+    async def settle(self) -> None:
+        """Wait for every message and worker a key set off to finish, then draw the frame."""
+        screen = None
+        while screen is not self.app.screen or self.app.workers:
+            screen = self.app.screen
+            await self.pilot._wait_for_screen()
+            await self.app.workers.wait_for_complete()
+        await self.pilot._wait_for_screen()
+        self.app.screen._on_timer_update()
+
+    async def type(self, text: str) -> None:
+        """Type text a key at a time."""
+        await self.press(*text)
+
+    async def untimed(self, script: "Script") -> None:
+        """Run steps that get a session to where a script starts, without timing them."""
+        self.timing = False
+        try:
+            await script(self)
+        finally:
+            self.timing = True
+
+
+Script = Callable[[Session], Awaitable[None]]
+
+
+async def _start_with_cash(session: Session) -> None:
+    await session.type("Acme")
+    await session.press("enter", "1")
+    await _decline_questions(session)
+
+
+async def _decline_questions(session: Session) -> None:
+    """Turn down Li Yuen and any ship or gun offered on arrival."""
+    screen = session.app.screen
+    while isinstance(screen, PortScreen) and screen.pending_question is not None:
+        await session.press("n")
+
+
+async def script_setup(session: Session) -> None:
+    """Name the firm, take the cash and answer Li Yuen."""
+    await _start_with_cash(session)
+
+
+async def script_buy(session: Session) -> None:
+    """Buy and sell general cargo."""
+    await session.untimed(_start_with_cash)
+    for _ in range(3):
+        await session.press("b", "g", "1", "0", "enter")
+    await session.press("s", "g", "5", "enter")
+
+
+async def script_bank(session: Session) -> None:
+    """Deposit and withdraw."""
+    await session.untimed(_start_with_cash)
+    for _ in range(3):
+        await session.press("v", "1", "0", "0", "enter", "5", "0", "enter")
+
+
+async def script_transfer(session: Session) -> None:
+    """Move cargo to the warehouse and back."""
+
+    async def buy_cargo(session: Session) -> None:
+        await _start_with_cash(session)
+        await session.press("b", "g", "2", "0", "enter")
+
+    await session.untimed(buy_cargo)
+    for _ in range(3):
+        await session.press("t", "1", "0", "enter", "enter")
+
+
+async def script_travel(session: Session) -> None:
+    """Sail to Shanghai and back."""
+    await session.untimed(_start_with_cash)
+    await session.press("q", "2")
+    await _finish_voyage(session)
+    await session.press("q", "1")
+    await _finish_voyage(session)
+
+
+async def script_battle(session: Session) -> None:
+    """Start with guns, which always meets pirates, and fight them."""
+
+    async def start_with_guns(session: Session) -> None:
+        await session.type("Acme")
+        await session.press("enter", "2")
+
+    await session.untimed(start_with_guns)
+    await session.press("q", "2")
+    await _finish_voyage(session)
+
+
+async def _finish_voyage(session: Session, steps: int = 100) -> None:
+    """Fight any battle on the way until the ship is in port again."""
+    for _ in range(steps):
+        screen = session.app.screen
+        if isinstance(screen, PortScreen):
+            await _decline_questions(session)
+            break
+        if isinstance(screen, BattleScreen) and screen.orders == 0:
+            await session.press("f")
+        else:
+            await session.settle()
+
+
+SCRIPTS: Dict[str, Script] = {
+    "setup": script_setup,
+    "buy": script_buy,
+    "bank": script_bank,
+    "transfer": script_transfer,
+    "travel": script_travel,
+    "battle": script_battle,
+}
+
+
+@dataclass
+class ScriptResult:
+    """Timings of one script over all its runs."""
+
+    keys: int  # Timed keys per run
+    p50_ms: float
+    p99_ms: float
+    wall_ms: float  # Median time for a whole session
+
+
+def _percentile(values: List[float], p: int) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[p - 1]
+
+
+async def run_script(script: Script) -> "tuple[List[float], float]":
+    """
+    Run a script once in a new app.
+
+    Returns:
+        The keypress latencies and the wall time of the session, in seconds
+    """
+    started = time.perf_counter()
+    app = BenchApp(seed=SEED, animation_speed="instant")
+    async with app.run_test(size=SIZE) as pilot:
+        session = Session(app, pilot)
+        await script(session)
+        if not isinstance(app.screen, PortScreen):
+            raise RuntimeError(f"{script.__name__} did not end in port")
+    return session.latencies, time.perf_counter() - started
+
+
+def run_benchmarks(names: List[str], repeat: int) -> Dict[str, ScriptResult]:
+    """Run scripts a number of times each and summarize their timings."""
+    results = {}
+    for name in names:
+        latencies: List[float] = []
+        walls: List[float] = []
+        for _ in range(repeat):
+            keys, wall = asyncio.run(run_script(SCRIPTS[name]))
+            latencies.extend(keys)
+            walls.append(wall)
+        results[name] = ScriptResult(
+            keys=len(latencies) // repeat,
+            p50_ms=_percentile(latencies, 50) * 1000,
+            p99_ms=_percentile(latencies, 99) * 1000,
+            wall_ms=statistics.median(walls) * 1000,
+        )
+    return results
+
+
+@dataclass
+class StartupResult:
+    """Import times of the game's start-up."""
+
+    textual_ms: float  # Median time to import Textual's app module
+    game_ms: float  # Median time to import the game on top of that
+    modules: List[str]  # The game's modules loaded at start-up
+
+
+def measure_startup(repeat: int) -> StartupResult:
+    """Time the imports of a number of start-ups, each in a new interpreter."""
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", _STARTUP_PROBE], check=True, capture_output=True, text=True
+        ).stdout
+        runs.append(json.loads(output))
+    return StartupResult(
+        textual_ms=statistics.median(run["textual"] for run in runs) * 1000,
+        game_ms=statistics.median(run["game"] for run in runs) * 1000,
+        modules=runs[-1]["modules"],
+    )
+
+
+def compare(baseline: Dict[str, dict], results: Dict[str, dict], threshold: float = DEFAULT_THRESHOLD) -> "tuple[List[str], List[str]]":
+    """
+    Compare results with a baseline.
+
+    Args:
+        baseline: Script results from the baseline file
+        results: Script results to check
+        threshold: Largest allowed ratio of a result to its baseline, at
+            least TAIL_THRESHOLD for p99
+
+    Returns:
+        The report lines, and the lines for numbers that got too slow
+    """
+    lines = [f"{'script':<10} {'metric':<8} {'baseline':>10} {'current':>10} {'change':>8}"]
+    slower = []
+    for name, result in results.items():
+        if name not in baseline:
+            lines.append(f"{name:<10} not in the baseline")
+            continue
+        for metric in ("p50_ms", "p99_ms", "wall_ms"):
+            before, after = baseline[name][metric], result[metric]
+            change = after / before - 1 if before else 0.0
+            line = f"{name:<10} {metric[:-3]:<8} {before:>8.2f}ms {after:>8.2f}ms {change:>+8.0%}"
+            limit = max(threshold, TAIL_THRESHOLD) if metric == "p99_ms" else threshold
+            if after > before * limit and after - before > NOISE_FLOOR_MS:
+                line += "  SLOWER"
+                slower.append(line)
+            lines.append(line)
+    return lines, slower
+
+
+def _load(path: str) -> Dict[str, dict]:
+    with open(path) as handle:
+        return json.load(handle)["scripts"]
+
+
+# For --help; the module docstring is stripped under python -OO
+DESCRIPTION = "Keypress latency benchmarks for Taipan."
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run or compare benchmarks from the command line."""
+    parser = argparse.ArgumentParser(prog="python -m taipan_textual.bench", description=DESCRIPTION)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the scripts and report their timings")
+    run.add_argument("--scripts", default=",".join(SCRIPTS), help=f"comma-separated scripts (default: {','.join(SCRIPTS)})")
+    run.add_argument("--repeat", type=int, default=5, help="sessions per script (default: 5)")
+    run.add_argument("--output", metavar="JSON", help="write the results to this file, e.g. to make a new baseline")
+    run.add_argument("--baseline", metavar="JSON", help="compare the results with this baseline")
+    run.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help=f"allowed slowdown ratio (default: {DEFAULT_THRESHOLD})")
+
+    check = commands.add_parser("compare", help="compare two result files")
+    check.add_argument("baseline", metavar="BASELINE")
+    check.add_argument("results", metavar="RESULTS")
+    check.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help=f"allowed slowdown ratio (default: {DEFAULT_THRESHOLD})")
+    startup = commands.add_parser("startup", help="time the imports of the game's start-up")
+    startup.add_argument("--repeat", type=int, default=20, help="start-ups to time (default: 20)")
+    startup.add_argument("--budget", type=float, default=STARTUP_BUDGET_MS,
+                         help=f"milliseconds the game may add to Textual's import time (default: {STARTUP_BUDGET_MS:g})")
+    args = parser.parse_args(argv)
+
+    if args.command == "startup":
+        result = measure_startup(args.repeat)
+        print(f"textual  {result.textual_ms:>7.1f}ms")
+        print(f"game     {result.game_ms:>7.1f}ms  (budget {args.budget:g}ms)")
+        print(f"modules  {', '.join(name.split('.', 1)[-1] for name in result.modules)}")
+        if result.game_ms > args.budget:
+            print("\nThe game's imports are over budget")
+            return 1
+        return 0
+
+    if args.command == "compare":
+        results = _load(args.results)
+        baseline = _load(args.baseline)
+    else:
+        names = [name.strip() for name in args.scripts.split(",") if name.strip()]
+        unknown = [name for name in names if name not in SCRIPTS]
+        if unknown:
+            parser.error(f"unknown scripts: {', '.join(unknown)}")
+        results = {name: asdict(result) for name, result in run_benchmarks(names, args.repeat).items()}
+
+        print(f"{'script':<10} {'keys':>5} {'p50':>9} {'p99':>9} {'wall':>10}")
+        for name, result in results.items():
+            print(f"{name:<10} {result['keys']:>5} {result['p50_ms']:>7.2f}ms {result['p99_ms']:>7.2f}ms {result['wall_ms']:>8.1f}ms")
+
+        if args.output:
+            with open(args.output, "w") as handle:
+                json.dump({
+                    "python": platform.python_version(),
+                    "textual": textual_version,
+                    "repeat": args.repeat,
+                    "scripts": results,
+                }, handle, indent=2)
+                handle.write("\n")
+        if not args.baseline:
+            return 0
+        baseline = _load(args.baseline)
+        print()
+
+    lines, slower = compare(baseline, results, args.threshold)
+    print("\n".join(lines))
+    if slower:
+        print(f"\n{len(slower)} number(s) slower than the baseline allows")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
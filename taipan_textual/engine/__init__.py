@@ -0,0 +1,84 @@
+"""
+Headless game engine for Taipan.
+
+The game rules live here as plain Python over a GameState, without any
+dependency on Textual, so they can be driven by the screens or by
+simulations.
+
+Batched simulation over NumPy arrays lives in ``engine.batch`` and is not
+imported here, since NumPy is an optional dependency.
+"""
+
+from .errors import GameRuleError
+from .trading import WAREHOUSE_CAPACITY, affordable, buy, sell, deposit, withdraw, bank, transfer
+from .voyage import VoyageReport, travel, complete_voyage, compound, fast_forward
+from .setup import start_game
+from .port import PORT_EVENTS, PortEvent, Offer, ArrivalReport, arrive_in_port, answer_li_yuen, answer_offer
+from .fleet import FLEET_SLOTS, ARRIVED, HIT, SUNK, LEFT, EnemyFleet, FleetChange
+from .battle import (
+    GENERIC,
+    LI_YUEN,
+    FIGHT,
+    RUN,
+    THROW_CARGO,
+    Battle,
+    Shot,
+    FightReport,
+    RunReport,
+    AttackReport,
+    fight_or_run,
+    resolve_battle
+)
+from .advisor import Leg, RoutePlan, plan_route
+from .autoplay import GameResult, Strategy, STRATEGIES, play_game
+
+__all__ = [
+    "GameRuleError",
+    "WAREHOUSE_CAPACITY",
+    "affordable",
+    "buy",
+    "sell",
+    "deposit",
+    "withdraw",
+    "bank",
+    "transfer",
+    "VoyageReport",
+    "travel",
+    "complete_voyage",
+    "compound",
+    "fast_forward",
+    "start_game",
+    "PORT_EVENTS",
+    "PortEvent",
+    "Offer",
+    "ArrivalReport",
+    "arrive_in_port",
+    "answer_li_yuen",
+    "answer_offer",
+    "FLEET_SLOTS",
+    "ARRIVED",
+    "HIT",
+    "SUNK",
+    "LEFT",
+    "EnemyFleet",
+    "FleetChange",
+    "GENERIC",
+    "LI_YUEN",
+    "FIGHT",
+    "RUN",
+    "THROW_CARGO",
+    "Battle",
+    "Shot",
+    "FightReport",
+    "RunReport",
+    "AttackReport",
+    "fight_or_run",
+    "resolve_battle",
+    "Leg",
+    "RoutePlan",
+    "plan_route",
+    "GameResult",
+    "Strategy",
+    "STRATEGIES",
+    "play_game"
+]
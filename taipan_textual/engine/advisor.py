@@ -0,0 +1,256 @@
+"""
+Trade route advice for Taipan.
+
+plan_route() looks a few voyages ahead and finds the buy, sell and sail
+plan that ends with the most cash. Prices are known only in the current
+port; elsewhere the solver expects the mean of the prices set_prices() can
+draw.
+
+The search runs over routes, depth first, and fills the hold on each
+voyage with the single item that leaves the most cash. It prunes a route
+once even the best case from its next port cannot beat the best plan found:
+a voyage can at most multiply the cash by the best sell to buy ratio, or
+add a full hold times the best margin. Those bounds depend only on the port
+and the voyages left, not on the cash, so they are worked out once and
+shared by every call, and a price change or a trade only reruns the search.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+from ..game_state import BASE_PRICES, GameState, ITEMS, LOCATIONS
+from ..profiling import timed
+
+# Voyages the advisor looks ahead
+ADVISOR_VOYAGES = 4
+
+PORTS = range(1, len(LOCATIONS))
+
+
+def expected_price(item: int, port: int) -> int:
+    """Mean price of an item in a port, over the multipliers set_prices() draws."""
+    return (BASE_PRICES[item][port] // 2) * 2 * BASE_PRICES[item][0]
+
+
+# Expected prices, by port then item
+_EXPECTED: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(expected_price(item, port) if port else 0 for item in range(len(ITEMS))) for port in range(len(LOCATIONS))
+)
+
+
+@dataclass(frozen=True)
+class Leg:
+    """One voyage of a plan."""
+
+    port: int  # Where to buy
+    item: Optional[int]  # What to buy, None to sail with nothing new
+    amount: int
+    destination: int  # Where to sail and sell
+
+
+@dataclass(frozen=True)
+class RoutePlan:
+    """The best plan found and the cash it is expected to end with."""
+
+    legs: Tuple[Leg, ...]
+    cash: int  # With all cargo sold at the last port
+
+
+def _best_trade(
+    buy_prices: Sequence[int],
+    sell_prices: Sequence[int],
+    cash: int,
+    space: int
+) -> Tuple[Optional[int], int, int]:
+    """
+    The single item to fill the hold with that leaves the most cash after selling.
+
+    Only one item is bought per voyage, which keeps the search small. When
+    cash runs out before space, a second item could gain a little more.
+
+    Returns:
+        The item (None if nothing gains), the amount and the cash after selling
+    """
+    best: Tuple[Optional[int], int, int] = (None, 0, cash)
+    for item, (buy_price, sell_price) in enumerate(zip(buy_prices, sell_prices)):
+        if sell_price <= buy_price:
+            continue
+        amount = min(space, cash // buy_price)
+        after = cash + amount * (sell_price - buy_price)
+        if after > best[2]:
+            best = (item, amount, after)
+    return best
+
+
+@lru_cache(maxsize=None)
+def _trades(port: int, destination: int) -> Tuple[Tuple[int, int], ...]:
+    """The buy price and margin of each item that gains on a voyage, at expected prices."""
+    buy_prices, sell_prices = _EXPECTED[port], _EXPECTED[destination]
+    return tuple((buy, sell - buy) for buy, sell in zip(buy_prices, sell_prices) if sell > buy)
+
+
+def _after_trade(port: int, destination: int, cash: int, space: int) -> int:
+    """Cash after the best single-item voyage at expected prices; _best_trade() without the item."""
+    best = cash
+    for buy, margin in _trades(port, destination):
+        after = cash + min(space, cash // buy) * margin
+        if after > best:
+            best = after
+    return best
+
+
+@lru_cache(maxsize=None)
+def _bounds(port: int, voyages: int) -> Tuple[float, int]:
+    """
+    Bounds on what the voyages from a port can make, whatever the cash.
+
+    Returns:
+        The most the cash can be multiplied by, and the most a unit of hold
+        space can earn
+    """
+    if voyages == 0:
+        return 1.0, 0
+    growth, margin = 0.0, 0
+    for destination in PORTS:
+        if destination == port:
+            continue
+        trades = _trades(port, destination)
+        rest_growth, rest_margin = _bounds(destination, voyages - 1)
+        growth = max(growth, max([1.0] + [(buy + gain) / buy for buy, gain in trades]) * rest_growth)
+        margin = max(margin, max([0] + [gain for _, gain in trades]) + rest_margin)
+    return growth, margin
+
+
+def _search(
+    port: int,
+    voyages: int,
+    cash: int,
+    space: int,
+    route: Tuple[int, ...],
+    best: Tuple[int, Tuple[int, ...]]
+) -> Tuple[int, Tuple[int, ...]]:
+    """
+    The best route from a port with an empty hold, at expected prices.
+
+    Args:
+        port: Where the voyages start
+        voyages: Voyages left, at least 1
+        cash: Cash on hand
+        space: Hold space
+        route: Destinations sailed to before this port
+        best: The final cash and route of the best plan found so far
+
+    Returns:
+        The final cash and route of the best plan, ``best`` if none beats it
+    """
+    if voyages == 1:
+        for destination in PORTS:
+            if destination != port:
+                after = _after_trade(port, destination, cash, space)
+                if after > best[0]:
+                    best = (after, route + (destination,))
+        return best
+
+    options = []
+    for destination in PORTS:
+        if destination == port:
+            continue
+        after = _after_trade(port, destination, cash, space)
+        growth, margin = _bounds(destination, voyages - 1)
+        options.append((min(after * growth, after + space * margin), destination, after))
+    options.sort(reverse=True)
+    for bound, destination, after in options:
+        if bound <= best[0]:
+            break  # Neither this nor any later option can do better
+        best = _search(destination, voyages - 1, after, space, route + (destination,), best)
+    return best
+
+
+@timed("engine.plan_route")
+def plan_route(game_state: GameState, voyages: int = ADVISOR_VOYAGES) -> RoutePlan:
+    """
+    Find the trade plan over the next voyages that ends with the most cash.
+
+    The plan starts in the current port at its current prices. Cargo
+    already aboard, and in Hong Kong what the warehouse holds, is sold here
+    or carried to the next port, whichever is expected to pay more. Guns,
+    pirates, storms and interest are left out.
+
+    Args:
+        game_state: The game to advise
+        voyages: Voyages to look ahead
+
+    Returns:
+        The best plan, with one leg per voyage
+    """
+    if voyages < 1:
+        return RoutePlan((), game_state.cash)
+    port = game_state.port
+    prices = game_state.price
+    capacity = game_state.capacity
+    free = max(0, capacity - game_state.hold)
+    cargo = list(game_state.hold_)
+    if port == 1:
+        for item, stored in enumerate(game_state.warehouse):
+            loaded = min(stored, free)
+            cargo[item] += loaded
+            free -= loaded
+
+    # The first voyage trades at today's prices and carries the cargo aboard
+    first = {}
+    for destination in PORTS:
+        if destination == port:
+            continue
+        sell_prices = _EXPECTED[destination]
+        cash = game_state.cash
+        space = capacity
+        carried = 0  # Expected value of the cargo carried on
+        for item, units in enumerate(cargo):
+            if sell_prices[item] > prices[item]:
+                space -= units
+                carried += units * sell_prices[item]
+            else:
+                cash += units * prices[item]
+        item, amount, after = _best_trade(prices, sell_prices, cash, max(0, space))
+        first[destination] = (Leg(port, item, amount, destination), after + carried)
+
+    options = []
+    for destination, (_, after) in first.items():
+        growth, margin = _bounds(destination, voyages - 1)
+        options.append((min(after * growth, after + capacity * margin), destination, after))
+    options.sort(reverse=True)
+    best: Tuple[int, Tuple[int, ...]] = (-1, ())
+    for bound, destination, after in options:
+        if bound <= best[0]:
+            break
+        if voyages == 1:
+            best = (after, (destination,))
+        else:
+            best = _search(destination, voyages - 1, after, capacity, (destination,), best)
+
+    route = best[1]
+    if not route:
+        return RoutePlan((), game_state.cash)  # Nowhere to sail
+
+    # Follow the best route again to say what to buy on each later voyage
+    legs = [first[route[0]][0]]
+    cash = first[route[0]][1]
+    for destination in route[1:]:
+        here = legs[-1].destination
+        item, amount, cash = _best_trade(_EXPECTED[here], _EXPECTED[destination], cash, capacity)
+        legs.append(Leg(here, item, amount, destination))
+    return RoutePlan(tuple(legs), best[0])
+
+
+def describe_leg(leg: Leg) -> str:
+    """A leg of a plan in words."""
+    destination = LOCATIONS[leg.destination]
+    if leg.item is None:
+        return f"Sail to {destination}"
+    return f"Buy {leg.amount} {ITEMS[leg.item]}, sail to {destination}"
+
+
+def describe_plan(plan: RoutePlan) -> List[str]:
+    """Each leg of a plan in words, in order."""
+    return [describe_leg(leg) for leg in plan.legs]
@@ -0,0 +1,138 @@
+"""
+Computer players for running Taipan games without a UI.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+import random
+
+from ..game_state import GameState, BASE_PRICES, BATTLE_LOST
+from .battle import FIGHT, RUN, Battle, fight_or_run, resolve_battle
+from .errors import GameRuleError
+from .port import arrive_in_port
+from .trading import affordable, buy, sell
+from .voyage import complete_voyage, travel
+
+# Price of each item at an average port, used to spot bargains
+AVERAGE_PRICES = [
+    sum(base // 2 * 2 for base in prices[1:]) / 7 * prices[0]
+    for prices in BASE_PRICES
+]
+
+
+@dataclass
+class GameResult:
+    """Summary of a finished headless game."""
+
+    seed: int
+    net_worth: int
+    months: int
+    voyages: int
+    battles: int
+    sunk: bool
+
+
+class Strategy:
+    """Sails to a random port and never trades. Fights while it has guns."""
+
+    name = "idle"
+
+    def __init__(self, rng: Optional[random.Random] = None) -> None:
+        self.rng = rng or random.Random()
+
+    def trade(self, game_state: GameState) -> None:
+        """Buy and sell in port before setting sail."""
+
+    def choose_port(self, game_state: GameState) -> int:
+        """Pick the next destination."""
+        port = self.rng.randint(1, 6)
+        return port + 1 if port >= game_state.port else port
+
+    def battle_orders(self, battle: Battle) -> int:
+        """Pick FIGHT or RUN for a round of battle."""
+        return fight_or_run(battle)
+
+
+class GreedyTrader(Strategy):
+    """Sells everything, then fills the hold with the cheapest cargo."""
+
+    name = "greedy"
+
+    def trade(self, game_state: GameState) -> None:
+        for item, amount in enumerate(game_state.hold_):
+            if amount > 0:
+                sell(game_state, item, amount)
+
+        ratios = [price / average for price, average in zip(game_state.price, AVERAGE_PRICES)]
+        item = min(range(len(ratios)), key=ratios.__getitem__)
+        if ratios[item] >= 1:
+            return
+
+        amount = affordable(game_state, item)
+        if amount > 0:
+            buy(game_state, item, amount)
+
+
+class Runner(GreedyTrader):
+    """Trades like GreedyTrader but always runs from pirates."""
+
+    name = "runner"
+
+    def battle_orders(self, battle: Battle) -> int:
+        return RUN
+
+
+class Fighter(GreedyTrader):
+    """Trades like GreedyTrader and always stands and fights."""
+
+    name = "fighter"
+
+    def battle_orders(self, battle: Battle) -> int:
+        return FIGHT
+
+
+STRATEGIES = {strategy.name: strategy for strategy in (Strategy, GreedyTrader, Runner, Fighter)}
+
+
+def play_game(game_state: GameState, strategy: Strategy, voyages: int, seed: int = 0) -> GameResult:
+    """
+    Play a game for a number of voyages, or until the ship is lost.
+
+    Args:
+        game_state: The game to play, already set up
+        strategy: The computer player
+        voyages: Number of voyages to sail
+        seed: Recorded in the result to identify the game
+
+    Returns:
+        The summary of the game
+    """
+    battles = 0
+    sunk = False
+    voyage = 0
+    for voyage in range(1, voyages + 1):
+        arrive_in_port(game_state)  # Li Yuen's demands go unanswered
+        strategy.trade(game_state)
+        try:
+            num_ships = travel(game_state, strategy.choose_port(game_state))
+        except GameRuleError:
+            break
+
+        if num_ships > 0:
+            battles += 1
+            if resolve_battle(game_state, num_ships, strategy=strategy.battle_orders) == BATTLE_LOST:
+                sunk = True
+                break
+
+        if complete_voyage(game_state).sunk:
+            sunk = True
+            break
+
+    return GameResult(
+        seed=seed,
+        net_worth=game_state.cash + game_state.bank - game_state.debt,
+        months=game_state.game_time,
+        voyages=voyage,
+        battles=battles,
+        sunk=sunk
+    )
@@ -0,0 +1,306 @@
+"""
+Batched simulation of many Taipan games at once.
+
+GameStateBatch keeps N games as a struct of NumPy arrays and advances all
+of them one voyage per call, with the same rules as travel() and
+complete_voyage(), and runs the port arrival event table over all of them
+at once. NumPy is an optional dependency (the ``sim`` extra).
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError as error:  # pragma: no cover - depends on the environment
+    raise ImportError("GameStateBatch needs NumPy, install the 'sim' extra: pip install taipan-textual[sim]") from error
+
+from ..game_state import GameState, BASE_PRICES, BATTLE_NOT_FINISHED, BATTLE_LOST, MAX_MONEY
+from ..rng import GameRandom
+from .battle import BattleStrategy, resolve_battle
+from .port import EVENT_SLOTS, LI_YUEN_LAPSE, PORT_EVENTS, VISIT_DRAWS
+from .voyage import MAX_SHIPS
+
+_BASE_PRICES = np.array(BASE_PRICES, dtype=np.int64)
+
+
+@dataclass
+class BatchVoyageReport:
+    """What happened to each game of a batch during one voyage."""
+
+    num_ships: np.ndarray  # hostile ships approaching, 0 if none
+    battle_result: np.ndarray  # BATTLE_* constant, BATTLE_NOT_FINISHED if no battle was resolved
+    storm: np.ndarray
+    sunk: np.ndarray
+    blown_off_course: np.ndarray
+
+
+@dataclass
+class BatchArrivalReport:
+    """Which arrival events happened to each game of a batch."""
+
+    happened: Dict[str, np.ndarray]  # Event name to one flag per game
+
+
+class GameStateBatch:
+    """N Taipan games held as NumPy arrays, one row per game."""
+
+    def __init__(self, size: int, seed: Union[int, np.random.Generator, None] = None) -> None:
+        self.size = size
+        self.rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+
+        self.cash = np.zeros(size, dtype=np.int64)
+        self.bank = np.zeros(size, dtype=np.int64)
+        self.debt = np.zeros(size, dtype=np.int64)
+        self.hold_ = np.zeros((size, 4), dtype=np.int64)
+        self.warehouse = np.zeros((size, 4), dtype=np.int64)
+        self.price = np.zeros((size, 4), dtype=np.int64)
+        self.hold = np.zeros(size, dtype=np.int64)
+        self.capacity = np.full(size, 60, dtype=np.int64)
+        self.guns = np.zeros(size, dtype=np.int64)
+        self.damage = np.zeros(size, dtype=np.int64)
+        self.month = np.ones(size, dtype=np.int64)
+        self.year = np.full(size, 1860, dtype=np.int64)
+        self.port = np.ones(size, dtype=np.int64)
+        self.destination_port = np.zeros(size, dtype=np.int64)
+        self.enemy_health = np.full(size, 20.0)
+        self.enemy_damage = np.full(size, 0.5)
+        self.battle_probability = np.zeros(size, dtype=np.int64)
+        self.booty = np.zeros(size, dtype=np.int64)
+        self.li_yuen_relation = np.zeros(size, dtype=np.int64)
+        self.sunk = np.zeros(size, dtype=bool)  # games that are over
+
+        self.set_prices()
+
+    @classmethod
+    def from_game_state(
+        cls,
+        game_state: GameState,
+        size: int,
+        seed: Union[int, np.random.Generator, None] = None
+    ) -> "GameStateBatch":
+        """Create a batch of ``size`` copies of a game."""
+        batch = cls(size, seed)
+        for i in range(size):
+            batch.store(i, game_state)
+        return batch
+
+    def store(self, index: int, game_state: GameState) -> None:
+        """Copy a GameState into one row of the batch."""
+        self.cash[index] = game_state.cash
+        self.bank[index] = game_state.bank
+        self.debt[index] = game_state.debt
+        self.hold_[index] = game_state.hold_
+        self.warehouse[index] = game_state.warehouse
+        self.price[index] = game_state.price
+        self.hold[index] = game_state.hold
+        self.capacity[index] = game_state.capacity
+        self.guns[index] = game_state.guns
+        self.damage[index] = game_state.damage
+        self.month[index] = game_state.month
+        self.year[index] = game_state.year
+        self.port[index] = game_state.port
+        self.destination_port[index] = game_state.destination_port
+        self.enemy_health[index] = game_state.enemy_health
+        self.enemy_damage[index] = game_state.enemy_damage
+        self.battle_probability[index] = game_state.battle_probability
+        self.booty[index] = game_state.booty
+        self.li_yuen_relation[index] = game_state.li_yuen_relation
+
+    def game_state(self, index: int) -> GameState:
+        """
+        Copy one row of the batch out as a GameState.
+
+        The copy gets its own random streams, seeded from the batch generator.
+        """
+        game_state = GameState(
+            rng=GameRandom(int(self.rng.integers(2 ** 63))),
+            cash=int(self.cash[index]),
+            bank=int(self.bank[index]),
+            debt=int(self.debt[index]),
+            booty=int(self.booty[index]),
+            enemy_health=float(self.enemy_health[index]),
+            enemy_damage=float(self.enemy_damage[index]),
+            battle_probability=int(self.battle_probability[index]),
+            destination_port=int(self.destination_port[index]),
+            warehouse=self.warehouse[index].tolist(),
+            hold_=self.hold_[index].tolist(),
+            hold=int(self.hold[index]),
+            capacity=int(self.capacity[index]),
+            guns=int(self.guns[index]),
+            damage=int(self.damage[index]),
+            month=int(self.month[index]),
+            year=int(self.year[index]),
+            port=int(self.port[index]),
+            li_yuen_relation=int(self.li_yuen_relation[index])
+        )
+        game_state.price = self.price[index].tolist()
+        return game_state
+
+    def set_prices(self, mask: Optional[np.ndarray] = None) -> None:
+        """Draw new prices for the current port, like GameState.set_prices()."""
+        rows = np.arange(self.size) if mask is None else np.flatnonzero(mask)
+        multiplier = self.rng.integers(1, 4, size=(len(rows), 4))
+        base = _BASE_PRICES[:, self.port[rows]].T  # (rows, 4)
+        self.price[rows] = (base // 2) * multiplier * _BASE_PRICES[:, 0]
+
+    def net_worth(self) -> np.ndarray:
+        """Cash plus bank balance minus debt for every game."""
+        return self.cash + self.bank - self.debt
+
+    def voyage(
+        self,
+        destination: Union[int, np.ndarray],
+        strategy: Optional[BattleStrategy] = None
+    ) -> BatchVoyageReport:
+        """
+        Sail every game that is still afloat to its destination.
+
+        Args:
+            destination: Port (1-7) for all games, or one port per game.
+                Each destination must differ from the game's current port.
+            strategy: If given, battles are fought through resolve_battle()
+                with this strategy. Otherwise they are only rolled and
+                reported in ``num_ships``.
+
+        Returns:
+            A report with one entry per game
+        """
+        destination = np.broadcast_to(np.asarray(destination, dtype=np.int64), (self.size,))
+        active = ~self.sunk
+        if np.any((destination[active] < 1) | (destination[active] > 7)):
+            raise ValueError("Destination ports must be between 1 and 7")
+        if np.any(destination[active] == self.port[active]):
+            raise ValueError("Destination ports must differ from the current ports")
+
+        self.destination_port[active] = destination[active]
+        report = BatchVoyageReport(
+            num_ships=np.zeros(self.size, dtype=np.int64),
+            battle_result=np.full(self.size, BATTLE_NOT_FINISHED, dtype=np.int64),
+            storm=np.zeros(self.size, dtype=bool),
+            sunk=np.zeros(self.size, dtype=bool),
+            blown_off_course=np.zeros(self.size, dtype=bool)
+        )
+
+        # Battle roll, as in travel()
+        probability = np.maximum(self.battle_probability, 1)
+        battle = active & (self.battle_probability > 0) & (self.rng.integers(0, probability) == 0)
+        num_ships = self.rng.integers(1, np.maximum((self.capacity // 10) + self.guns, 1), endpoint=True)
+        report.num_ships[battle] = np.minimum(num_ships[battle], MAX_SHIPS)
+
+        if strategy is not None:
+            for i in np.flatnonzero(battle).tolist():
+                game_state = self.game_state(i)
+                report.battle_result[i] = resolve_battle(game_state, int(report.num_ships[i]), strategy=strategy)
+                self.store(i, game_state)
+            lost = report.battle_result == BATTLE_LOST
+            report.sunk |= lost
+            active &= ~lost
+
+        self.port[active] = self.destination_port[active]
+
+        # Storms, as in complete_voyage()
+        storm = active & (self.rng.integers(1, 11, size=self.size) == 1)
+        going_down = storm & (self.rng.integers(1, 31, size=self.size) == 1)
+        sinking = (self.damage / self.capacity * 3) * self.rng.random(self.size) >= 1
+        sunk = going_down & sinking
+        report.storm = storm
+        report.sunk |= sunk
+        active &= ~sunk
+
+        blown = storm & ~sunk & (self.rng.integers(1, 4, size=self.size) == 1)
+        # Uniform over the six other ports, like the rejection loop in complete_voyage()
+        other_port = self.rng.integers(1, 7, size=self.size)
+        other_port += other_port >= self.destination_port
+        self.port[blown] = other_port[blown]
+        report.blown_off_course = blown
+
+        # Advance date
+        self.month[active] += 1
+        new_year = active & (self.month == 13)
+        self.month[new_year] = 1
+        self.year[new_year] += 1
+        self.enemy_health[new_year] += 10
+        self.enemy_damage[new_year] += 0.5
+
+        # Update debt and bank balance with the same truncation as the scalar rules
+        self.debt[active] = np.minimum(self.debt[active] * 1.1, MAX_MONEY).astype(np.int64)
+        self.bank[active] = np.minimum(self.bank[active] * 1.005, MAX_MONEY).astype(np.int64)
+
+        self.set_prices(active)
+        self.sunk |= report.sunk
+        return report
+
+    def arrive(self, draws: Optional[np.ndarray] = None) -> BatchArrivalReport:
+        """
+        Run the port arrival events for every game still afloat, like arrive_in_port().
+
+        Li Yuen's demands and offers of ships and guns need an answer from
+        the player, so they are only reported here, not applied.
+
+        Args:
+            draws: The numbers for each game's visit, shape (size, VISIT_DRAWS).
+                Drawn from the batch generator if not given.
+
+        Returns:
+            A report with one flag per game for each event
+        """
+        if draws is None:
+            draws = self.rng.random((self.size, VISIT_DRAWS))
+        active = ~self.sunk
+        report = BatchArrivalReport(happened={})
+        for event in PORT_EVENTS:
+            slot = EVENT_SLOTS[event.name]
+            condition, effect = _BATCH_EVENTS[event.name]
+            happened = active & condition(self) & (draws[:, slot] < event.probability)
+            rows = np.flatnonzero(happened)
+            if effect is not None and len(rows):
+                effect(self, rows, draws[rows, slot + 1:slot + 1 + event.draws])
+            report.happened[event.name] = happened
+        return report
+
+
+def _seize_opium(batch: GameStateBatch, rows: np.ndarray, draws: np.ndarray) -> None:
+    cash = batch.cash[rows]
+    fine = np.minimum(cash, (cash / 1.8 * draws[:, 0]).astype(np.int64) + 1)
+    batch.hold[rows] -= batch.hold_[rows, 0]
+    batch.hold_[rows, 0] = 0
+    batch.cash[rows] -= fine
+
+
+def _steal_goods(batch: GameStateBatch, rows: np.ndarray, draws: np.ndarray) -> None:
+    batch.warehouse[rows] = (batch.warehouse[rows] / 1.8 * draws).astype(np.int64)
+
+
+def _li_yuen_decay(batch: GameStateBatch, rows: np.ndarray, draws: np.ndarray) -> None:
+    relation = batch.li_yuen_relation[rows] + 1
+    relation[relation == LI_YUEN_LAPSE] = 0
+    batch.li_yuen_relation[rows] = relation
+
+
+def _good_prices(batch: GameStateBatch, rows: np.ndarray, draws: np.ndarray) -> None:
+    item = (draws[:, 0] * 4).astype(np.int64)
+    old_price = batch.price[rows, item]
+    rise = old_price * (5 + (draws[:, 2] * 5).astype(np.int64))
+    batch.price[rows, item] = np.where(draws[:, 1] < 0.5, np.maximum(1, old_price // 5), rise)
+
+
+def _robbery(batch: GameStateBatch, rows: np.ndarray, draws: np.ndarray) -> None:
+    batch.cash[rows] -= (batch.cash[rows] / 1.4 * draws[:, 0]).astype(np.int64)
+
+
+BatchCondition = Callable[[GameStateBatch], np.ndarray]
+BatchEffect = Callable[[GameStateBatch, np.ndarray, np.ndarray], None]
+
+# Array versions of PORT_EVENTS' conditions and effects, by event name.
+# Events that change nothing, or need an answer from the player, have no effect here.
+_BATCH_EVENTS: Dict[str, Tuple[BatchCondition, Optional[BatchEffect]]] = {
+    "li_yuen_demand": (lambda b: (b.port == 1) & (b.li_yuen_relation == 0) & (b.cash > 0), None),
+    "offer": (lambda b: np.ones(b.size, dtype=bool), None),
+    "opium_seized": (lambda b: (b.port != 1) & (b.hold_[:, 0] > 0), _seize_opium),
+    "goods_stolen": (lambda b: b.warehouse.sum(axis=1) > 0, _steal_goods),
+    "li_yuen_decay": (lambda b: b.li_yuen_relation > 0, _li_yuen_decay),
+    "li_yuen_summons": (lambda b: (b.port != 1) & (b.li_yuen_relation == 0), None),
+    "good_prices": (lambda b: np.ones(b.size, dtype=bool), _good_prices),
+    "robbery": (lambda b: b.cash > 25000, _robbery),
+}
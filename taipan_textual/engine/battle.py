@@ -0,0 +1,261 @@
+"""
+Sea battle rules for Taipan.
+"""
+
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+from ..game_state import GameState, BATTLE_NOT_FINISHED, BATTLE_WON, BATTLE_INTERRUPTED, BATTLE_FLED, BATTLE_LOST
+from ..journal import BATTLE_END, BATTLE_ORDER, record
+from ..profiling import timed
+from .fleet import FLEET_SLOTS, EnemyFleet
+from .port import GUN_SPACE
+
+# Battle types
+GENERIC = 1
+LI_YUEN = 2
+
+# Battle orders
+FIGHT = 1
+RUN = 2
+THROW_CARGO = 3
+
+
+@dataclass
+class Shot:
+    """A single shot fired at the enemy fleet."""
+
+    target: int
+    damage: int
+    sunk: bool
+    refilled: List[Tuple[int, int]] = field(default_factory=list)  # (slot, health) filled before the shot
+
+
+@dataclass
+class FightReport:
+    """Outcome of a round of fight orders."""
+
+    no_guns: bool = False
+    shots: List[Shot] = field(default_factory=list)
+    sunk: int = 0
+    ran_away: int = 0
+    cleared: List[int] = field(default_factory=list)  # slots emptied because ships left
+
+
+@dataclass
+class RunReport:
+    """Outcome of a round of run orders."""
+
+    escaped: bool = False
+    lost: int = 0  # ships we escaped from without getting away
+    cleared: List[int] = field(default_factory=list)
+
+
+@dataclass
+class AttackReport:
+    """Outcome of the enemy firing on us."""
+
+    gun_hit: bool = False
+    damage: int = 0
+    interrupted: bool = False
+
+
+class Battle:
+    """A sea battle between the player's ship and an enemy fleet."""
+
+    def __init__(self, game_state: GameState, num_ships: int, battle_type: int = GENERIC) -> None:
+        self.game_state = game_state
+        self.rng = game_state.rng.combat
+        self.battle_type = battle_type
+        self.fleet = EnemyFleet(num_ships)
+        self.original_ships = num_ships
+        self.orders = 0
+        self.ok = 0
+        self.ik = 1
+        self.result = BATTLE_NOT_FINISHED
+        self.booty = (game_state.game_time // 4 * 1000 * num_ships) + self.rng.randint(0, 999) + 250
+
+    @property
+    def num_ships(self) -> int:
+        """Enemy ships left in the battle."""
+        return self.fleet.num_ships
+
+    @property
+    def num_on_screen(self) -> int:
+        """Enemy ships on screen."""
+        return self.fleet.num_on_screen
+
+    @property
+    def ships_on_screen(self) -> List[int]:
+        """Health of the ship in each position, 0 if empty."""
+        return self.fleet.health
+
+    @property
+    def finished(self) -> bool:
+        """Whether the battle is over."""
+        return self.result != BATTLE_NOT_FINISHED
+
+    def _new_ship(self) -> int:
+        """Roll the health of a new enemy ship."""
+        return int((self.game_state.enemy_health * self.rng.random()) + 20)
+
+    def fill_slots(self) -> List[Tuple[int, int]]:
+        """
+        Bring waiting ships into empty positions.
+
+        Returns:
+            The (slot, health) pairs that were filled
+        """
+        return self.fleet.fill(self._new_ship)
+
+    @timed("Battle.fight")
+    def fight(self) -> FightReport:
+        """Fire every gun at the enemy fleet."""
+        self.orders = FIGHT
+        record(self.game_state, BATTLE_ORDER, FIGHT)
+        report = FightReport()
+        if self.game_state.guns == 0:
+            report.no_guns = True
+            return report
+
+        for _ in range(self.game_state.guns):
+            if self.num_ships == 0:
+                break
+
+            refilled = self.fill_slots()
+
+            targeted = self.fleet.pick_target(self.rng)
+            damage = self.rng.randint(10, 40)
+            sunk = self.fleet.hit(targeted, damage)
+            if sunk:
+                report.sunk += 1
+
+            report.shots.append(Shot(targeted, damage, sunk, refilled))
+
+        # Check if some ships run away
+        if (self.rng.randint(1, self.original_ships) > (self.num_ships * 0.6 / self.battle_type) and
+                self.num_ships > 2):
+            divisor = self.num_ships // 3 // self.battle_type
+            if divisor == 0:
+                divisor = 1
+            report.ran_away = self.rng.randint(1, divisor)
+            report.cleared = self.fleet.leave(report.ran_away)
+
+        return report
+
+    @timed("Battle.run")
+    def run(self) -> RunReport:
+        """Try to outrun the enemy fleet."""
+        self.orders = RUN
+        record(self.game_state, BATTLE_ORDER, RUN)
+        report = RunReport()
+
+        self.ok += self.ik
+        self.ik += 1
+
+        if self.rng.randint(1, self.ok) > self.rng.randint(1, self.num_ships):
+            report.escaped = True
+            report.cleared = self.fleet.leave(self.num_ships)
+        elif self.num_ships > 2 and self.rng.randint(1, 5) == 1:
+            report.lost = self.rng.randint(1, self.num_ships // 2)
+            report.cleared = self.fleet.leave(report.lost)
+
+        return report
+
+    def enemy_attack(self) -> AttackReport:
+        """Let the enemy fleet fire on us."""
+        report = AttackReport()
+        game_state = self.game_state
+
+        i = min(15, self.num_ships)
+        damage_percent = (game_state.damage / game_state.capacity) * 100
+        if (game_state.guns > 0 and
+                (self.rng.randint(1, 100) < damage_percent or damage_percent > 80)):
+            i = 1
+            game_state.guns -= 1
+            game_state.capacity += GUN_SPACE  # The gun's space is freed for cargo
+            report.gun_hit = True
+
+        report.damage = int((game_state.enemy_damage * i * self.battle_type * self.rng.random()) + (i / 2))
+        game_state.damage += report.damage
+
+        if self.battle_type == GENERIC and self.rng.randint(1, 20) == 1:
+            report.interrupted = True
+            self._finish(BATTLE_INTERRUPTED)
+
+        return report
+
+    def _finish(self, result: int) -> None:
+        """End the battle with a result."""
+        self.result = result
+        record(self.game_state, BATTLE_END, result, self.booty if result == BATTLE_WON else 0)
+
+    @timed("Battle.end_round")
+    def end_round(self) -> Optional[AttackReport]:
+        """
+        Finish a round after the player's orders.
+
+        The enemy returns fire if any ships remain, then the battle result is
+        decided. Booty is paid out when the fleet is destroyed in a fight.
+
+        Returns:
+            The enemy attack, or None if no ships were left to attack
+        """
+        attack = None
+        if self.num_ships > 0:
+            attack = self.enemy_attack()
+            if attack.interrupted:
+                return attack
+
+        if self.num_ships == 0:
+            if self.orders == FIGHT:
+                self.game_state.cash += self.booty
+                self._finish(BATTLE_WON)
+            else:
+                self._finish(BATTLE_FLED)
+            return attack
+
+        if self.game_state.damage >= self.game_state.capacity:
+            self._finish(BATTLE_LOST)
+            return attack
+
+        self.orders = 0
+        return attack
+
+
+BattleStrategy = Callable[[Battle], int]
+
+
+def fight_or_run(battle: Battle) -> int:
+    """Default strategy: fight while we have guns, otherwise run."""
+    return FIGHT if battle.game_state.guns > 0 else RUN
+
+
+def resolve_battle(
+    game_state: GameState,
+    num_ships: int,
+    battle_type: int = GENERIC,
+    strategy: Optional[BattleStrategy] = None
+) -> int:
+    """
+    Fight a whole battle without any UI.
+
+    Args:
+        game_state: The game to update
+        num_ships: Size of the enemy fleet
+        battle_type: GENERIC or LI_YUEN
+        strategy: Picks FIGHT or RUN for each round, defaults to fight_or_run
+
+    Returns:
+        One of the BATTLE_* result constants
+    """
+    choose = strategy or fight_or_run
+    battle = Battle(game_state, num_ships, battle_type)
+    while not battle.finished:
+        battle.fill_slots()
+        if choose(battle) == RUN:
+            battle.run()
+        else:
+            battle.fight()
+        battle.end_round()
+    return battle.result
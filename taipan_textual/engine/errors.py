@@ -0,0 +1,10 @@
+"""
+Errors raised by the Taipan game engine.
+"""
+
+
+class GameRuleError(ValueError):
+    """Raised when an action is not allowed by the game rules.
+
+    The message is written for the player, so views can show it as-is.
+    """
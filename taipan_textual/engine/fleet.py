@@ -0,0 +1,152 @@
+"""
+The enemy fleet in a Taipan sea battle.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, List, Tuple
+import random
+
+# Number of enemy ship positions on screen
+FLEET_SLOTS = 10
+
+# Kinds of fleet change
+ARRIVED = "arrived"
+HIT = "hit"
+SUNK = "sunk"
+LEFT = "left"
+
+
+@dataclass(frozen=True)
+class FleetChange:
+    """A change to one position of the enemy fleet."""
+
+    kind: str
+    slot: int
+    health: int  # Health in the position after the change, 0 if empty
+    remaining: int  # Ships left in the battle after the change
+
+
+FleetListener = Callable[[FleetChange], None]
+
+
+class EnemyFleet:
+    """
+    Enemy ships in a battle: up to FLEET_SLOTS on screen, the rest waiting.
+
+    Occupied positions are kept in an indexed list so a random target can be
+    picked in one draw, and empty positions on a free-list so waiting ships
+    can be brought in without scanning. Every operation is constant time.
+
+    Views subscribe to be told about every change, in order.
+    """
+
+    def __init__(self, num_ships: int, slots: int = FLEET_SLOTS) -> None:
+        self.num_ships = num_ships  # Ships left in the battle, on screen or waiting
+        self.health = [0] * slots  # Health of the ship in each position, 0 if empty
+        self._live: List[int] = []  # Occupied positions, in no particular order
+        self._index = [-1] * slots  # Where each position is in _live, -1 if empty
+        self._free = list(reversed(range(slots)))  # Empty positions, next to fill last
+        self._listeners: List[FleetListener] = []
+
+    @property
+    def num_on_screen(self) -> int:
+        """Number of ships on screen."""
+        return len(self._live)
+
+    @property
+    def waiting(self) -> int:
+        """Number of ships waiting to come on screen."""
+        return self.num_ships - len(self._live)
+
+    def subscribe(self, listener: FleetListener) -> None:
+        """Call ``listener`` with every change to the fleet."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: FleetListener) -> None:
+        """Stop calling ``listener``."""
+        self._listeners.remove(listener)
+
+    def _changed(self, kind: str, slot: int) -> None:
+        """Tell the listeners about a change."""
+        if self._listeners:
+            change = FleetChange(kind, slot, self.health[slot], self.num_ships)
+            for listener in self._listeners:
+                listener(change)
+
+    def live_slots(self) -> List[int]:
+        """Positions that hold a ship."""
+        return list(self._live)
+
+    def _place(self, slot: int, health: int) -> None:
+        """Put a ship in an empty position."""
+        self.health[slot] = health
+        self._index[slot] = len(self._live)
+        self._live.append(slot)
+
+    def _clear(self, slot: int) -> None:
+        """Empty an occupied position."""
+        index = self._index[slot]
+        last = self._live.pop()
+        if last != slot:
+            self._live[index] = last
+            self._index[last] = index
+        self._index[slot] = -1
+        self.health[slot] = 0
+        self._free.append(slot)
+
+    def fill(self, new_ship: Callable[[], int]) -> List[Tuple[int, int]]:
+        """
+        Bring waiting ships into empty positions.
+
+        Args:
+            new_ship: Rolls the health of each new ship
+
+        Returns:
+            The (slot, health) pairs that were filled
+        """
+        filled = []
+        while self.num_ships > len(self._live) and self._free:
+            slot = self._free.pop()
+            self._place(slot, new_ship())
+            filled.append((slot, self.health[slot]))
+            self._changed(ARRIVED, slot)
+        return filled
+
+    def pick_target(self, rng: random.Random) -> int:
+        """Pick a ship on screen uniformly at random."""
+        return self._live[rng.randrange(len(self._live))]
+
+    def hit(self, slot: int, damage: int) -> bool:
+        """
+        Damage the ship in a position.
+
+        Returns:
+            Whether the ship sank
+        """
+        self.health[slot] -= damage
+        if self.health[slot] > 0:
+            self._changed(HIT, slot)
+            return False
+        self._clear(slot)
+        self.num_ships -= 1
+        self._changed(SUNK, slot)
+        return True
+
+    def leave(self, count: int) -> List[int]:
+        """
+        Remove ships from the battle without sinking them.
+
+        Waiting ships leave first. Ships on screen only leave when fewer
+        ships remain than are shown.
+
+        Returns:
+            The positions that were emptied
+        """
+        self.num_ships = max(0, self.num_ships - count)
+        cleared = []
+        while len(self._live) > self.num_ships:
+            slot = self._live[-1]
+            self._clear(slot)
+            cleared.append(slot)
+            self._changed(LEFT, slot)
+        return cleared
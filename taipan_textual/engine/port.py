@@ -0,0 +1,305 @@
+"""
+Port rules for Taipan: the events that meet the ship on arrival.
+
+The random events are declared in PORT_EVENTS, each with a condition, a
+probability and an effect, and arrive_in_port() runs down the table in
+order like the C code's chain of checks. Every visit draws the same number
+of random numbers in one batch, whatever happens, and each event reads its
+own slots of the batch. So an event that cannot happen, or a new event at
+the end of the table, leaves the numbers of the others unchanged, and the
+batched simulation can draw a whole array of visits at once.
+"""
+
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..game_state import GameState
+from ..journal import (
+    EVENT,
+    GOODS_STOLEN,
+    GUN_OFFER,
+    LI_YUEN_DEMAND,
+    LI_YUEN_PAID,
+    LI_YUEN_REFUSED,
+    LI_YUEN_RELATION,
+    LI_YUEN_SUMMONS,
+    OFFER_ACCEPTED,
+    OFFER_DECLINED,
+    OPIUM_SEIZED,
+    PRICE_CHANGE,
+    ROBBED,
+    SHIP_OFFER,
+    record,
+)
+from .errors import GameRuleError
+
+# Most guns a ship is offered, as in the C code
+MAX_GUNS = 1000
+
+# Capacity added by a new ship, and taken up by a gun
+SHIP_CAPACITY = 50
+GUN_SPACE = 10
+
+# Li Yuen's protection lapses when the relation counts up to this
+LI_YUEN_LAPSE = 4
+
+
+@dataclass
+class Offer:
+    """A ship or gun offered for sale on arrival."""
+
+    kind: int  # SHIP_OFFER or GUN_OFFER
+    price: int
+
+
+@dataclass
+class ArrivalReport:
+    """What happened on arriving in port."""
+
+    li_yuen_demand: Optional[int] = None  # Donation Li Yuen asks for, if he comes
+    offer: Optional[Offer] = None  # A new ship or gun, if one is offered
+    events: List[Tuple[int, ...]] = field(default_factory=list)  # EVENT codes and values, as recorded
+
+
+Effect = Callable[[GameState, Sequence[float], ArrivalReport], None]
+
+
+@dataclass(frozen=True)
+class PortEvent:
+    """
+    One random event of the arrival table.
+
+    The event happens when its condition holds and the visit's roll for it
+    is below its probability. Its effect gets ``draws`` more uniform numbers
+    in [0, 1) from the visit's batch.
+    """
+
+    name: str
+    condition: Callable[[GameState], bool]
+    probability: float
+    effect: Effect
+    draws: int = 0
+
+
+def uniform_int(low: int, high: int, draw: float) -> int:
+    """An integer from low to high inclusive, from a uniform draw in [0, 1)."""
+    return low + int(draw * (high - low + 1))
+
+
+def _happened(game_state: GameState, report: ArrivalReport, code: int, *values: int) -> None:
+    """Record an event in the journal and the report."""
+    record(game_state, EVENT, code, *values)
+    report.events.append((code, *values))
+
+
+def _li_yuen_demand(game_state: GameState, draws: Sequence[float], report: ArrivalReport) -> None:
+    """Roll the donation Li Yuen asks for."""
+    time = game_state.game_time
+    i = 1.8
+    j = 0
+
+    if time > 12:
+        j = uniform_int(1000 * time, 2000 * time, draws[0])
+        i = 1
+
+    amount = int((game_state.cash / i) * draws[1] + j)
+    report.li_yuen_demand = amount
+    _happened(game_state, report, LI_YUEN_DEMAND, amount)
+
+
+def _offer(game_state: GameState, draws: Sequence[float], report: ArrivalReport) -> None:
+    """Offer a larger ship or a gun, if the player can pay for it."""
+    scale = 1000 * (game_state.game_time + 5) // 6
+    if draws[0] < 0.5:
+        price = int(draws[1] * scale) * (game_state.capacity // SHIP_CAPACITY) + 1000
+        if game_state.cash >= price:
+            report.offer = Offer(SHIP_OFFER, price)
+    elif game_state.guns < MAX_GUNS:
+        price = int(draws[1] * scale) + 500
+        if game_state.cash >= price and game_state.capacity - game_state.hold >= GUN_SPACE:
+            report.offer = Offer(GUN_OFFER, price)
+    if report.offer is not None:
+        _happened(game_state, report, report.offer.kind, report.offer.price)
+
+
+def _seize_opium(game_state: GameState, draws: Sequence[float], report: ArrivalReport) -> None:
+    """Local authorities seize the opium in the hold and fine the player."""
+    seized = game_state.hold_[0]
+    fine = min(game_state.cash, int((game_state.cash / 1.8) * draws[0]) + 1)
+    game_state.hold_[0] = 0
+    game_state.hold -= seized
+    game_state.cash -= fine
+    _happened(game_state, report, OPIUM_SEIZED, seized, fine)
+
+
+def _steal_goods(game_state: GameState, draws: Sequence[float], report: ArrivalReport) -> None:
+    """Thieves take part of each item in the warehouse."""
+    stolen = []
+    for item, draw in enumerate(draws):
+        left = int((game_state.warehouse[item] / 1.8) * draw)
+        stolen.append(game_state.warehouse[item] - left)
+        game_state.warehouse[item] = left
+    _happened(game_state, report, GOODS_STOLEN, *stolen)
+
+
+def _li_yuen_decay(game_state: GameState, draws: Sequence[float], report: ArrivalReport) -> None:
+    """Li Yuen's protection wears on, and lapses after a while."""
+    relation = game_state.li_yuen_relation + 1
+    game_state.li_yuen_relation = 0 if relation == LI_YUEN_LAPSE else relation
+    _happened(game_state, report, LI_YUEN_RELATION, game_state.li_yuen_relation)
+
+
+def _li_yuen_summons(game_state: GameState, draws: Sequence[float], report: ArrivalReport) -> None:
+    """Li Yuen sends word that he wants to see the player in Hong Kong."""
+    _happened(game_state, report, LI_YUEN_SUMMONS)
+
+
+def _good_prices(game_state: GameState, draws: Sequence[float], report: ArrivalReport) -> None:
+    """The price of one item crashes or soars."""
+    item = uniform_int(0, 3, draws[0])
+    old_price = game_state.price[item]
+    if draws[1] < 0.5:
+        price = max(1, old_price // 5)
+    else:
+        price = old_price * uniform_int(5, 9, draws[2])
+    game_state.price[item] = price
+    _happened(game_state, report, PRICE_CHANGE, item, old_price, price)
+
+
+def _robbery(game_state: GameState, draws: Sequence[float], report: ArrivalReport) -> None:
+    """The player is beaten up and robbed of part of their cash."""
+    amount = int((game_state.cash / 1.4) * draws[0])
+    game_state.cash -= amount
+    _happened(game_state, report, ROBBED, amount)
+
+
+# The arrival events, in the order they are checked. Append new events at
+# the end so that the numbers the others draw stay the same.
+PORT_EVENTS: Tuple[PortEvent, ...] = (
+    # Li Yuen's extortion: only in Hong Kong, if not already paid, and with cash
+    PortEvent(
+        "li_yuen_demand",
+        lambda gs: gs.port == 1 and gs.li_yuen_relation == 0 and gs.cash > 0,
+        1.0, _li_yuen_demand, draws=2
+    ),
+    PortEvent("offer", lambda gs: True, 1 / 4, _offer, draws=2),
+    PortEvent("opium_seized", lambda gs: gs.port != 1 and gs.hold_[0] > 0, 1 / 18, _seize_opium, draws=1),
+    PortEvent("goods_stolen", lambda gs: gs.total_warehouse > 0, 1 / 50, _steal_goods, draws=4),
+    PortEvent("li_yuen_decay", lambda gs: gs.li_yuen_relation > 0, 1 / 20, _li_yuen_decay),
+    PortEvent("li_yuen_summons", lambda gs: gs.port != 1 and gs.li_yuen_relation == 0, 3 / 4, _li_yuen_summons),
+    PortEvent("good_prices", lambda gs: True, 1 / 9, _good_prices, draws=3),
+    PortEvent("robbery", lambda gs: gs.cash > 25000, 1 / 20, _robbery, draws=1),
+)
+
+
+def _slots(events: Sequence[PortEvent]) -> Dict[str, int]:
+    """Where each event's roll is in a visit's draws; its effect's numbers follow it."""
+    slots = {}
+    slot = 0
+    for event in events:
+        slots[event.name] = slot
+        slot += 1 + event.draws
+    return slots
+
+
+EVENT_SLOTS = _slots(PORT_EVENTS)
+
+# Numbers drawn for every visit
+VISIT_DRAWS = sum(1 + event.draws for event in PORT_EVENTS)
+
+
+def arrive_in_port(game_state: GameState) -> ArrivalReport:
+    """
+    Roll the random events for the port the ship has just reached.
+
+    Events that need no answer are applied and recorded here. McHenry's
+    repairs and Elder Brother Wu are visits the player chooses rather than
+    random events, so they are not in the table.
+
+    Returns:
+        A report of the events, including those that need an answer from
+        the player: Li Yuen's demand and an offer of a ship or gun
+    """
+    random = game_state.rng.events.random
+    return run_port_events(game_state, [random() for _ in range(VISIT_DRAWS)])
+
+
+def run_port_events(game_state: GameState, draws: Sequence[float]) -> ArrivalReport:
+    """
+    Run the arrival event table with a visit's numbers already drawn.
+
+    Args:
+        game_state: The game to update
+        draws: VISIT_DRAWS uniform numbers in [0, 1)
+
+    Returns:
+        A report of the events
+    """
+    report = ArrivalReport()
+    for event in PORT_EVENTS:
+        slot = EVENT_SLOTS[event.name]
+        if event.condition(game_state) and draws[slot] < event.probability:
+            event.effect(game_state, draws[slot + 1:slot + 1 + event.draws], report)
+
+    return report
+
+
+def answer_li_yuen(game_state: GameState, amount: int, pay: bool) -> bool:
+    """
+    Answer Li Yuen's demand for a donation.
+
+    Args:
+        game_state: The game to update
+        amount: The donation he asked for
+        pay: Whether the player agreed to pay
+
+    Returns:
+        Whether Li Yuen was paid in full. A player who agrees without the
+        cash loses all of it and stays out of his favour.
+    """
+    if not pay:
+        record(game_state, EVENT, LI_YUEN_REFUSED)
+        return False
+
+    paid = min(amount, game_state.cash)
+    if amount <= game_state.cash:
+        game_state.cash -= amount
+        game_state.li_yuen_relation = 1
+    else:
+        # TODO: Implement Elder Brother Wu loan option
+        game_state.cash = 0
+    record(game_state, EVENT, LI_YUEN_PAID, paid)
+    return paid == amount
+
+
+def answer_offer(game_state: GameState, offer: Offer, accept: bool) -> None:
+    """
+    Answer an offer of a new ship or a gun.
+
+    A new ship has 50 more capacity and no damage. A gun takes up 10 units
+    of cargo space.
+
+    Args:
+        game_state: The game to update
+        offer: The offer made on arrival
+        accept: Whether the player buys
+
+    Raises:
+        GameRuleError: If the player can no longer pay for it or carry it
+    """
+    if not accept:
+        record(game_state, EVENT, OFFER_DECLINED)
+        return
+
+    if offer.price > game_state.cash:
+        raise GameRuleError("You can't afford it, Taipan!")
+    if offer.kind == GUN_OFFER:
+        if game_state.capacity - game_state.hold < GUN_SPACE:
+            raise GameRuleError("You don't have room for it, Taipan!")
+        game_state.guns += 1
+        game_state.capacity -= GUN_SPACE
+    else:
+        game_state.capacity += SHIP_CAPACITY
+        game_state.damage = 0
+    game_state.cash -= offer.price
+    record(game_state, EVENT, OFFER_ACCEPTED)
@@ -0,0 +1,35 @@
+"""
+Starting conditions for a new game of Taipan.
+"""
+
+from ..game_state import GameState
+from ..journal import START, record
+
+
+def start_game(game_state: GameState, with_guns: bool) -> None:
+    """
+    Apply the player's choice of starting conditions, like the C code's cash_or_guns().
+
+    Args:
+        game_state: The game to set up
+        with_guns: Start with five guns and no cash instead of cash and a debt
+    """
+    game_state.hold = 0  # Start with empty hold
+    if not with_guns:
+        # Start with cash and debt
+        game_state.cash = 400
+        game_state.debt = 5000
+        game_state.capacity = 60
+        game_state.guns = 0
+        game_state.li_yuen_relation = 0
+        game_state.battle_probability = 10
+    else:
+        # Start with guns and no cash
+        game_state.cash = 0
+        game_state.debt = 0
+        game_state.capacity = 10
+        game_state.guns = 5
+        game_state.li_yuen_relation = 1
+        #game_state.battle_probability = 7
+        game_state.battle_probability = 1
+    record(game_state, START, with_guns)
@@ -0,0 +1,161 @@
+"""
+Trading, banking and warehouse rules for Taipan.
+"""
+
+from typing import Literal
+
+from ..game_state import GameState
+from ..journal import BUY, DEPOSIT, SELL, TRANSFER, WITHDRAW, record
+from .errors import GameRuleError
+
+# Warehouse capacity in Hong Kong (10000 in the C code)
+WAREHOUSE_CAPACITY = 10000
+
+TransferDirection = Literal["to_warehouse", "to_ship"]
+
+
+def affordable(game_state: GameState, item: int) -> int:
+    """Most units of an item that cash and free hold space allow buying."""
+    return max(0, min(game_state.cash // game_state.price[item], game_state.capacity - game_state.hold))
+
+
+def buy(game_state: GameState, item: int, amount: int) -> None:
+    """
+    Buy cargo at the current port price.
+
+    Args:
+        game_state: The game to update
+        item: Index into ITEMS
+        amount: Number of units to buy
+
+    Raises:
+        GameRuleError: If the purchase is not allowed
+    """
+    if amount <= 0:
+        raise GameRuleError("Amount must be positive")
+
+    total_cost = amount * game_state.price[item]
+    if total_cost > game_state.cash:
+        raise GameRuleError("Not enough cash")
+
+    if game_state.hold + amount > game_state.capacity:
+        raise GameRuleError("Not enough hold space")
+
+    game_state.cash -= total_cost
+    game_state.hold_[item] += amount
+    game_state.hold += amount
+    record(game_state, BUY, item, amount)
+
+
+def sell(game_state: GameState, item: int, amount: int) -> None:
+    """
+    Sell cargo from the hold at the current port price.
+
+    Args:
+        game_state: The game to update
+        item: Index into ITEMS
+        amount: Number of units to sell
+
+    Raises:
+        GameRuleError: If the sale is not allowed
+    """
+    if amount <= 0:
+        raise GameRuleError("Amount must be positive")
+
+    if game_state.hold_[item] < amount:
+        raise GameRuleError("Not enough cargo to sell")
+
+    game_state.cash += amount * game_state.price[item]
+    game_state.hold_[item] -= amount
+    game_state.hold -= amount
+    record(game_state, SELL, item, amount)
+
+
+def deposit(game_state: GameState, amount: int) -> None:
+    """
+    Move cash into the bank.
+
+    Raises:
+        GameRuleError: If the deposit is not allowed
+    """
+    if amount < 0:
+        raise GameRuleError("Amount must be positive")
+
+    if amount > game_state.cash:
+        raise GameRuleError(f"Taipan, you only have ${game_state.format_money(game_state.cash)} in cash.")
+
+    game_state.cash -= amount
+    game_state.bank += amount
+    record(game_state, DEPOSIT, amount)
+
+
+def withdraw(game_state: GameState, amount: int) -> None:
+    """
+    Move money from the bank into cash.
+
+    Raises:
+        GameRuleError: If the withdrawal is not allowed
+    """
+    if amount < 0:
+        raise GameRuleError("Amount must be positive")
+
+    if amount > game_state.bank:
+        raise GameRuleError(f"Taipan, you only have ${game_state.format_money(game_state.bank)} in the bank.")
+
+    game_state.cash += amount
+    game_state.bank -= amount
+    record(game_state, WITHDRAW, amount)
+
+
+def bank(game_state: GameState, deposit_amount: int = 0, withdraw_amount: int = 0) -> None:
+    """
+    Visit the bank: deposit first, then withdraw, like the C code's visit_bank().
+
+    Raises:
+        GameRuleError: If either step is not allowed
+    """
+    deposit(game_state, deposit_amount)
+    withdraw(game_state, withdraw_amount)
+
+
+def transfer(game_state: GameState, item: int, amount: int, direction: TransferDirection) -> None:
+    """
+    Move cargo between the hold and the warehouse.
+
+    Args:
+        game_state: The game to update
+        item: Index into ITEMS
+        amount: Number of units to move
+        direction: "to_warehouse" or "to_ship"
+
+    Raises:
+        GameRuleError: If the transfer is not allowed
+    """
+    if amount < 0:
+        raise GameRuleError("Amount must be positive")
+
+    if direction == "to_warehouse":
+        if amount > game_state.hold_[item]:
+            raise GameRuleError(f"You have only {game_state.hold_[item]}, Taipan.")
+
+        in_use = game_state.total_warehouse
+        if in_use + amount > WAREHOUSE_CAPACITY:
+            if in_use == WAREHOUSE_CAPACITY:
+                raise GameRuleError("Your warehouse is full, Taipan!")
+            raise GameRuleError(f"Your warehouse will only hold an additional {WAREHOUSE_CAPACITY - in_use}, Taipan!")
+
+        game_state.hold_[item] -= amount
+        game_state.warehouse[item] += amount
+        game_state.hold -= amount
+        record(game_state, TRANSFER, item, amount, 0)
+    else:
+        if amount > game_state.warehouse[item]:
+            raise GameRuleError(f"You have only {game_state.warehouse[item]}, Taipan.")
+
+        if game_state.hold + amount > game_state.capacity:
+            raise GameRuleError("Not enough hold space")
+
+        game_state.warehouse[item] -= amount
+        game_state.hold_[item] += amount
+        game_state.hold += amount
+        record(game_state, TRANSFER, item, amount, 1)
@@ -0,0 +1,170 @@
+"""
+Travel rules for Taipan: setting sail, storms and arriving in port.
+"""
+
+from dataclasses import dataclass
+
+from ..game_state import MAX_MONEY, GameState
+from ..journal import ARRIVE, TRAVEL, record, record_state
+from ..profiling import timed
+from .errors import GameRuleError
+
+# Largest fleet that can attack, as in the C code
+MAX_SHIPS = 9999
+
+# Monthly interest on debt and bank balance
+DEBT_INTEREST = 1.1
+BANK_INTEREST = 1.005
+
+# Pirates grow stronger each new year
+ENEMY_HEALTH_GROWTH = 10
+ENEMY_DAMAGE_GROWTH = 0.5
+
+
+@dataclass
+class VoyageReport:
+    """What happened at sea between two ports."""
+
+    storm: bool = False
+    going_down: bool = False
+    sunk: bool = False
+    blown_off_course: bool = False
+    new_year: bool = False
+
+
+def travel(game_state: GameState, port: int) -> int:
+    """
+    Set sail for another port and roll for a pirate attack.
+
+    Args:
+        game_state: The game to update
+        port: Destination port (1-7)
+
+    Returns:
+        The number of hostile ships approaching, 0 if none
+
+    Raises:
+        GameRuleError: If the ship cannot sail to that port
+    """
+    if not 1 <= port <= 7:
+        raise GameRuleError("There is no such port, Taipan!")
+
+    if port == game_state.port:
+        raise GameRuleError("You are already at that port!")
+
+    if game_state.hold > game_state.capacity:
+        raise GameRuleError("Your ship is overloaded! You must lighten your cargo before traveling.")
+
+    game_state.destination_port = port
+
+    events = game_state.rng.events
+    num_ships = 0
+    if game_state.battle_probability > 0 and events.randint(0, game_state.battle_probability - 1) == 0:
+        num_ships = min(events.randint(1, (game_state.capacity // 10) + game_state.guns), MAX_SHIPS)
+
+    record(game_state, TRAVEL, port, num_ships)
+    return num_ships
+
+
+@timed("engine.complete_voyage")
+def complete_voyage(game_state: GameState) -> VoyageReport:
+    """
+    Finish the voyage to the destination port.
+
+    Handles storms, advances the calendar, applies interest and sets the
+    prices for the new port.
+
+    Returns:
+        A report of the events of the voyage. If ``sunk`` is set the ship
+        went down and nothing else was applied.
+    """
+    report = VoyageReport()
+    events = game_state.rng.events
+    game_state.port = game_state.destination_port
+
+    # 1 in 10 chance of storm
+    if events.randint(1, 10) == 1:
+        report.storm = True
+
+        # 1 in 30 chance of sinking
+        if events.randint(1, 30) == 1:
+            report.going_down = True
+            if ((game_state.damage / game_state.capacity * 3) * events.random()) >= 1:
+                report.sunk = True
+                _record_arrival(game_state, report)
+                return report
+
+        # 1 in 3 chance of being blown off course
+        if events.randint(1, 3) == 1:
+            report.blown_off_course = True
+            while game_state.port == game_state.destination_port:
+                game_state.port = events.randint(1, 7)
+
+    # Advance date and apply interest
+    report.new_year = fast_forward(game_state, 1) > 0
+
+    game_state.set_prices()
+    _record_arrival(game_state, report)
+    return report
+
+
+def _record_arrival(game_state: GameState, report: VoyageReport) -> None:
+    """Record the end of a voyage in the game's journal."""
+    record(game_state, ARRIVE, game_state.port, report.storm, report.going_down, report.sunk, report.blown_off_course)
+    record_state(game_state)
+
+
+def compound(amount: int, rate: float, months: int) -> int:
+    """
+    Apply monthly interest for a number of months, truncating every month.
+
+    Gives exactly what ``amount = min(int(amount * rate), MAX_MONEY)`` once
+    a month would. Each month's truncation depends on the whole balance
+    before it, so there is no closed form that keeps it, and the months are
+    run one by one. But a balance stops changing once it is too small to
+    earn a whole unit (below 10 at 10%, below 200 at 0.5%) or reaches
+    MAX_MONEY, and is returned at once. So however many months pass, the
+    loop runs at most the few thousand months it takes to saturate.
+    """
+    for _ in range(months):
+        grown = min(int(amount * rate), MAX_MONEY)
+        if grown == amount:
+            break  # It will never change again
+        amount = grown
+    return amount
+
+
+def fast_forward(game_state: GameState, months: int) -> int:
+    """
+    Advance the calendar, interest and pirate strength by a number of months.
+
+    Does the same as that many voyages' worth of month ends in
+    complete_voyage(), without setting prices or rolling any events.
+    Everything is worked out before the game state is changed.
+
+    Args:
+        game_state: The game to update
+        months: Number of months to pass
+
+    Returns:
+        The number of new years passed
+
+    Raises:
+        GameRuleError: If months is negative
+    """
+    if months < 0:
+        raise GameRuleError("Time only runs forwards, Taipan!")
+
+    elapsed = game_state.month - 1 + months
+    new_years = elapsed // 12
+    debt = compound(game_state.debt, DEBT_INTEREST, months)
+    bank = compound(game_state.bank, BANK_INTEREST, months)
+
+    game_state.month = elapsed % 12 + 1
+    if new_years:
+        game_state.year += new_years
+        game_state.enemy_health += ENEMY_HEALTH_GROWTH * new_years
+        game_state.enemy_damage += ENEMY_DAMAGE_GROWTH * new_years
+    game_state.debt = debt
+    game_state.bank = bank
+    return new_years
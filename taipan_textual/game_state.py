@@ -2,9 +2,14 @@
 Game state for Taipan.
 """
 
-from dataclasses import dataclass, field
-from typing import List
-import random
+from dataclasses import dataclass, field, fields
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional
+
+from .profiling import timed
+from .rng import GameRandom
+
+if TYPE_CHECKING:
+    from .journal import Journal
 
 # Game constants
 BATTLE_NOT_FINISHED = 0
@@ -34,6 +39,9 @@ BASE_PRICES = [
     [1,    10, 11, 12, 13, 14, 15, 16]   # General Cargo
 ]
 
+# Money saturates here instead of overflowing int64 on very long careers
+MAX_MONEY = 2 ** 62
+
 @dataclass
 class GameState:
     """Game state for Taipan."""
@@ -75,22 +83,40 @@ class GameState:
     # Current prices
     price: List[int] = field(default_factory=lambda: [0] * 4)  # price in C code
     
+    # Random number streams for this game
+    rng: GameRandom = field(default_factory=GameRandom, repr=False, compare=False)
+    
+    # Journal the rules record actions in, if any
+    journal: Optional["Journal"] = field(default=None, repr=False, compare=False)
+    
     def __post_init__(self):
         """Initialize prices after object creation."""
         self.set_prices()
     
+    def __getstate__(self) -> dict:
+        # A copy of the game is not journaled
+        state = dict(self.__dict__)
+        state.pop("journal", None)
+        return state
+    
+    @timed("GameState.set_prices")
     def set_prices(self) -> None:
         """Set current prices based on port and base prices."""
         for i in range(4):
             base_price = BASE_PRICES[i][self.port]
-            multiplier = random.randint(1, 3)  # Random multiplier between 1 and 3
+            multiplier = self.rng.prices.randint(1, 3)  # Random multiplier between 1 and 3
             self.price[i] = (base_price // 2) * multiplier * BASE_PRICES[i][0]
     
     @property
     def total_warehouse(self) -> int:
         """Calculate total warehouse space used."""
         return sum(self.warehouse)
-    
+
+    @property
+    def game_time(self) -> int:
+        """Months elapsed since the start of the game (time in C code)."""
+        return ((self.year - 1860) * 12) + self.month
+
     def get_current_location(self) -> str:
         """Get the current location name."""
         return LOCATIONS[self.port]
@@ -121,4 +147,114 @@ class GameState:
     
     def format_money(self, amount: int) -> str:
         """Format money amount with commas."""
-        return f"{amount:,}" 
\ No newline at end of file
+        return f"{amount:,}"
+
+
+# Called with the name of the field that changed
+StateListener = Callable[[str], None]
+
+_MISSING = object()
+
+
+class FieldList(list):
+    """
+    A list field of an ObservableGameState that reports item assignments.
+    
+    Only item assignment is observed; the game's lists have a fixed length.
+    """
+    
+    def __init__(self, iterable: Iterable = (), owner: Optional["ObservableGameState"] = None, name: str = "") -> None:
+        super().__init__(iterable)
+        self._owner = owner
+        self._name = name
+    
+    def __setitem__(self, index, value) -> None:
+        old = list.__getitem__(self, index)
+        list.__setitem__(self, index, value)
+        if old != value and self._owner is not None:
+            self._owner._changed(self._name)
+    
+    def __reduce__(self):
+        # Copies and pickles are plain lists; the owner wraps them again
+        return list, (list(self),)
+
+
+@dataclass
+class ObservableGameState(GameState):
+    """
+    Game state that reports its changes.
+    
+    Every change to a field, including an item of one of its lists, bumps
+    ``version`` and is reported to the listeners subscribed to that field, so
+    views can redraw only what they show. The plain GameState skips this
+    bookkeeping for headless games.
+    """
+    
+    # Changes made since the state was created
+    _version: int = field(default=0, init=False, repr=False, compare=False)
+    
+    # Listeners by the field they watch; None for every field
+    _listeners: Dict[Optional[str], List[StateListener]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    
+    @property
+    def version(self) -> int:
+        """Number of changes made since the state was created."""
+        return self._version
+    
+    def __setattr__(self, name: str, value) -> None:
+        # Fields have no descriptors, so write the instance dict directly
+        state = self.__dict__
+        if name in _LIST_FIELDS and not (isinstance(value, FieldList) and value._owner is self):
+            value = FieldList(value, self, name)
+        old = state.get(name, _MISSING)
+        state[name] = value
+        if old != value and old is not _MISSING and name in _OBSERVED:
+            self._changed(name)
+    
+    def _changed(self, name: str) -> None:
+        """Bump the version and tell the listeners that a field changed."""
+        self._version += 1
+        listeners = self._listeners
+        if listeners:
+            for listener in listeners.get(name, ()):
+                listener(name)
+            for listener in listeners.get(None, ()):
+                listener(name)
+    
+    def __getstate__(self) -> dict:
+        # Listeners belong to the views of the original only
+        state = super().__getstate__()
+        state["_listeners"] = {}
+        return state
+    
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        for name in _LIST_FIELDS:
+            self.__dict__[name] = FieldList(state[name], self, name)
+    
+    def subscribe(self, listener: StateListener, *names: str) -> None:
+        """
+        Call ``listener`` whenever one of the named fields changes.
+        
+        Args:
+            listener: Called with the name of the changed field
+            names: Fields to watch; every field if none are given
+        """
+        unknown = set(names) - _OBSERVED
+        if unknown:
+            raise ValueError(f"Unknown game state fields: {', '.join(sorted(unknown))}")
+        for name in names or (None,):
+            self._listeners.setdefault(name, []).append(listener)
+    
+    def unsubscribe(self, listener: StateListener) -> None:
+        """Stop calling ``listener`` for any field."""
+        for listeners in self._listeners.values():
+            while listener in listeners:
+                listeners.remove(listener)
+
+
+# Fields that report changes, and those among them that are lists
+_OBSERVED = frozenset(f.name for f in fields(GameState) if f.name not in ("rng", "journal"))
+_LIST_FIELDS = frozenset(f.name for f in fields(GameState) if f.type in (List[int], "List[int]"))
@@ -2,31 +2,52 @@
 Main game UI for Taipan using Textual.
 """
 
-from textual.app import App, ComposeResult
-from textual.containers import Container, Vertical, Horizontal
-from textual.widgets import Header, Footer, Static, Button, Input, Label
-from textual.screen import Screen
-from textual import events
-from rich.text import Text
-from rich.panel import Panel
-from rich.table import Table
-from rich.align import Align
+from typing import TYPE_CHECKING, Optional
+import struct
 
-from .game_state import GameState, ITEMS, LOCATIONS
-from .screens import (
-    BuyScreen,
-    SellScreen,
-    BankScreen,
-    TransferScreen,
-    WheedleScreen,
-    RetireScreen,
-    QuitScreen,
-    SetupScreen
+from textual.app import App
+from textual.widgets import Static
+
+from . import screens
+from .game_state import ObservableGameState
+from .journal import Journal
+from .monitor import monitor
+from .profiling import instrument_screens, profiler
+from .save import Autosaver
+from .rng import GameRandom
+from .settings import DEFAULT_ANIMATION_SPEED, next_animation_speed
+
+# Seconds between checks that the autosaves were written
+AUTOSAVE_CHECK_INTERVAL = 1.0
+
+if TYPE_CHECKING:
+    from .battle_odds import BattleOdds
+    from .screens.port_screen import PortScreen
+
+# Screens whose handlers are timed when the profiler is on. Timing loads
+# them all at start-up; otherwise each is loaded the first time it is shown.
+TIMED_SCREENS = (
+    "SetupScreen",
+    "PortScreen",
+    "BuyScreen",
+    "SellScreen",
+    "BankScreen",
+    "TransferScreen",
+    "WheedleScreen",
+    "RetireScreen",
+    "QuitScreen",
+    "BattleScreen",
+    "CompleteTravelScreen",
 )
 
 class TaipanApp(App):
     """Main Taipan application."""
     
+    BINDINGS = [
+        ("f2", "cycle_animation_speed", "Battle speed"),
+        ("f3", "toggle_timings", "Timings"),
+    ]
+    
     CSS = """
     #port-container {
         width: 100%;
@@ -43,11 +64,21 @@ class TaipanApp(App):
         height: 100%;
     }
     
-    #prices {
+    #market {
         width: 100%;
         height: 100%;
     }
     
+    #prices {
+        width: 100%;
+        height: auto;
+    }
+    
+    #advisor {
+        width: 100%;
+        height: 1fr;
+    }
+    
     #actions {
         width: 100%;
         height: 100%;
@@ -65,49 +96,85 @@ class TaipanApp(App):
     }
     """
     
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None, animation_speed: str = DEFAULT_ANIMATION_SPEED,
+                 journal: Optional[Journal] = None, game_state: Optional[ObservableGameState] = None,
+                 autosaver: Optional[Autosaver] = None, battle_odds: Optional["BattleOdds"] = None):
+        """
+        Args:
+            seed: Seed for a new game's random numbers
+            animation_speed: Battle animation speed
+            journal: Journal to record the game's actions in
+            game_state: A saved game to resume instead of starting a new one
+            autosaver: Saves the game on every arrival in port
+            battle_odds: Table the battle screen recommends orders from
+        """
         super().__init__()
-        self.game_state = GameState()
+        if profiler.enabled:
+            instrument_screens(*(getattr(screens, name) for name in TIMED_SCREENS))
+        self.resumed = game_state is not None
+        self.game_state = game_state or ObservableGameState(rng=GameRandom(seed))
+        self.game_state.journal = journal
+        self.autosaver = autosaver
+        self.animation_speed = animation_speed
+        self.battle_odds = battle_odds
     
     def on_mount(self) -> None:
         """Set up the application when it starts."""
-        self.push_screen(SetupScreen(self.game_state))
+        if monitor.enabled:
+            monitor.start()
+        if self.autosaver is not None:
+            self.set_interval(AUTOSAVE_CHECK_INTERVAL, self.check_autosave)
+        if self.resumed:
+            from .screens.port_screen import show_port
+            show_port(self, self.game_state)
+        else:
+            self.push_screen(screens.SetupScreen(self.game_state))
+    
+    def on_port_screen_arrived(self, message: "PortScreen.Arrived") -> None:
+        """Autosave on every arrival in port."""
+        if self.autosaver is not None:
+            try:
+                self.autosaver.save(self.game_state)
+            except (ValueError, struct.error) as error:
+                self.notify(f"The game could not be saved: {error}", severity="error")
+    
+    def check_autosave(self) -> None:
+        """Tell the player if an autosave failed to be written."""
+        if self.autosaver is not None:
+            error = self.autosaver.take_error()
+            if error is not None:
+                self.notify(f"The game could not be saved: {error}", severity="error")
+    
+    def action_cycle_animation_speed(self) -> None:
+        """Switch to the next battle animation speed."""
+        self.animation_speed = next_animation_speed(self.animation_speed)
+        self.notify(f"Battle animation: {self.animation_speed}", severity="information")
     
-    def on_key(self, event: events.Key) -> None:
-        """Handle key press events."""
-        key = event.key.lower()
-        
-        # Map keys to actions
-        action_map = {
-            'b': 'buy',
-            's': 'sell',
-            'v': 'visit_bank',
-            't': 'transfer',
-            'q': 'quit',
-            'w': 'wheedle',
-            'r': 'retire'
-        }
-        
-        if key in action_map:
-            action = action_map[key]
-            self.handle_action(action)
+    def action_toggle_timings(self) -> None:
+        """Show or hide the handler timings."""
+        if isinstance(self.screen, screens.TimingsScreen):
+            self.pop_screen()
+        elif profiler.enabled or monitor.enabled:
+            self.push_screen(screens.TimingsScreen())
+        else:
+            self.notify("Timings are off. Start the game with DEBUG=true, --trace or --monitor.", severity="warning")
     
     def handle_action(self, action: str) -> None:
-        """Handle the selected action."""
+        """Open the screen for an action chosen on the port screen."""
         if action == "buy":
-            self.app.push_screen(BuyScreen(self.game_state))
+            self.app.push_screen(screens.BuyScreen(self.game_state))
         elif action == "sell":
-            self.app.push_screen(SellScreen(self.game_state))
+            self.app.push_screen(screens.SellScreen(self.game_state))
         elif action == "visit_bank":
-            self.app.push_screen(BankScreen(self.game_state))
+            self.app.push_screen(screens.BankScreen(self.game_state))
         elif action == "transfer":
-            self.app.push_screen(TransferScreen(self.game_state))
+            self.app.push_screen(screens.TransferScreen(self.game_state))
         elif action == "quit":
-            self.app.push_screen(QuitScreen(self.game_state))
+            self.app.push_screen(screens.QuitScreen(self.game_state))
         elif action == "wheedle" and self.game_state.port == 1:
-            self.app.push_screen(WheedleScreen(self.game_state))
+            self.app.push_screen(screens.WheedleScreen(self.game_state))
         elif action == "retire" and self.game_state.port == 1:
-            self.app.push_screen(RetireScreen(self.game_state))
+            self.app.push_screen(screens.RetireScreen(self.game_state))
     
     def _update_status(self) -> None:
         """Update the status display."""
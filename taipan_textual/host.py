@@ -0,0 +1,412 @@
+"""
+Host many Taipan games in one process.
+
+Every player connects to a Unix socket and gets their own TaipanApp. All
+the apps run on one asyncio event loop:
+
+    python -m taipan_textual.host serve /run/taipan.sock
+    python -m taipan_textual.host connect /run/taipan.sock
+
+``connect`` is the client. It puts the terminal into raw mode and relays
+keys and window sizes to the host and the screen back to the terminal. It
+is small enough to be an SSH ``ForceCommand``, so logins stop paying for a
+Python process with Textual loaded.
+
+Connections carry frames both ways. Each frame is one type byte, a
+little-endian 16-bit payload length and the payload. The client sends
+``S`` frames with the terminal size (two 16-bit numbers, columns then
+rows) and ``D`` frames with the bytes typed. The first frame must be a
+size frame. The host sends the terminal output unframed.
+
+The sessions share everything that does not change during a game. This
+includes the game tables in game_state, the battle sprites, the compiled
+panel templates and the imported modules. It also includes Textual's
+parsed CSS, shared through SharedParseCache. What each session keeps to
+itself is its app, its screens and widgets and its GameState. With 100
+sessions at 80x24, that came to about 0.55 MB of Python objects and
+1.5 MB of resident memory a session. Most of it is Textual's widget tree
+and compositor. Sharing the CSS saves about 0.1 MB of that.
+"""
+
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+import argparse
+import asyncio
+import codecs
+import logging
+import os
+import selectors
+import signal
+import socket
+import struct
+import sys
+
+from textual import events
+# Textual has no public input parser; its own drivers use this one, and the
+# ^0.54 pin in pyproject.toml keeps it where it is
+from textual._xterm_parser import XTermParser
+from textual.cache import LRUCache
+from textual.driver import Driver
+from textual.geometry import Size
+
+from .game_ui import TaipanApp
+
+log = logging.getLogger(__name__)
+
+# Frame header: type and payload length
+FRAME = struct.Struct("<cH")
+DATA = b"D"
+SIZE = b"S"
+TERMINAL_SIZE = struct.Struct("<HH")
+
+# Largest payload in one frame
+MAX_PAYLOAD = 0xFFFF
+
+# Sessions served at once; later connections are turned away
+DEFAULT_MAX_SESSIONS = 500
+
+# Terminal output a session may leave unsent before it is dropped. A client
+# that stops reading must not make the host hold its screen updates forever.
+MAX_UNSENT = 1 << 20
+
+# Seconds sessions get to end when the host closes
+CLOSE_TIMEOUT = 5.0
+
+# Written to a terminal when a game starts and ends
+_START_TERMINAL = "\x1b[?1049h\x1b[?25l"  # Alternate screen, hide the cursor
+_RESTORE_TERMINAL = "\x1b[?1049l\x1b[?25h"
+
+
+def pack_frame(kind: bytes, payload: bytes = b"") -> bytes:
+    """Frame a payload for the connection."""
+    return FRAME.pack(kind, len(payload)) + payload
+
+
+def pack_size(columns: int, rows: int) -> bytes:
+    """A size frame."""
+    return pack_frame(SIZE, TERMINAL_SIZE.pack(columns, rows))
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Tuple[bytes, bytes]:
+    """
+    Read one frame.
+
+    Raises:
+        asyncio.IncompleteReadError: If the connection closes part way
+    """
+    kind, length = FRAME.unpack(await reader.readexactly(FRAME.size))
+    return kind, await reader.readexactly(length)
+
+
+class SharedParseCache:
+    """
+    Parsed CSS shared by the stylesheets of every session.
+
+    Textual parses an app's CSS and the default CSS of every widget class
+    into rules again for each app. This cache lets the parsed rules be
+    shared instead. Textual never changes rules after parsing them. Rules
+    depend on the stylesheet's variables, so the cache is keyed on those
+    too. A session that changes theme gets its own rules and does not
+    clear anyone else's.
+    """
+
+    def __init__(self, maxsize: int = 1024, max_variables: int = 64) -> None:
+        self._rules: LRUCache = LRUCache(maxsize)
+        # Variable dicts seen recently, by identity. Bounded, so the dicts
+        # of sessions that have ended are let go.
+        self._variable_keys: LRUCache[int, Tuple[Dict[str, str], Hashable]] = LRUCache(max_variables)
+
+    def for_stylesheet(self, stylesheet) -> "_StylesheetParseCache":
+        """The view of the cache for one app's stylesheet."""
+        return _StylesheetParseCache(self, stylesheet)
+
+    def _variables_key(self, variables: Dict[str, str]) -> Hashable:
+        # Textual replaces the dict when the variables change, so it can be
+        # recognized by identity. The dict is kept with its key so that its
+        # id is not reused while it is in the table.
+        entry = self._variable_keys.get(id(variables))
+        if entry is None or entry[0] is not variables:
+            entry = (variables, tuple(sorted(variables.items())))
+            self._variable_keys[id(variables)] = entry
+        return entry[1]
+
+
+class _StylesheetParseCache:
+    """What a Stylesheet expects of its parse cache, backed by the shared one."""
+
+    def __init__(self, shared: SharedParseCache, stylesheet) -> None:
+        self._shared = shared
+        self._stylesheet = stylesheet
+
+    def _key(self, key: Hashable) -> Hashable:
+        return (self._shared._variables_key(self._stylesheet._variables), key)
+
+    def __getitem__(self, key: Hashable):
+        return self._shared._rules[self._key(key)]
+
+    def __setitem__(self, key: Hashable, rules) -> None:
+        self._shared._rules[self._key(key)] = rules
+
+    def clear(self) -> None:
+        """Nothing to do: rules for other variables are keyed apart."""
+
+
+# Shared by every session in the process
+parse_cache = SharedParseCache()
+
+
+class SessionDriver(Driver):
+    """Drives a hosted app over its connection instead of the terminal."""
+
+    def __init__(self, app: "HostedApp", *, debug: bool = False, size: Optional[Tuple[int, int]] = None) -> None:
+        super().__init__(app, debug=debug, size=size)
+        self._reader = app.reader
+        self._writer = app.writer
+        self._parser = XTermParser(lambda: False)
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._input: Optional[asyncio.Task] = None
+
+    def send_event(self, event: events.Event) -> None:
+        # Input is read on the app's own loop, so no thread hand-off is needed
+        self._app.post_message(event)
+
+    def write(self, data: str) -> None:
+        """Queue output for the player's terminal."""
+        if self._writer.is_closing():
+            return
+        self._writer.write(data.encode("utf-8"))
+        if self._writer.transport.get_write_buffer_size() > MAX_UNSENT:
+            log.warning("Dropping a session that stopped reading")
+            self._writer.transport.abort()
+
+    def start_application_mode(self) -> None:
+        """Start the game in the player's terminal and read their input."""
+        self.write(_START_TERMINAL)
+        self._send_size(*(self._size or HostedApp.DEFAULT_SIZE))
+        self._input = asyncio.create_task(self._read_input(), name="taipan-session-input")
+
+    def _send_size(self, columns: int, rows: int) -> None:
+        size = Size(columns, rows)
+        self.send_event(events.Resize(size, size))
+
+    async def _read_input(self) -> None:
+        try:
+            while True:
+                kind, payload = await read_frame(self._reader)
+                if kind == DATA:
+                    for event in self._parser.feed(self._decoder.decode(payload)):
+                        self.process_event(event)
+                elif kind == SIZE and len(payload) == TERMINAL_SIZE.size:
+                    self._send_size(*TERMINAL_SIZE.unpack(payload))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            self._app.exit()  # The player has gone
+
+    def disable_input(self) -> None:
+        """Stop reading the player's input."""
+        if self._input is not None:
+            self._input.cancel()
+            self._input = None
+
+    def stop_application_mode(self) -> None:
+        """Give the player's terminal back."""
+        self.disable_input()
+        self.write(_RESTORE_TERMINAL)
+
+
+class HostedApp(TaipanApp):
+    """A game played over a host connection."""
+
+    DEFAULT_SIZE = (80, 24)
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, **kwargs) -> None:
+        """
+        Args:
+            reader: The connection's input, after its first size frame
+            writer: The connection's output
+            kwargs: Passed on to TaipanApp
+        """
+        super().__init__(**kwargs)
+        self.reader = reader
+        self.writer = writer
+        self.driver_class = SessionDriver
+        # Stylesheet has no hook for its parse cache. The stand-in only needs
+        # the item access and clear() that Stylesheet uses, not an LRUCache.
+        self.stylesheet._parse_cache = parse_cache.for_stylesheet(self.stylesheet)  # type: ignore[assignment]
+
+
+class Host:
+    """Serves a game to every connection on a Unix socket."""
+
+    def __init__(self, path: str, max_sessions: int = DEFAULT_MAX_SESSIONS, animation_speed: Optional[str] = None) -> None:
+        self.path = path
+        self.max_sessions = max_sessions
+        self.animation_speed = animation_speed
+        self.sessions: Set[HostedApp] = set()
+        self.served = 0  # Sessions started
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._tasks: Set[asyncio.Task] = set()  # Serving connections
+        self._streams = sys.stdout, sys.stderr
+
+    async def start(self) -> None:
+        """Start listening."""
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # Left by a host that did not shut down
+        self._streams = sys.stdout, sys.stderr
+        self._server = await asyncio.start_unix_server(self._serve_session, path=self.path)
+        log.info("Serving Taipan on %s", self.path)
+
+    async def serve_forever(self) -> None:
+        """Start listening and serve until cancelled."""
+        await self.start()
+        assert self._server is not None
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """Stop listening and end every session."""
+        if self._server is not None:
+            self._server.close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+        for app in list(self.sessions):
+            app.exit()
+        if self._tasks:
+            # Connections that have not sent their size yet have no game to end
+            _, waiting = await asyncio.wait(set(self._tasks), timeout=CLOSE_TIMEOUT)
+            for task in waiting:
+                task.cancel()
+            await asyncio.gather(*waiting, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+            self._server = None
+            # Each app redirects sys.stdout and sys.stderr while it runs, and
+            # apps that overlap restore each other's, so put back the originals
+            sys.stdout, sys.stderr = self._streams
+
+    async def _serve_session(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        assert task is not None
+        self._tasks.add(task)
+        try:
+            try:
+                kind, payload = await read_frame(reader)
+            except asyncio.IncompleteReadError:
+                return
+            if len(self.sessions) >= self.max_sessions:
+                writer.write(b"Taipan is full, try again later.\r\n")
+                return
+            if kind != SIZE or len(payload) != TERMINAL_SIZE.size:
+                writer.write(b"Connect with: python -m taipan_textual.host connect\r\n")
+                return
+
+            kwargs = {} if self.animation_speed is None else {"animation_speed": self.animation_speed}
+            app = HostedApp(reader, writer, **kwargs)
+            self.sessions.add(app)
+            self.served += 1
+            log.info("Session %d started, %d playing", self.served, len(self.sessions))
+            try:
+                await app.run_async(size=TERMINAL_SIZE.unpack(payload))
+            finally:
+                self.sessions.discard(app)
+                log.info("Session ended, %d playing", len(self.sessions))
+        finally:
+            writer.close()
+            self._tasks.discard(task)
+
+
+def connect(path: str) -> int:
+    """
+    Play on a host from this terminal.
+
+    Returns:
+        The exit status
+    """
+    import termios
+    import tty
+
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(path)
+    except OSError as error:
+        print(f"Cannot connect to {path}: {error}", file=sys.stderr)
+        return 1
+
+    stdin, stdout = sys.stdin.fileno(), sys.stdout.fileno()
+    resized, resize_wakeup = os.pipe()
+    os.set_blocking(resize_wakeup, False)
+    previous_wakeup = signal.set_wakeup_fd(resize_wakeup)
+    previous_handler = signal.signal(signal.SIGWINCH, lambda signum, frame: None)
+    attributes = termios.tcgetattr(stdin)
+    tty.setraw(stdin)
+
+    selector = selectors.DefaultSelector()
+    selector.register(stdin, selectors.EVENT_READ)
+    selector.register(connection, selectors.EVENT_READ)
+    selector.register(resized, selectors.EVENT_READ)
+    try:
+        connection.sendall(pack_size(*os.get_terminal_size(stdout)))
+        while True:
+            for key, _ in selector.select():
+                if key.fd == stdin:
+                    data = os.read(stdin, MAX_PAYLOAD)
+                    if not data:
+                        return 0
+                    connection.sendall(pack_frame(DATA, data))
+                elif key.fd == resized:
+                    os.read(resized, 512)
+                    connection.sendall(pack_size(*os.get_terminal_size(stdout)))
+                else:
+                    data = connection.recv(1 << 16)
+                    if not data:
+                        return 0  # The game is over
+                    os.write(stdout, data)
+    except ConnectionError:
+        return 0
+    finally:
+        termios.tcsetattr(stdin, termios.TCSADRAIN, attributes)
+        signal.signal(signal.SIGWINCH, previous_handler)
+        signal.set_wakeup_fd(previous_wakeup)
+        selector.close()
+        connection.close()
+        for fd in (resized, resize_wakeup):
+            os.close(fd)
+
+
+# For --help; the module docstring is stripped under python -OO
+DESCRIPTION = "Host many Taipan games in one process."
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Serve games or connect to a host from the command line."""
+    from .settings import ANIMATION_SPEEDS
+
+    parser = argparse.ArgumentParser(prog="python -m taipan_textual.host", description=DESCRIPTION)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="serve games on a Unix socket")
+    serve.add_argument("socket", metavar="SOCKET")
+    serve.add_argument("--max-sessions", type=int, default=DEFAULT_MAX_SESSIONS,
+                       help=f"games served at once (default: {DEFAULT_MAX_SESSIONS})")
+    serve.add_argument("--speed", choices=list(ANIMATION_SPEEDS), help="battle animation speed for every game")
+
+    play = commands.add_parser("connect", help="play a game on a host")
+    play.add_argument("socket", metavar="SOCKET")
+    args = parser.parse_args(argv)
+
+    if args.command == "connect":
+        return connect(args.socket)
+
+    # The apps redirect sys.stdout and sys.stderr while they run, so the
+    # host logs to the process's own stderr
+    logging.basicConfig(stream=sys.__stderr__, level=logging.INFO, format="%(asctime)s %(message)s")
+    host = Host(args.socket, args.max_sessions, args.speed)
+    try:
+        asyncio.run(host.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
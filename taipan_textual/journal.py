@@ -0,0 +1,238 @@
+"""
+Append-only journal of the actions in a game of Taipan.
+
+Every rule that changes the game records an entry when a journal is
+attached to the game state: trades, banking, transfers, voyages, battle
+orders and results, and port events. Each entry carries the game's seed and
+the state version after the action, and every arrival in port is followed by
+a snapshot of the game's numbers, so a journal can be checked against a
+replay of the game and cut at any point.
+
+The file is a magic header followed by fixed-layout little-endian records:
+
+    kind (u8), argument count (u8), seed (u64), version (u64), time (f64),
+    then the arguments (i64 each, saturated at the int64 limits)
+
+Records are written through a buffer and flushed with every snapshot,
+so a crash loses at most the current voyage. A partial record at the end of
+the file is ignored when reading, and cut off when the journal is reopened
+so that new records follow the last complete one.
+"""
+
+from typing import TYPE_CHECKING, BinaryIO, Dict, Iterator, NamedTuple, Optional, Tuple
+import struct
+import time
+
+if TYPE_CHECKING:
+    from .game_state import GameState
+
+MAGIC = b"TAIPANJ1"
+
+# Entry kinds
+START = 1  # with_guns
+BUY = 2  # item, amount
+SELL = 3  # item, amount
+DEPOSIT = 4  # amount
+WITHDRAW = 5  # amount
+TRANSFER = 6  # item, amount, direction (0 = to warehouse, 1 = to ship)
+TRAVEL = 7  # destination port, hostile ships
+ARRIVE = 8  # port, storm, going down, sunk, blown off course
+BATTLE_ORDER = 9  # order (FIGHT, RUN or THROW_CARGO)
+BATTLE_END = 10  # result, booty
+EVENT = 11  # event code, values
+STATE = 12  # the values of STATE_FIELDS
+
+KIND_NAMES = {
+    START: "start",
+    BUY: "buy",
+    SELL: "sell",
+    DEPOSIT: "deposit",
+    WITHDRAW: "withdraw",
+    TRANSFER: "transfer",
+    TRAVEL: "travel",
+    ARRIVE: "arrive",
+    BATTLE_ORDER: "battle_order",
+    BATTLE_END: "battle_end",
+    EVENT: "event",
+    STATE: "state",
+}
+
+# Event codes for EVENT entries
+LI_YUEN_DEMAND = 1  # amount
+LI_YUEN_PAID = 2  # amount
+LI_YUEN_REFUSED = 3
+SHIP_OFFER = 4  # price
+GUN_OFFER = 5  # price
+OFFER_ACCEPTED = 6
+OFFER_DECLINED = 7
+OPIUM_SEIZED = 8  # opium lost, fine
+GOODS_STOLEN = 9  # units stolen from the warehouse, item by item
+LI_YUEN_RELATION = 10  # new relation
+LI_YUEN_SUMMONS = 11
+PRICE_CHANGE = 12  # item, old price, new price
+ROBBED = 13  # amount
+
+# Game state fields in a STATE snapshot; the cargo lists are stored item by item
+STATE_FIELDS = (
+    "port", "month", "year", "cash", "bank", "debt", "capacity", "guns", "hold", "damage",
+    "li_yuen_relation", "hold_", "warehouse",
+)
+
+# Transfer directions as stored
+TRANSFER_DIRECTIONS = ("to_warehouse", "to_ship")
+
+_HEADER = struct.Struct("<BBQQd")
+_SEED_MASK = (1 << 64) - 1
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+_RECORDS: Dict[int, struct.Struct] = {}
+
+
+def _record_struct(count: int) -> struct.Struct:
+    """Layout of a record with ``count`` arguments."""
+    layout = _RECORDS.get(count)
+    if layout is None:
+        layout = _RECORDS[count] = struct.Struct(_HEADER.format + "q" * count)
+    return layout
+
+
+def _int64(value: int) -> int:
+    """A value saturated to fit an i64 argument."""
+    return min(max(value, _INT64_MIN), _INT64_MAX)
+
+
+def _complete_length(data: bytes) -> int:
+    """Length of the header and the complete records a journal's data starts with."""
+    offset = len(MAGIC)
+    while offset + _HEADER.size <= len(data):
+        end = offset + _HEADER.size + 8 * data[offset + 1]
+        if end > len(data):
+            break  # Cut off mid-record
+        offset = end
+    return offset
+
+
+class Entry(NamedTuple):
+    """One action read back from a journal."""
+
+    kind: int
+    seed: int
+    version: int
+    time: float
+    args: Tuple[int, ...]
+
+    @property
+    def name(self) -> str:
+        return KIND_NAMES.get(self.kind, str(self.kind))
+
+
+class Journal:
+    """
+    An append-only binary journal file.
+
+    Reopening a journal cut off mid-record by a crash drops the partial
+    record, so the entries appended after it can be read back.
+
+    Raises:
+        ValueError: If the file exists and is not a journal
+    """
+
+    def __init__(self, path: str, buffer_size: int = 64 * 1024) -> None:
+        self.path = path
+        self.entries = 0  # Entries written by this journal
+        self._file: Optional[BinaryIO] = None
+        try:
+            with open(path, "rb") as handle:
+                data = handle.read()
+        except FileNotFoundError:
+            data = b""
+        if len(data) < len(MAGIC) and MAGIC.startswith(data):
+            complete = 0  # New, or cut off in the header
+        elif data.startswith(MAGIC):
+            complete = _complete_length(data)
+        else:
+            raise ValueError(f"{path} is not a Taipan journal")
+
+        self._file = open(path, "ab", buffering=buffer_size)
+        if complete < len(data):
+            self._file.truncate(complete)
+        if complete == 0:
+            self._file.write(MAGIC)
+
+    def write(self, kind: int, game_state: "GameState", args: Tuple[int, ...] = ()) -> None:
+        """Append an entry for an action that has just been applied."""
+        if self._file is None:
+            raise ValueError("Journal is closed")
+        version = getattr(game_state, "version", 0)
+        record = _record_struct(len(args)).pack(
+            kind, len(args), game_state.rng.seed & _SEED_MASK, version, time.time(), *map(_int64, args)
+        )
+        self._file.write(record)
+        self.entries += 1
+        if kind == STATE:
+            self._file.flush()
+
+    def flush(self) -> None:
+        """Write buffered entries to the file."""
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self) -> None:
+        """Flush and close the file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def record(game_state: "GameState", kind: int, *args: int) -> None:
+    """Record an action in the game's journal, if it has one."""
+    journal = game_state.journal
+    if journal is not None:
+        journal.write(kind, game_state, args)
+
+
+def state_values(game_state: "GameState") -> Tuple[int, ...]:
+    """The values of a game state as stored in a STATE snapshot, saturated to fit."""
+    values = []
+    for name in STATE_FIELDS:
+        value = getattr(game_state, name)
+        if isinstance(value, list):
+            values.extend(map(_int64, value))
+        else:
+            values.append(_int64(int(value)))
+    return tuple(values)
+
+
+def record_state(game_state: "GameState") -> None:
+    """Record a snapshot of the game in its journal, if it has one."""
+    journal = game_state.journal
+    if journal is not None:
+        journal.write(STATE, game_state, state_values(game_state))
+
+
+def read_journal(path: str) -> Iterator[Entry]:
+    """
+    Read the entries of a journal file in order.
+
+    Raises:
+        ValueError: If the file is not a journal
+    """
+    with open(path, "rb") as handle:
+        data = handle.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} is not a Taipan journal")
+
+    offset = len(MAGIC)
+    complete = _complete_length(data)
+    while offset < complete:
+        kind, count, seed, version, stamp = _HEADER.unpack_from(data, offset)
+        end = offset + _HEADER.size + 8 * count
+        args = struct.unpack_from(f"<{count}q", data, offset + _HEADER.size)
+        yield Entry(kind, seed, version, stamp, args)
+        offset = end
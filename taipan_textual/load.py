@@ -0,0 +1,369 @@
+"""
+Load generator for hosting Taipan.
+
+Runs many headless games at once, in one or more processes, each played by
+a random but valid player that trades, banks, travels and fights. It
+reports what a host serving that many players would see:
+
+    python -m taipan_textual.load --sessions 200 --processes 4 --duration 30
+
+- throughput: keys and player actions handled per second
+- keypress latency: from a key being sent to the frame drawn after it
+- event loop lag: how late a 10 ms timer fires, the delay every session's
+  next key sees on top of its own work
+- memory: resident memory added per session, on top of the imported game
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Awaitable, Callable, List, Optional
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import sys
+
+from . import screens
+from .bench import SIZE, BenchApp, Session
+from .engine import affordable
+from .screens.bank_screen import BankScreen
+from .screens.battle_screen import BattleScreen
+from .screens.buy_screen import BuyScreen
+from .screens.port_screen import PortScreen
+from .screens.quit_screen import QuitScreen
+from .screens.sell_screen import SellScreen
+from .screens.transfer_screen import TransferScreen
+
+# Seconds between event loop lag samples
+LAG_INTERVAL = 0.01
+
+# Seconds between memory samples
+MEMORY_INTERVAL = 0.5
+
+# Seconds to wait when a game is busy, e.g. animating a battle
+POLL_INTERVAL = 0.01
+
+# Keys of the cargo items
+CARGO_KEYS = "osag"
+
+# Weights of the actions a player picks in port
+PORT_ACTIONS = {"b": 3, "s": 3, "v": 1, "t": 1, "q": 2}
+
+
+def resident_memory() -> int:
+    """Resident memory of this process, in bytes."""
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+
+        # Only the peak is available; macOS reports bytes, other systems kilobytes
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _amount(rng: random.Random, largest: int, smallest: int = 1) -> List[str]:
+    """Keys to type a random amount up to largest."""
+    return [*str(rng.randint(smallest, max(smallest, largest))), "enter"]
+
+
+class Player:
+    """Picks random but valid keys for whatever screen a game is on."""
+
+    def __init__(self, rng: random.Random) -> None:
+        self.rng = rng
+
+    def keys(self, screen: object) -> List[str]:
+        """
+        The next keys to press.
+
+        Returns:
+            The keys, or none if the game is busy and should be waited for
+        """
+        rng = self.rng
+        if isinstance(screen, PortScreen):
+            gs = screen.game_state
+            if screen.pending_question is not None:
+                return [rng.choice("yn")]
+            actions = dict(PORT_ACTIONS)
+            if not any(affordable(gs, item) for item in range(len(CARGO_KEYS))):
+                del actions["b"]
+            if not any(gs.hold_):
+                del actions["s"]
+            if not any(gs.hold_) and not any(gs.warehouse):
+                del actions["t"]
+            if gs.hold > gs.capacity:
+                del actions["q"]
+            return rng.choices(list(actions), weights=list(actions.values()))
+
+        if isinstance(screen, BuyScreen):
+            items = [item for item in range(len(CARGO_KEYS)) if affordable(screen.game_state, item)]
+            if screen.selected_cargo is not None or not items:
+                return ["q"]
+            item = rng.choice(items)
+            return [CARGO_KEYS[item], *_amount(rng, affordable(screen.game_state, item))]
+
+        if isinstance(screen, SellScreen):
+            hold = screen.game_state.hold_
+            items = [item for item in range(len(CARGO_KEYS)) if hold[item]]
+            if screen.selected_cargo is not None or not items:
+                return ["q"]
+            item = rng.choice(items)
+            return [CARGO_KEYS[item], *_amount(rng, hold[item])]
+
+        if isinstance(screen, BankScreen):
+            gs = screen.game_state
+            return _amount(rng, gs.cash if screen.stage == "deposit" else gs.bank, smallest=0)
+
+        if isinstance(screen, TransferScreen):
+            gs = screen.game_state
+            if screen.direction is None:
+                return []
+            stock = gs.hold_ if screen.direction == "to_warehouse" else gs.warehouse
+            return _amount(rng, stock[screen.current_cargo], smallest=0)
+
+        if isinstance(screen, QuitScreen):
+            ports = [port for port in range(1, 8) if port != screen.game_state.port]
+            return [str(rng.choice(ports))]
+
+        if isinstance(screen, BattleScreen) and screen.orders == 0:
+            return rng.choices("fr", weights=(2, 1))
+
+        return []
+
+
+@dataclass
+class LoadResult:
+    """What a load run measured."""
+
+    sessions: int
+    seconds: float  # Time the sessions played for
+    keys: int
+    actions: int  # Keys chosen at once, e.g. an item and its amount
+    failures: int  # Sessions that raised
+    memory_per_session: float  # Bytes
+    latencies: List[float] = field(default_factory=list)  # Seconds per key
+    lags: List[float] = field(default_factory=list)  # Seconds per lag sample
+
+    @classmethod
+    def merge(cls, results: List["LoadResult"]) -> "LoadResult":
+        """Combine the results of several processes."""
+        sessions = sum(result.sessions for result in results)
+        return cls(
+            sessions=sessions,
+            seconds=max(result.seconds for result in results),
+            keys=sum(result.keys for result in results),
+            actions=sum(result.actions for result in results),
+            failures=sum(result.failures for result in results),
+            memory_per_session=sum(result.memory_per_session * result.sessions for result in results) / max(sessions, 1),
+            latencies=[latency for result in results for latency in result.latencies],
+            lags=[lag for result in results for lag in result.lags],
+        )
+
+
+class PlayerSession(Session):
+    """A session that also counts the player's actions."""
+
+    actions = 0
+
+
+async def _start_game(session: Session) -> None:
+    await session.type("Load")
+    await session.press("enter", "1")
+
+
+async def play_session(seed: int, think: float, speed: str, start: Callable[[], Awaitable[float]]) -> PlayerSession:
+    """
+    Set up a game and play it with a random player until the deadline.
+
+    Args:
+        seed: Seed for the game and the player
+        think: Seconds the player waits between actions
+        speed: Battle animation speed
+        start: Awaited once the game is set up; returns the event loop
+            time to stop playing at
+    """
+    loop = asyncio.get_running_loop()
+    app = BenchApp(seed=seed, animation_speed=speed)
+    player = Player(random.Random(seed))
+    async with app.run_test(size=SIZE) as pilot:
+        session = PlayerSession(app, pilot)
+        await session.untimed(_start_game)
+        deadline = await start()
+        while loop.time() < deadline:
+            keys = player.keys(app.screen)
+            if not keys:
+                await asyncio.sleep(POLL_INTERVAL)
+                continue
+            await session.press(*keys)
+            session.actions += 1
+            if think:
+                await asyncio.sleep(think)
+    return session
+
+
+async def run_sessions(count: int, first_seed: int = 0, duration: float = 10.0, think: float = 0.0,
+                       speed: str = "normal") -> LoadResult:
+    """Play games in this process's event loop and measure them."""
+    for name in screens.__all__:
+        getattr(screens, name)  # Load every screen now, so it is not counted per session
+    gc.collect()
+    baseline = peak = resident_memory()
+    loop = asyncio.get_running_loop()
+    lags: List[float] = []
+    running = True
+
+    async def watch_loop() -> None:
+        while running:
+            expected = loop.time() + LAG_INTERVAL
+            await asyncio.sleep(LAG_INTERVAL)
+            lags.append(max(0.0, loop.time() - expected))
+
+    async def watch_memory() -> None:
+        nonlocal peak
+        while running:
+            peak = max(peak, resident_memory())
+            await asyncio.sleep(MEMORY_INTERVAL)
+
+    # The clock starts once every game is set up, so every session plays
+    # for the same time and setting up does not count
+    ready = 0
+    all_ready = asyncio.Event()
+    deadline = 0.0
+
+    async def start() -> float:
+        nonlocal ready, deadline
+        ready += 1
+        if ready == count:
+            lags.clear()
+            deadline = loop.time() + duration
+            all_ready.set()
+        await all_ready.wait()
+        return deadline
+
+    async def play(seed: int) -> PlayerSession:
+        joined = False
+
+        async def join() -> float:
+            nonlocal joined
+            joined = True
+            return await start()
+
+        try:
+            return await play_session(seed, think, speed, join)
+        finally:
+            if not joined:
+                await start()  # A session that failed to start must not hold the others back
+
+    # Each app redirects sys.stdout and sys.stderr while it runs. Apps that
+    # overlap restore each other's redirections, so put back the originals.
+    stdout, stderr = sys.stdout, sys.stderr
+    watchers = [asyncio.create_task(watch_loop()), asyncio.create_task(watch_memory())]
+    try:
+        results = await asyncio.gather(*(play(first_seed + index) for index in range(count)), return_exceptions=True)
+    finally:
+        sys.stdout, sys.stderr = stdout, stderr
+    seconds = loop.time() - (deadline - duration)
+    running = False
+    await asyncio.gather(*watchers)
+
+    played = [result for result in results if isinstance(result, PlayerSession)]
+    for seed, result in enumerate(results, first_seed):
+        if isinstance(result, BaseException):
+            print(f"Session with seed {seed} failed: {result!r}", file=sys.stderr)
+    return LoadResult(
+        sessions=count,
+        seconds=seconds,
+        keys=sum(len(session.latencies) for session in played),
+        actions=sum(session.actions for session in played),
+        failures=count - len(played),
+        memory_per_session=(peak - baseline) / count,
+        latencies=[latency for session in played for latency in session.latencies],
+        lags=lags,
+    )
+
+
+def _run_process(count: int, first_seed: int, duration: float, think: float, speed: str) -> LoadResult:
+    return asyncio.run(run_sessions(count, first_seed, duration, think, speed))
+
+
+def run_load(sessions: int, processes: int = 1, duration: float = 10.0, think: float = 0.0,
+             speed: str = "normal", seed: int = 0) -> LoadResult:
+    """
+    Play games across processes and combine what they measured.
+
+    Sessions are shared out as evenly as possible. Each process has its own
+    event loop, like one host process per core.
+    """
+    processes = max(1, min(processes, sessions))
+    counts = [sessions // processes + (index < sessions % processes) for index in range(processes)]
+    seeds = [seed + sum(counts[:index]) for index in range(processes)]
+    if processes == 1:
+        return _run_process(sessions, seed, duration, think, speed)
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [executor.submit(_run_process, count, first, duration, think, speed) for count, first in zip(counts, seeds)]
+        return LoadResult.merge([future.result() for future in futures])
+
+
+def _percentiles_ms(values: List[float]) -> str:
+    if not values:
+        return "no samples"
+    ordered = sorted(values)
+    parts = []
+    for label, fraction in (("p50", 0.5), ("p99", 0.99), ("p99.9", 0.999)):
+        parts.append(f"{label} {ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000:.2f}ms")
+    parts.append(f"max {ordered[-1] * 1000:.2f}ms")
+    return ", ".join(parts)
+
+
+def summarize(result: LoadResult, processes: int) -> str:
+    """Format what a load run measured."""
+    seconds = result.seconds or 1.0
+    lines = [
+        f"Sessions:    {result.sessions:,} in {processes} process(es), {result.seconds:.1f}s of play",
+        f"Throughput:  {result.keys / seconds:,.0f} keys/sec, {result.actions / seconds:,.0f} actions/sec",
+        f"Latency:     {_percentiles_ms(result.latencies)}",
+        f"Loop lag:    {_percentiles_ms(result.lags)}",
+        f"Memory:      {result.memory_per_session / 2**20:.2f} MB per session",
+    ]
+    if result.failures:
+        lines.append(f"Failures:    {result.failures:,} session(s) raised")
+    return "\n".join(lines)
+
+
+# For --help; the module docstring is stripped under python -OO
+DESCRIPTION = "Load generator for hosting Taipan."
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run a load test from the command line."""
+    from .settings import ANIMATION_SPEEDS
+
+    parser = argparse.ArgumentParser(prog="python -m taipan_textual.load", description=DESCRIPTION)
+    parser.add_argument("--sessions", type=int, default=50, help="games played at once (default: 50)")
+    parser.add_argument("--processes", type=int, default=1, help="processes to share them between (default: 1)")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of play (default: 10)")
+    parser.add_argument("--think", type=float, default=0.0, metavar="SECONDS",
+                        help="pause between a player's actions; 0 plays flat out (default: 0)")
+    parser.add_argument("--speed", choices=list(ANIMATION_SPEEDS), default="normal", help="battle animation speed (default: normal)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first session; the others follow it (default: 0)")
+    parser.add_argument("--output", metavar="JSON", help="also write the summary numbers to this file")
+    args = parser.parse_args(argv)
+    if args.sessions < 1 or args.processes < 1:
+        parser.error("--sessions and --processes must be at least 1")
+
+    result = run_load(args.sessions, args.processes, args.duration, args.think, args.speed, args.seed)
+    print(summarize(result, min(args.processes, args.sessions)))
+    if args.output:
+        numbers = {key: value for key, value in asdict(result).items() if key not in ("latencies", "lags")}
+        with open(args.output, "w") as handle:
+            json.dump(numbers, handle, indent=2)
+            handle.write("\n")
+    return 1 if result.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+"""
+Event loop lag and frame time monitoring.
+
+The monitor is off unless something calls ``monitor.enable()``, which the
+game does when run with ``--monitor PATH`` or ``DEBUG=true``. Once the app
+has started it:
+
+- samples event loop lag: how late a 10 ms sleep wakes up, which is how
+  long any key or timer would have waited
+- times every frame a screen draws, layout included
+- watches for stalls from a background thread. When the loop has not come
+  round for longer than ``stall_ms`` it records where the loop thread is,
+  so blocking code in a handler or a battle worker shows up by name, and
+  so do garbage collection pauses.
+
+Lag and frame times go into HDR-style histograms, which keep about two
+significant digits of every value in a fixed amount of memory. The F3
+timings screen shows them with the latest stalls. ``write_json`` dumps
+them, which the game does on exit.
+"""
+
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+import asyncio
+import gc
+import json
+import logging
+import sys
+import threading
+import time
+import traceback
+
+log = logging.getLogger(__name__)
+
+# Seconds between event loop lag samples
+SAMPLE_INTERVAL = 0.01
+
+# A stall is the loop not coming round for longer than this
+DEFAULT_STALL_MS = 50.0
+
+# Stalls kept for the timings screen and the JSON dump
+MAX_STALLS = 100
+
+# Frames of the loop thread's stack kept for a stall
+STALL_STACK_DEPTH = 8
+
+# Histogram precision: values keep this many bits, so within 1/64 of themselves
+_SUB_BUCKET_BITS = 7
+_HALF = 1 << (_SUB_BUCKET_BITS - 1)
+
+# Percentiles summarized
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+class Histogram:
+    """
+    Counts of durations in log-linear buckets, like HdrHistogram.
+
+    Durations are recorded in microseconds. Below 128 µs every value has its
+    own bucket, and above that each power of two is split into 64 buckets.
+    Percentiles are therefore within about 1.6% of the true value, however
+    many values are recorded.
+    """
+
+    def __init__(self) -> None:
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0  # Microseconds
+        self.min = 0
+        self.max = 0
+
+    @staticmethod
+    def _index(value: int) -> int:
+        magnitude = max(0, value.bit_length() - _SUB_BUCKET_BITS)
+        return magnitude * _HALF + (value >> magnitude)
+
+    @staticmethod
+    def _highest(index: int) -> int:
+        """The largest value that falls in a bucket."""
+        if index < 2 * _HALF:
+            return index
+        magnitude = index // _HALF - 1
+        return ((index - magnitude * _HALF + 1) << magnitude) - 1
+
+    def record(self, seconds: float) -> None:
+        """Count a duration."""
+        value = max(0, int(seconds * 1_000_000))
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        if not self.count or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+
+    def percentile(self, percent: float) -> float:
+        """The duration below which a percentage of the values fall, in milliseconds."""
+        if not self.count:
+            return 0.0
+        wanted = max(1, -(-self.count * percent // 100))  # Rounded up
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= wanted:
+                return min(self._highest(index), self.max) / 1000
+        return self.max / 1000
+
+    @property
+    def mean(self) -> float:
+        """Mean duration in milliseconds."""
+        return self.total / self.count / 1000 if self.count else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        """Count, mean, extremes and percentiles, in milliseconds."""
+        summary: Dict[str, float] = {
+            "count": self.count,
+            "min_ms": self.min / 1000,
+            "mean_ms": self.mean,
+            "max_ms": self.max / 1000,
+        }
+        for percent in PERCENTILES:
+            summary[f"p{percent:g}_ms"] = self.percentile(percent)
+        return summary
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The summary and the buckets, as [highest µs, count] pairs."""
+        return {
+            **self.summary(),
+            "buckets": [[self._highest(index), self.counts[index]] for index in sorted(self.counts)],
+        }
+
+
+@dataclass
+class Stall:
+    """A time the event loop was blocked."""
+
+    at: float  # Seconds since monitoring started
+    where: str  # The innermost game code running, or the innermost code if none
+    stack: List[str] = field(default_factory=list)  # Innermost last
+    ms: float = 0.0  # How long the loop was blocked; 0 until it comes round again
+
+
+def _idle(frame) -> bool:
+    """Whether a thread is waiting in the event loop's selector, which is not a stall."""
+    return frame.f_code.co_name == "select" and frame.f_code.co_filename.endswith("selectors.py")
+
+
+def _describe(frame) -> Tuple[str, List[str]]:
+    """Where a thread is, from its current frame."""
+    stack = [entry for entry in traceback.extract_stack(frame) if entry.filename != __file__]
+    stack = stack[-STALL_STACK_DEPTH:]
+    lines = [f"{entry.filename}:{entry.lineno} in {entry.name}" for entry in stack]
+    for entry in reversed(stack):
+        if "taipan_textual" in entry.filename:
+            module = "taipan_textual" + entry.filename.rsplit("taipan_textual", 1)[-1]
+            return f"{module}:{entry.lineno} in {entry.name}", lines
+    return lines[-1] if lines else "unknown", lines
+
+
+class LoopMonitor:
+    """Samples event loop lag and frame times, and catches stalls."""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.stall_ms = DEFAULT_STALL_MS
+        self.lag = Histogram()
+        self.frames = Histogram()
+        self.stalls: Deque[Stall] = deque(maxlen=MAX_STALLS)
+        self._started = 0.0
+        self._beat = 0.0  # When the loop last came round
+        self._open: Optional[Stall] = None  # The stall in progress
+        self._lock = threading.Lock()
+        self._sampler: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._loop_thread = 0
+        self._patched: Dict[str, Callable] = {}
+        self._frame_depth = 0
+        self._frame_drawn = False
+        self._collecting: Optional[int] = None  # Generation being garbage collected
+
+    @property
+    def running(self) -> bool:
+        return self._sampler is not None and not self._sampler.done()
+
+    def enable(self, stall_ms: float = DEFAULT_STALL_MS) -> None:
+        """Monitor the app once it starts."""
+        self.enabled = True
+        self.stall_ms = stall_ms
+
+    def start(self) -> None:
+        """Start monitoring the running event loop; does nothing if already started."""
+        if self.running:
+            return
+        self.stop()  # Tidy up after a loop that has closed
+        self._started = self._beat = time.perf_counter()
+        self._loop_thread = threading.get_ident()
+        self._stopping.clear()
+        self._patch_screens()
+        gc.callbacks.append(self._note_collection)
+        self._sampler = asyncio.get_running_loop().create_task(self._sample())
+        self._watchdog = threading.Thread(target=self._watch, name="taipan-loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self) -> None:
+        """Stop monitoring, keeping what was measured."""
+        if self._sampler is not None:
+            self._sampler.cancel()
+            self._sampler = None
+        if self._watchdog is not None:
+            self._stopping.set()
+            self._watchdog.join()
+            self._watchdog = None
+        self._unpatch_screens()
+        if self._note_collection in gc.callbacks:
+            gc.callbacks.remove(self._note_collection)
+
+    def clear(self) -> None:
+        """Drop everything measured."""
+        self.lag = Histogram()
+        self.frames = Histogram()
+        self.stalls.clear()
+
+    async def _sample(self) -> None:
+        while True:
+            expected = time.perf_counter() + SAMPLE_INTERVAL
+            await asyncio.sleep(SAMPLE_INTERVAL)
+            now = time.perf_counter()
+            lag = max(0.0, now - expected)
+            self.lag.record(lag)
+            with self._lock:
+                self._beat = now
+                stall, self._open = self._open, None
+            if stall is not None:
+                stall.ms = lag * 1000
+                self.stalls.append(stall)
+                log.warning("Event loop blocked for %.0f ms in %s", stall.ms, stall.where)
+
+    def _note_collection(self, phase: str, info: Dict[str, int]) -> None:
+        self._collecting = info["generation"] if phase == "start" else None
+
+    def _watch(self) -> None:
+        """Watchdog thread: note where the loop thread is when it stops coming round."""
+        limit = self.stall_ms / 1000
+        while not self._stopping.wait(max(0.005, limit / 2)):
+            with self._lock:
+                blocked = time.perf_counter() - self._beat - SAMPLE_INTERVAL
+                if self._open is not None or blocked < limit:
+                    continue
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is None or _idle(frame):
+                    continue
+                where, stack = _describe(frame)
+                if self._collecting is not None:
+                    where = f"garbage collection of generation {self._collecting}, at {where}"
+                self._open = Stall(at=time.perf_counter() - self._started, where=where, stack=stack)
+
+    def _patch_screens(self) -> None:
+        """Time each frame a screen draws, from layout to writing it out."""
+        from textual.screen import Screen
+
+        monitor = self
+        for name in ("_on_timer_update", "_refresh_layout"):
+            original = Screen.__dict__[name]
+            self._patched[name] = original
+
+            def timed_update(screen, *args, _original=original, **kwargs):
+                if monitor._frame_depth:
+                    return _original(screen, *args, **kwargs)  # Part of a frame already being timed
+                monitor._frame_depth += 1
+                monitor._frame_drawn = False
+                start = time.perf_counter()
+                try:
+                    return _original(screen, *args, **kwargs)
+                finally:
+                    monitor._frame_depth -= 1
+                    if monitor._frame_drawn:
+                        monitor.frames.record(time.perf_counter() - start)
+
+            setattr(Screen, name, timed_update)
+
+        original_refresh = Screen.__dict__["_compositor_refresh"]
+        self._patched["_compositor_refresh"] = original_refresh
+
+        def note_frame(screen):
+            monitor._frame_drawn = True
+            return original_refresh(screen)
+
+        Screen._compositor_refresh = note_frame  # type: ignore[method-assign]
+
+    def _unpatch_screens(self) -> None:
+        from textual.screen import Screen
+
+        for name, original in self._patched.items():
+            setattr(Screen, name, original)
+        self._patched.clear()
+
+    def report(self) -> Dict[str, Any]:
+        """Everything measured, ready for JSON."""
+        return {
+            "stall_ms": self.stall_ms,
+            "sample_interval_ms": SAMPLE_INTERVAL * 1000,
+            "loop_lag": self.lag.to_dict(),
+            "frame_time": self.frames.to_dict(),
+            "stalls": [asdict(stall) for stall in self.stalls],
+        }
+
+    def write_json(self, path: str) -> None:
+        """Write what was measured to a JSON file."""
+        with open(path, "w") as handle:
+            json.dump(self.report(), handle, indent=2)
+            handle.write("\n")
+
+
+# Shared by the whole game
+monitor = LoopMonitor()
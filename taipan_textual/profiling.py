@@ -0,0 +1,186 @@
+"""
+Opt-in timing of screen handlers and game rules.
+
+Timing is off unless something calls ``profiler.enable()``, which the game
+does when run with ``--trace PATH`` or ``DEBUG=true``. While it is off a
+timed function costs one attribute check per call.
+
+Rule functions are marked with the ``timed`` decorator. Screen handlers
+(``compose``, ``on_mount`` and ``on_key``) are wrapped by
+``instrument_screens`` when the game starts with timing enabled, so they
+cost nothing at all otherwise. Spans can be written out as Chrome trace JSON, which loads in
+chrome://tracing or https://ui.perfetto.dev.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+# Spans kept for the trace; older ones are dropped
+MAX_SPANS = 100_000
+
+# Spans longer than a frame at 60 fps are logged
+SLOW_SPAN_MS = 16.0
+
+# Screen handlers wrapped by instrument_screens
+SCREEN_HANDLERS = ("compose", "on_mount", "on_key")
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+@dataclass
+class SpanStats:
+    """Totals for every span with one name."""
+
+    count: int = 0
+    total: float = 0.0  # Seconds
+    longest: float = 0.0  # Seconds
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class Profiler:
+    """Collects timed spans by name."""
+
+    def __init__(self, max_spans: int = MAX_SPANS) -> None:
+        self.enabled = False
+        self.stats: Dict[str, SpanStats] = {}
+        self._spans: Deque[Tuple[str, float, float, int]] = deque(maxlen=max_spans)  # name, start, duration, thread
+        self._origin = time.perf_counter()
+
+    def enable(self) -> None:
+        """Start timing."""
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stop timing, keeping what was collected."""
+        self.enabled = False
+
+    def clear(self) -> None:
+        """Drop everything collected."""
+        self.stats.clear()
+        self._spans.clear()
+
+    def add(self, name: str, start: float, duration: float) -> None:
+        """Record a span that started at a ``time.perf_counter()`` time."""
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = SpanStats()
+        stats.count += 1
+        stats.total += duration
+        if duration > stats.longest:
+            stats.longest = duration
+        self._spans.append((name, start, duration, threading.get_ident()))
+        if duration * 1000 > SLOW_SPAN_MS:
+            log.debug("%s took %.1f ms", name, duration * 1000)
+
+    def report(self, limit: Optional[int] = None) -> List[Tuple[str, SpanStats]]:
+        """Span names and totals, the most time spent first."""
+        rows = sorted(self.stats.items(), key=lambda row: row[1].total, reverse=True)
+        return rows[:limit]
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """The spans in Chrome's trace event format."""
+        pid = os.getpid()
+        return {
+            "traceEvents": [
+                {
+                    "name": name,
+                    "cat": name.split(".", 1)[0],
+                    "ph": "X",
+                    "ts": (start - self._origin) * 1e6,
+                    "dur": duration * 1e6,
+                    "pid": pid,
+                    "tid": thread,
+                }
+                for name, start, duration, thread in self._spans
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def write_chrome_trace(self, path: str) -> None:
+        """Write the spans to a Chrome trace file."""
+        with open(path, "w") as handle:
+            json.dump(self.chrome_trace(), handle)
+
+
+# Shared by the whole game
+profiler = Profiler()
+
+
+def _wrap(function: F, name: str) -> F:
+    """Time calls to a function, coroutine function or generator function under a name."""
+    if inspect.iscoroutinefunction(function):
+        @wraps(function)
+        async def timed_coroutine(*args, **kwargs):
+            if not profiler.enabled:
+                return await function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return await function(*args, **kwargs)
+            finally:
+                profiler.add(name, start, time.perf_counter() - start)
+        return timed_coroutine  # type: ignore[return-value]
+
+    if inspect.isgeneratorfunction(function):
+        @wraps(function)
+        def timed_generator(*args, **kwargs):
+            if not profiler.enabled:
+                return (yield from function(*args, **kwargs))
+            start = time.perf_counter()
+            try:
+                return (yield from function(*args, **kwargs))
+            finally:
+                profiler.add(name, start, time.perf_counter() - start)
+        return timed_generator  # type: ignore[return-value]
+
+    @wraps(function)
+    def timed_function(*args, **kwargs):
+        if not profiler.enabled:
+            return function(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            profiler.add(name, start, time.perf_counter() - start)
+    return timed_function  # type: ignore[return-value]
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """
+    Time every call to a function while the profiler is enabled.
+
+    Args:
+        name: Span name, ``Owner.function`` by convention (``GameState.set_prices``)
+    """
+    def decorator(function: F) -> F:
+        return _wrap(function, name)
+    return decorator
+
+
+def instrument_screens(*classes: type) -> None:
+    """
+    Time the handlers each screen class defines itself.
+
+    Spans are named ``ScreenName.handler``. A ``compose`` span runs until
+    Textual has taken the last widget from it.
+    """
+    for cls in classes:
+        for handler in SCREEN_HANDLERS:
+            function = cls.__dict__.get(handler)
+            if function is None or getattr(function, "_profiled", False):
+                continue
+            wrapped = _wrap(function, f"{cls.__name__}.{handler}")
+            wrapped._profiled = True  # type: ignore[attr-defined]
+            setattr(cls, handler, wrapped)
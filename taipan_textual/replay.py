@@ -0,0 +1,289 @@
+"""
+Headless replay of recorded Taipan games.
+
+Re-runs every game in one or more journals through the rules, without any
+UI, and checks each recorded outcome, state version and snapshot against
+the replay:
+
+    python -m taipan_textual.replay games.journal
+
+Any difference means the rules no longer play a recorded game the way
+they did when it was played.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Iterable, Iterator, List, Optional, Sequence, Tuple
+import argparse
+import sys
+import time
+
+from .game_state import BATTLE_WON, ObservableGameState
+from .journal import (
+    ARRIVE,
+    BATTLE_END,
+    BATTLE_ORDER,
+    BUY,
+    DEPOSIT,
+    EVENT,
+    LI_YUEN_PAID,
+    LI_YUEN_REFUSED,
+    OFFER_ACCEPTED,
+    OFFER_DECLINED,
+    SELL,
+    START,
+    STATE,
+    STATE_FIELDS,
+    TRANSFER,
+    TRANSFER_DIRECTIONS,
+    TRAVEL,
+    WITHDRAW,
+    Entry,
+    read_journal,
+    state_values,
+)
+from .rng import GameRandom
+from .engine import (
+    FIGHT,
+    RUN,
+    ArrivalReport,
+    Battle,
+    GameRuleError,
+    answer_li_yuen,
+    answer_offer,
+    arrive_in_port,
+    buy,
+    complete_voyage,
+    deposit,
+    sell,
+    start_game,
+    transfer,
+    travel,
+    withdraw,
+)
+
+
+class ReplayError(Exception):
+    """Raised when a replayed game does not match its journal."""
+
+    def __init__(self, seed: int, index: int, entry: Entry, message: str) -> None:
+        super().__init__(f"seed {seed}, entry {index} ({entry.name}): {message}")
+        self.seed = seed
+        self.index = index
+        self.entry = entry
+
+
+@dataclass
+class ReplayResult:
+    """A game that replayed exactly as recorded."""
+
+    seed: int
+    entries: int
+    voyages: int
+    game_state: ObservableGameState
+
+
+def split_games(entries: Iterable[Entry]) -> Iterator[List[Entry]]:
+    """
+    Split a journal into games.
+
+    Each game starts with a START entry. Entries before the first START
+    belong to no game and are skipped.
+    """
+    game: List[Entry] = []
+    for entry in entries:
+        if entry.kind == START:
+            if game:
+                yield game
+            game = [entry]
+        elif game:
+            game.append(entry)
+    if game:
+        yield game
+
+
+def _state_difference(expected: Sequence[int], actual: Sequence[int]) -> str:
+    """Name the first snapshot value that differs."""
+    names: List[str] = []
+    for name in STATE_FIELDS:
+        if name in ("hold_", "warehouse"):
+            names.extend(f"{name}[{i}]" for i in range(4))
+        else:
+            names.append(name)
+    for name, want, got in zip(names, expected, actual):
+        if want != got:
+            return f"{name} is {got}, recorded {want}"
+    return f"snapshot has {len(actual)} values, recorded {len(expected)}"
+
+
+def replay_game(entries: Sequence[Entry]) -> ReplayResult:
+    """
+    Replay one recorded game through the rules.
+
+    Args:
+        entries: The game's entries, starting with its START entry
+
+    Returns:
+        The replayed game
+
+    Raises:
+        ReplayError: At the first entry the replay does not reproduce
+    """
+    seed = entries[0].seed
+    game_state = ObservableGameState(rng=GameRandom(seed))
+    # Versions are only comparable from the start of the game on, and only
+    # if the game was recorded from an observable state
+    check_versions = any(entry.version for entry in entries)
+    version_offset = 0
+    battle: Optional[Battle] = None
+    # The arrival events run after the arrival and its snapshot are recorded
+    arrival_due = False
+    arrival = ArrivalReport()
+    arrival_events: Deque[Tuple[int, ...]] = deque()  # Events of the last arrival not yet seen in the journal
+    voyages = 0
+
+    for index, entry in enumerate(entries):
+        kind, args = entry.kind, entry.args
+
+        def mismatch(message: str) -> ReplayError:
+            return ReplayError(seed, index, entry, message)
+
+        if arrival_due and kind != STATE:
+            arrival = arrive_in_port(game_state)
+            arrival_events = deque(arrival.events)
+            arrival_due = False
+
+        version = game_state.version  # Orders are recorded before their round is fought
+        try:
+            if kind == START:
+                if index > 0:
+                    raise mismatch("a game can only start once")
+                start_game(game_state, bool(args[0]))
+                version_offset = entry.version - game_state.version
+                arrival_due = True
+            elif kind == BUY:
+                buy(game_state, args[0], args[1])
+            elif kind == SELL:
+                sell(game_state, args[0], args[1])
+            elif kind == DEPOSIT:
+                deposit(game_state, args[0])
+            elif kind == WITHDRAW:
+                withdraw(game_state, args[0])
+            elif kind == TRANSFER:
+                transfer(game_state, args[0], args[1], TRANSFER_DIRECTIONS[args[2]])
+            elif kind == TRAVEL:
+                num_ships = travel(game_state, args[0])
+                if num_ships != args[1]:
+                    raise mismatch(f"{num_ships} ships attacked, recorded {args[1]}")
+                voyages += 1
+                battle = None
+                if num_ships > 0:
+                    battle = Battle(game_state, num_ships)
+                    battle.fill_slots()
+            elif kind == BATTLE_ORDER:
+                if battle is None or battle.finished:
+                    raise mismatch("there is no battle to give orders in")
+                if args[0] == FIGHT:
+                    battle.fight()
+                elif args[0] == RUN:
+                    battle.run()
+                else:
+                    raise mismatch(f"order {args[0]} cannot be replayed")
+                battle.end_round()
+                if not battle.finished:
+                    battle.fill_slots()
+            elif kind == BATTLE_END:
+                if battle is None or not battle.finished:
+                    raise mismatch("the battle is not over")
+                outcome = (battle.result, battle.booty if battle.result == BATTLE_WON else 0)
+                if outcome != args:
+                    raise mismatch(f"result and booty are {outcome}, recorded {args}")
+            elif kind == ARRIVE:
+                report = complete_voyage(game_state)
+                landed = (game_state.port, report.storm, report.going_down, report.sunk, report.blown_off_course)
+                if landed != args:
+                    raise mismatch(f"arrival is {landed}, recorded {args}")
+                battle = None
+                arrival = ArrivalReport()  # Nothing of the last port is left to answer
+                arrival_events.clear()
+                arrival_due = not report.sunk
+            elif kind == EVENT:
+                code = args[0]
+                if code in (LI_YUEN_PAID, LI_YUEN_REFUSED):
+                    if arrival.li_yuen_demand is None:
+                        raise mismatch("Li Yuen asked for nothing")
+                    answer_li_yuen(game_state, arrival.li_yuen_demand, pay=code == LI_YUEN_PAID)
+                    arrival.li_yuen_demand = None
+                elif code in (OFFER_ACCEPTED, OFFER_DECLINED):
+                    if arrival.offer is None:
+                        raise mismatch("nothing was offered")
+                    answer_offer(game_state, arrival.offer, accept=code == OFFER_ACCEPTED)
+                    arrival.offer = None
+                else:
+                    happened = arrival_events.popleft() if arrival_events else None
+                    if happened != args:
+                        raise mismatch(f"event {happened} happened on arrival, recorded {args}")
+            elif kind == STATE:
+                values = state_values(game_state)
+                if values != args:
+                    raise mismatch(_state_difference(args, values))
+            else:
+                raise mismatch("unknown entry kind")
+        except GameRuleError as error:
+            raise mismatch(f"the rules refused: {error}") from None
+
+        if kind != BATTLE_ORDER:
+            version = game_state.version
+        # The events of an arrival are replayed together, so only the last one's version can be checked
+        if kind == EVENT and arrival_events:
+            continue
+        if check_versions and version + version_offset != entry.version:
+            raise mismatch(f"state version is {version + version_offset}, recorded {entry.version}")
+
+    return ReplayResult(seed, len(entries), voyages, game_state)
+
+
+# For --help; the module docstring is stripped under python -OO
+DESCRIPTION = "Headless replay of recorded Taipan games."
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Replay journals from the command line."""
+    parser = argparse.ArgumentParser(prog="python -m taipan_textual.replay", description=DESCRIPTION)
+    parser.add_argument("journals", nargs="+", metavar="JOURNAL", help="journal files written with --journal")
+    parser.add_argument("--verbose", "-v", action="store_true", help="list every game, not just the failures")
+    args = parser.parse_args(argv)
+
+    games = entries = voyages = failures = 0
+    started = time.perf_counter()
+    for path in args.journals:
+        try:
+            recorded = list(read_journal(path))
+        except (OSError, ValueError) as error:
+            print(f"{path}: {error}", file=sys.stderr)
+            return 2
+
+        for game in split_games(recorded):
+            games += 1
+            entries += len(game)
+            try:
+                result = replay_game(game)
+            except ReplayError as error:
+                failures += 1
+                print(f"{path}: FAIL {error}")
+                continue
+            voyages += result.voyages
+            if args.verbose:
+                print(f"{path}: ok seed {result.seed}, {result.entries} entries, {result.voyages} voyages")
+    elapsed = time.perf_counter() - started
+
+    rate = entries / elapsed if elapsed > 0 else 0
+    print(f"Replayed {games:,} games, {voyages:,} voyages, {entries:,} entries in {elapsed:.2f}s ({rate:,.0f} entries/sec)")
+    if failures:
+        print(f"{failures:,} of {games:,} games did not match their journal")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
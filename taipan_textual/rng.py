@@ -0,0 +1,53 @@
+"""
+Random number streams for Taipan.
+
+Each game owns a GameRandom seeded once at the start. The game draws
+prices, port and voyage events, and combat from separate substreams, so
+that a choice which changes how many numbers one part of the game
+consumes (running instead of fighting, say) does not shift the draws of
+the others. Replaying a game from its seed reproduces it exactly.
+"""
+
+from typing import Any, Dict, Optional
+import random
+
+# Substreams every game uses
+PRICES = "prices"
+EVENTS = "events"
+COMBAT = "combat"
+
+
+class GameRandom:
+    """A seeded family of independent random number streams for one game."""
+
+    def __init__(self, seed: Optional[int] = None) -> None:
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(63)
+        self.seed = seed
+        self._streams: Dict[str, random.Random] = {}
+        self.prices = self.stream(PRICES)
+        self.events = self.stream(EVENTS)
+        self.combat = self.stream(COMBAT)
+
+    def stream(self, name: str) -> random.Random:
+        """
+        Get a named substream, creating it on first use.
+
+        Substreams are seeded from the game seed and their name only, so the
+        same seed always gives the same sequence for a name.
+        """
+        if name not in self._streams:
+            self._streams[name] = random.Random(f"{self.seed}/{name}")
+        return self._streams[name]
+
+    def getstate(self) -> Dict[str, Any]:
+        """The state of every substream, by name, for setstate() to restore."""
+        return {name: stream.getstate() for name, stream in self._streams.items()}
+
+    def setstate(self, states: Dict[str, Any]) -> None:
+        """Restore substream states from getstate(), creating streams as needed."""
+        for name, state in states.items():
+            self.stream(name).setstate(state)
+
+    def __repr__(self) -> str:
+        return f"GameRandom(seed={self.seed})"
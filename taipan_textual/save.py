@@ -0,0 +1,239 @@
+"""
+Saved games for Taipan.
+
+A save is a compact binary snapshot of a GameState, including the state of
+its random number streams, so a resumed game plays on exactly as it would
+have. The layout is a magic header, the numeric fields packed with one
+struct, then the firm name, the seed and each stream's state. Integers are
+saturated at the int64 limits, which only a balance left to grow for
+centuries could reach.
+
+Saves are written to a temporary file and renamed over the old save, so a
+crash never leaves a half-written game. The Autosaver does the writing on a
+background thread, so the event loop only pays for packing the snapshot.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar
+import os
+import random
+import struct
+import threading
+
+from .game_state import GameState
+from .rng import GameRandom
+
+MAGIC = b"TAIPANS1"
+
+# Numeric GameState fields in save order, with their struct codes
+SAVE_FIELDS: Tuple[Tuple[str, str], ...] = (
+    ("cash", "q"),
+    ("bank", "q"),
+    ("debt", "q"),
+    ("booty", "q"),
+    ("enemy_health", "d"),
+    ("enemy_damage", "d"),
+    ("battle_probability", "q"),
+    ("destination_port", "q"),
+    ("warehouse", "4q"),
+    ("hold_", "4q"),
+    ("hold", "q"),
+    ("capacity", "q"),
+    ("guns", "q"),
+    ("damage", "q"),
+    ("month", "q"),
+    ("year", "q"),
+    ("port", "q"),
+    ("li_yuen_relation", "q"),
+    ("wu_warned", "?"),
+    ("wu_bailouts", "q"),
+    ("wu_warn", "q"),
+    ("price", "4q"),
+)
+
+_FIELDS = struct.Struct("<" + "".join(code for _, code in SAVE_FIELDS))
+_LENGTH = struct.Struct("<H")
+_MT_STATE = struct.Struct("<625I")  # Mersenne Twister state words and position
+_GAUSS = struct.Struct("<?d")
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+
+S = TypeVar("S", bound=GameState)
+
+
+def _pack_text(text: str) -> bytes:
+    data = text.encode("utf-8")
+    return _LENGTH.pack(len(data)) + data
+
+
+def _unpack_text(data: bytes, offset: int) -> Tuple[str, int]:
+    (length,) = _LENGTH.unpack_from(data, offset)
+    offset += _LENGTH.size
+    return data[offset:offset + length].decode("utf-8"), offset + length
+
+
+def _int64(value: int) -> int:
+    return min(max(value, _INT64_MIN), _INT64_MAX)
+
+
+def dumps(game_state: GameState) -> bytes:
+    """Pack a game into a save."""
+    values: List[object] = []
+    for name, code in SAVE_FIELDS:
+        value = getattr(game_state, name)
+        if code == "4q":
+            values.extend(map(_int64, value))
+        elif code == "q":
+            values.append(_int64(value))
+        else:
+            values.append(value)
+
+    parts = [MAGIC, _FIELDS.pack(*values), _pack_text(game_state.firm_name), _pack_text(str(game_state.rng.seed))]
+    streams = game_state.rng.getstate()
+    parts.append(_LENGTH.pack(len(streams)))
+    for name, (_, words, gauss) in streams.items():
+        parts.append(_pack_text(name))
+        parts.append(_MT_STATE.pack(*words))
+        parts.append(_GAUSS.pack(gauss is not None, gauss or 0.0))
+    return b"".join(parts)
+
+
+def loads(data: bytes, cls: Type[S] = GameState) -> S:  # type: ignore[assignment]
+    """
+    Unpack a game from a save.
+
+    Args:
+        data: The save
+        cls: GameState or a subclass to create
+
+    Returns:
+        The saved game
+
+    Raises:
+        ValueError: If the data is not a complete save
+    """
+    if not data.startswith(MAGIC):
+        raise ValueError("Not a Taipan save")
+    try:
+        offset = len(MAGIC)
+        values = list(_FIELDS.unpack_from(data, offset))
+        offset += _FIELDS.size
+        firm_name, offset = _unpack_text(data, offset)
+        seed, offset = _unpack_text(data, offset)
+
+        fields: Dict[str, Any] = {"firm_name": firm_name}
+        for name, code in SAVE_FIELDS:
+            if code == "4q":
+                fields[name], values = values[:4], values[4:]
+            else:
+                fields[name], values = values[0], values[1:]
+
+        rng = GameRandom(int(seed))
+        (count,) = _LENGTH.unpack_from(data, offset)
+        offset += _LENGTH.size
+        states = {}
+        for _ in range(count):
+            name, offset = _unpack_text(data, offset)
+            words = _MT_STATE.unpack_from(data, offset)
+            offset += _MT_STATE.size
+            has_gauss, gauss = _GAUSS.unpack_from(data, offset)
+            offset += _GAUSS.size
+            states[name] = (random.Random.VERSION, words, gauss if has_gauss else None)
+    except (struct.error, UnicodeDecodeError) as error:
+        raise ValueError(f"Damaged Taipan save: {error}") from None
+
+    prices = fields["price"]
+    game_state = cls(rng=rng, **{**fields, "price": list(prices)})  # type: ignore[arg-type]
+    # Creating the game drew new prices, so restore them and the streams afterwards
+    game_state.price = prices
+    rng.setstate(states)
+    return game_state
+
+
+def _write_atomically(path: str, data: bytes) -> None:
+    """Replace a file's contents so readers see the old file or the new one, never a mix."""
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as handle:
+        handle.write(data)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(temporary, path)
+
+
+def save_game(game_state: GameState, path: str) -> None:
+    """Write a save file."""
+    _write_atomically(path, dumps(game_state))
+
+
+def load_game(path: str, cls: Type[S] = GameState) -> S:  # type: ignore[assignment]
+    """
+    Read a save file.
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the file is not a complete save
+    """
+    with open(path, "rb") as handle:
+        return loads(handle.read(), cls)
+
+
+class Autosaver:
+    """
+    Saves a game to one file from a background thread.
+
+    Only the newest snapshot is kept waiting, so a slow disk can delay saves
+    but never queue them up.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.snapshots = 0  # Snapshots taken
+        self.saves = 0  # Snapshots written
+        self.error: Optional[OSError] = None  # The last write failure, if any
+        self._pending: Optional[bytes] = None
+        self._closed = False
+        self._wake = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="taipan-autosave", daemon=True)
+        self._thread.start()
+
+    def save(self, game_state: GameState) -> None:
+        """
+        Snapshot the game now and write it in the background.
+
+        Raises:
+            ValueError: If the autosaver is closed
+        """
+        data = dumps(game_state)
+        with self._wake:
+            if self._closed:
+                raise ValueError("Autosaver is closed")
+            self._pending = data
+            self.snapshots += 1
+            self._wake.notify()
+
+    def take_error(self) -> Optional[OSError]:
+        """The last write failure not yet taken, if any."""
+        with self._wake:
+            error, self.error = self.error, None
+        return error
+
+    def _run(self) -> None:
+        while True:
+            with self._wake:
+                while self._pending is None and not self._closed:
+                    self._wake.wait()
+                data, self._pending = self._pending, None
+                if data is None:
+                    return  # Closed with nothing left to write
+            try:
+                _write_atomically(self.path, data)
+                self.saves += 1
+            except OSError as error:
+                with self._wake:
+                    self.error = error
+
+    def close(self) -> None:
+        """Finish the waiting write and stop the thread; check take_error() afterwards."""
+        with self._wake:
+            self._closed = True
+            self._wake.notify()
+        self._thread.join()
@@ -1,17 +1,43 @@
 """
 Screens package for Taipan game.
+
+Screens are imported on first use rather than with the package, so starting
+the game only loads the screens it shows first.
 """
 
-from .port_screen import PortScreen
-from .buy_screen import BuyScreen
-from .sell_screen import SellScreen
-from .bank_screen import BankScreen
-from .transfer_screen import TransferScreen
-from .wheedle_screen import WheedleScreen
-from .retire_screen import RetireScreen
-from .battle_screen import BattleScreen
-from .setup_screen import SetupScreen
-from .quit_screen import QuitScreen
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, Dict, List
+
+if TYPE_CHECKING:
+    from .port_screen import PortScreen
+    from .buy_screen import BuyScreen
+    from .sell_screen import SellScreen
+    from .bank_screen import BankScreen
+    from .transfer_screen import TransferScreen
+    from .wheedle_screen import WheedleScreen
+    from .retire_screen import RetireScreen
+    from .battle_screen import BattleScreen
+    from .setup_screen import SetupScreen
+    from .quit_screen import QuitScreen
+    from .complete_travel_screen import CompleteTravelScreen
+    from .timings_screen import TimingsScreen
+
+# Module each screen is defined in
+_SCREEN_MODULES: Dict[str, str] = {
+    "PortScreen": ".port_screen",
+    "BuyScreen": ".buy_screen",
+    "SellScreen": ".sell_screen",
+    "BankScreen": ".bank_screen",
+    "TransferScreen": ".transfer_screen",
+    "WheedleScreen": ".wheedle_screen",
+    "RetireScreen": ".retire_screen",
+    "BattleScreen": ".battle_screen",
+    "SetupScreen": ".setup_screen",
+    "QuitScreen": ".quit_screen",
+    "CompleteTravelScreen": ".complete_travel_screen",
+    "TimingsScreen": ".timings_screen",
+}
+
 __all__ = [
     "PortScreen",
     "BuyScreen",
@@ -22,5 +48,21 @@ __all__ = [
     "RetireScreen",
     "BattleScreen",
     "SetupScreen",
-    "QuitScreen"
-] 
\ No newline at end of file
+    "QuitScreen",
+    "CompleteTravelScreen",
+    "TimingsScreen",
+]
+
+
+def __getattr__(name: str) -> Any:
+    """Import a screen the first time it is asked for."""
+    module = _SCREEN_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    screen = getattr(import_module(module, __name__), name)
+    globals()[name] = screen  # Later lookups skip this function
+    return screen
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -9,9 +9,27 @@ from textual.containers import Container
 from textual import events
 from rich.panel import Panel
 from rich.text import Text
+from rich.console import RenderableType
 
 from ..game_state import GameState
-from ..screens.port_screen import PortScreen
+from ..utils import ALL
+from ..engine import GameRuleError, deposit, withdraw
+from ..screens.port_screen import show_port
+from .panels import MarkupTemplate, panel_cache
+from .number_input import NumberInput
+
+BANK_TEMPLATE = MarkupTemplate("""
+[bold]Comprador's Report[/bold]
+
+Current Port: {port}
+Cash: ${cash}
+Bank: ${bank}
+""")
+
+PROMPTS = {
+    "deposit": "How much will you deposit? (Press Enter to deposit all) ",
+    "withdraw": "How much will you withdraw? (Press Enter to withdraw all) ",
+}
 
 class BankScreen(Screen):
     """Screen for visiting the bank."""
@@ -19,91 +37,56 @@ class BankScreen(Screen):
     def __init__(self, game_state: GameState):
         super().__init__()
         self.game_state = game_state
-        self.amount_input = ""
         self.stage = "deposit"  # or "withdraw"
     
     def compose(self) -> ComposeResult:
         yield Header()
         yield Footer()
         yield Static(self.render_content())
+        yield NumberInput()
     
-    def render_content(self) -> str:
+    def render_content(self) -> RenderableType:
         """Render the bank screen content."""
-        content = f"""
-[bold]Comprador's Report[/bold]
-
-Current Port: {self.game_state.get_current_location()}
-Cash: ${self.game_state.format_money(self.game_state.cash)}
-Bank: ${self.game_state.format_money(self.game_state.bank)}
-
-"""
-        if self.stage == "deposit":
-            content += f"How much will you deposit? (Press Enter to deposit all) {self.amount_input}"
-        else:
-            content += f"How much will you withdraw? (Press Enter to withdraw all) {self.amount_input}"
-        
-        return content
+        gs = self.game_state
+        return panel_cache.get(("bank", gs.port, gs.cash, gs.bank), self._create_balances_text)
     
-    def on_key(self, event: events.Key) -> None:
-        """Handle key presses."""
-        if event.key == "q":
-            self.app.pop_screen()
-            return
-        
-        if event.key.isdigit():
-            self.amount_input += event.key
-            self.query_one(Static).update(self.render_content())
-            return
+    def _create_balances_text(self) -> Text:
+        """Create the cash and bank balances."""
+        gs = self.game_state
+        return BANK_TEMPLATE.render(
+            port=gs.get_current_location(),
+            cash=gs.format_money(gs.cash),
+            bank=gs.format_money(gs.bank),
+        )
+    
+    def on_mount(self) -> None:
+        """Ask for the deposit."""
+        self.query_one(NumberInput).start(PROMPTS[self.stage])
+    
+    def on_number_input_submitted(self, message: NumberInput.Submitted) -> None:
+        """Make the deposit or withdrawal entered; zero skips it."""
+        try:
+            if self.stage == "deposit":
+                amount = self.game_state.cash if message.amount == ALL else message.amount
+                if amount > 0:
+                    deposit(self.game_state, amount)
+                
+                # Move to withdrawal stage
+                self.stage = "withdraw"
+                self.query_one(Static).update(self.render_content())
+            else:
+                amount = self.game_state.bank if message.amount == ALL else message.amount
+                if amount > 0:
+                    withdraw(self.game_state, amount)
+                
+                # Back to the port screen, which shows the new state
+                show_port(self.app, self.game_state)
+                return
+        except GameRuleError as error:
+            self.notify(str(error), severity="error")
         
-        if event.key == "enter":
-            try:
-                if self.stage == "deposit":
-                    # Handle deposit
-                    if not self.amount_input:
-                        amount = self.game_state.cash
-                    else:
-                        amount = int(self.amount_input)
-                    
-                    if amount < 0:
-                        self.notify("Amount must be positive", severity="error")
-                        return
-                    
-                    if amount > self.game_state.cash:
-                        self.notify(f"Taipan, you only have ${self.game_state.format_money(self.game_state.cash)} in cash.", severity="error")
-                        return
-                    
-                    self.game_state.cash -= amount
-                    self.game_state.bank += amount
-                    
-                    # Move to withdrawal stage
-                    self.stage = "withdraw"
-                    self.amount_input = ""
-                    self.query_one(Static).update(self.render_content())
-                    
-                else:
-                    # Handle withdrawal
-                    if not self.amount_input:
-                        amount = self.game_state.bank
-                    else:
-                        amount = int(self.amount_input)
-                    
-                    if amount < 0:
-                        self.notify("Amount must be positive", severity="error")
-                        return
-                    
-                    if amount > self.game_state.bank:
-                        self.notify(f"Taipan, you only have ${self.game_state.format_money(self.game_state.bank)} in the bank.", severity="error")
-                        return
-                    
-                    self.game_state.cash += amount
-                    self.game_state.bank -= amount
-                    
-                    # Return to port screen
-                    self.app.pop_screen()
-                    self.app.push_screen(PortScreen(self.game_state))
-                    
-            except ValueError:
-                self.notify("Invalid amount", severity="error")
-            finally:
-                if self.stage == "deposit":
-                    self.amount_input = "" 
\ No newline at end of file
+        self.query_one(NumberInput).start(PROMPTS[self.stage])
+    
+    def on_number_input_cancelled(self, message: NumberInput.Cancelled) -> None:
+        """Leave the bank."""
+        self.app.pop_screen()
@@ -2,168 +2,220 @@
 Battle screen for sea battles in Taipan.
 """
 
-from typing import Union, Optional, cast, Literal
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Tuple, Union, Optional, Literal
 from taipan_textual.screens.complete_travel_screen import CompleteTravelScreen
 from textual.app import ComposeResult
 from textual.screen import Screen
-from textual.widgets import Static, Input
+from textual.widget import Widget
+from textual.widgets import Static
 from textual.containers import Container
 from textual import events, work
-import random
 import asyncio
-from rich.panel import Panel
-from rich.text import Text
 from textual.reactive import reactive
-from textual.worker import Worker
-from textual.geometry import Region
-from rich.style import Style
+from textual.geometry import Region, Size
+from textual.strip import Strip
+from rich.segment import Segment
 
 
-from ..game_state import GameState, BATTLE_NOT_FINISHED, BATTLE_WON, BATTLE_INTERRUPTED, BATTLE_FLED, BATTLE_LOST
-
-# Battle types
-GENERIC = 1
-LI_YUEN = 2
+from ..game_state import GameState, BATTLE_WON, BATTLE_LOST
+from ..engine import (
+    FIGHT, FLEET_SLOTS, GENERIC, HIT, RUN, SUNK,
+    AttackReport, Battle, EnemyFleet, FleetChange, FightReport,
+)
+from ..settings import ANIMATION_SPEEDS, DEFAULT_ANIMATION_SPEED
 
 BattleResult = Literal[0, 1, 2, 3, 4]
 
-class ShipDisplay(Static):
-    """Widget for displaying ships in battle."""
+ORDERS_PROMPT = "Taipan, what shall we do??    (f=Fight, r=Run, t=Throw cargo)"
+
+# Orders as the advice names them
+ADVICE_ORDERS = {FIGHT: "Fight", RUN: "Run"}
+
+# Ship drawing geometry
+SHIP_WIDTH = 8
+SHIP_HEIGHT = 4
+SINK_FRAMES = 4
+CELL_HEIGHT = SHIP_HEIGHT + SINK_FRAMES - 1  # A position with room for its sinking frames
+DISPLAY_HEIGHT = 12 + CELL_HEIGHT
+
+# Sprite frames, one string per row of a position; None leaves the row untouched
+Sprite = Tuple[Optional[str], ...]
+
+_SHIP = ("-|-_|_  ", "-|-_|_  ", "_|__|__/", "\\_____/ ")
+_BLANK = " " * SHIP_WIDTH
+
+
+def _sinking_frame(frame: int) -> Sprite:
+    """Frame of a ship sinking, as drawn by the C code: clear a row, redraw one lower."""
+    rows: List[Optional[str]] = [None] * CELL_HEIGHT
+    for row in range(frame, frame + SHIP_HEIGHT):
+        rows[row] = _BLANK
+    if frame < SINK_FRAMES - 1:
+        rows[frame + 1:frame + 1 + SHIP_HEIGHT] = _SHIP
+    return tuple(rows)
+
+
+SHIP_SPRITE: Sprite = _SHIP + (None,) * (SINK_FRAMES - 1)
+BLAST_SPRITE: Sprite = ("*" * SHIP_WIDTH,) * SHIP_HEIGHT + (None,) * (SINK_FRAMES - 1)
+SINK_SPRITES: Tuple[Sprite, ...] = tuple(_sinking_frame(frame) for frame in range(SINK_FRAMES))
+
+class ShipDisplay(Widget):
+    """
+    Widget for displaying ships in battle.
+
+    The display observes the battle's EnemyFleet: changes to the fleet are
+    queued as they happen and played back in order, so the picture always
+    catches up with the model without keeping counts of its own.
+    
+    Ships are drawn from pre-built sprite frames one line at a time. Lines
+    are cached and only the lines under a position that changed are
+    rebuilt and repainted.
+    """
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.ships = [0] * 10  # Health of ships in each position
-        self.explosions = [False] * 10  # Whether each position is exploding
-        self.sinking = [False] * 10  # Whether each position is sinking
-        self.sink_frames = [0] * 10  # Current frame of sinking animation
-        self._lines = []  # Store the current display lines
-        self.num_ships = 0  # Number of ships currently in battle
-        self.num_on_screen = 0  # Number of ships currently displayed
-        self.enemy_health = 0  # Enemy health for backfilling ships
-        
-    def initialize_ships(self, num_ships: int, enemy_health: int) -> None:
-        """Initialize ships for battle, matching the C code logic."""
-        self.num_ships = num_ships
-        self.num_on_screen = 0
-        self.ships = [0] * 10
-        self.enemy_health = enemy_health
-        
-        # Fill the first 5 positions with ships
-        for i in range(min(5, num_ships)):
-            self.ships[i] = int((enemy_health * random.random()) + 20)
-            self.num_on_screen += 1
-            
-        # If more than 5 ships, fill the second row
-        if num_ships > 5:
-            for i in range(5, min(10, num_ships)):
-                self.ships[i] = int((enemy_health * random.random()) + 20)
-                self.num_on_screen += 1
-                
+        self.ships = [0] * FLEET_SLOTS  # Health of the ship drawn in each position, 0 if empty
+        self.explosions = [False] * FLEET_SLOTS  # Whether each position is exploding
+        self.sinking = [False] * FLEET_SLOTS  # Whether each position is sinking
+        self.sink_frames = [0] * FLEET_SLOTS  # Current frame of sinking animation
+        self._strips: Dict[int, Strip] = {}  # Rendered lines, dropped when a position on them changes
+        self.remaining = 0  # Ships left in the battle as of the last change shown
+        self._fleet: Optional[EnemyFleet] = None
+        self._pending: Deque[FleetChange] = deque()  # Changes not shown yet
+        
+    def observe(self, fleet: EnemyFleet) -> None:
+        """Show the given fleet and follow its changes."""
+        if self._fleet is not None:
+            self._fleet.unsubscribe(self._on_fleet_change)
+        self._fleet = fleet
+        fleet.subscribe(self._on_fleet_change)
+        self._pending.clear()
+        self.ships = list(fleet.health)
+        self.remaining = fleet.num_ships
         self.refresh()
         
-    def backfill_ships(self) -> None:
-        """Backfill empty positions with new ships if there are still ships remaining."""
-        if self.num_ships > self.num_on_screen:
-            # Find empty positions and fill them
-            for i in range(10):
-                if self.ships[i] == 0 and self.num_ships > self.num_on_screen:
-                    self.ships[i] = int((self.enemy_health * random.random()) + 20)
-                    self.num_on_screen += 1
-            self.refresh()
-        
-    def draw_ship(self, x: int, y: int) -> None:
-        """Draw a ship at the given position."""
-        self._write_at(x, y, "-|-_|_  ")
-        self._write_at(x, y + 1, "-|-_|_  ")
-        self._write_at(x, y + 2, "_|__|__/")
-        self._write_at(x, y + 3, "\\_____/ ")
-        
-    def draw_explosion(self, x: int, y: int) -> None:
-        """Draw an explosion at the given position."""
-        self._write_at(x, y, "********")
-        self._write_at(x, y + 1, "********")
-        self._write_at(x, y + 2, "********")
-        self._write_at(x, y + 3, "********")
-        
-    def clear_position(self, x: int, y: int) -> None:
-        """Clear the given position."""
-        self._write_at(x, y, "        ")
-        self._write_at(x, y + 1, "        ")
-        self._write_at(x, y + 2, "        ")
-        self._write_at(x, y + 3, "        ")
-        
-    def _write_at(self, x: int, y: int, text: str) -> None:
-        """Write text at the given position."""
-        # Ensure we have enough lines
-        while len(self._lines) <= y + 1:
-            self._lines.append("")
+    def _on_fleet_change(self, change: FleetChange) -> None:
+        """Queue a change to the fleet until it is shown."""
+        self._pending.append(change)
+        
+    def show_changes(self) -> None:
+        """Show every queued change at once, without animation."""
+        changed = set()
+        while self._pending:
+            change = self._pending.popleft()
+            self.ships[change.slot] = change.health
+            self.remaining = change.remaining
+            changed.add(change.slot)
+        for slot in changed:
+            self.refresh_slot(slot)
+        if self._fleet is not None:
+            self.remaining = self._fleet.num_ships
             
-        # Ensure the line is long enough
-        while len(self._lines[y]) < x + len(text):
-            self._lines[y] += " "
-            
-        # Insert the text
-        self._lines[y] = self._lines[y][:x] + text + self._lines[y][x + len(text):]
-        
-    def render(self) -> str:
-        """Render the ship display."""
-        # Clear the display
-        self._lines = []
-        
-        # Draw ships in their current positions
-        for i in range(10):
-            if self.ships[i] > 0:
-                x = 10 + (i % 5) * 10
-                y = 6 if i < 5 else 12
-                
-                if self.explosions[i]:
-                    self.draw_explosion(x, y)
-                elif self.sinking[i]:
-                    # Draw sinking animation frame
-                    if self.sink_frames[i] == 0:
-                        self.clear_position(x, y)
-                        self.draw_ship(x, y + 1)
-                    elif self.sink_frames[i] == 1:
-                        self.clear_position(x, y + 1)
-                        self.draw_ship(x, y + 2)
-                    elif self.sink_frames[i] == 2:
-                        self.clear_position(x, y + 2)
-                        self.draw_ship(x, y + 3)
-                    else:
-                        self.clear_position(x, y + 3)
-                else:
-                    self.draw_ship(x, y)
-                    
-        return "\n".join(self._lines)
-        
-    async def animate_sinking(self, index: int) -> None:
-        """Animate a ship sinking."""
+    async def play_changes(self, speed: float, on_shot: Optional[Callable[[], Awaitable[None]]] = None) -> None:
+        """
+        Show queued changes one at a time, animating hits and sinkings.
+        
+        Args:
+            speed: Multiplier for the animation delays
+            on_shot: Awaited after each hit or sinking has been shown
+        """
+        while self._pending:
+            change = self._pending.popleft()
+            if change.kind in (HIT, SUNK):
+                await self.animate_explosion(change.slot, 0.1 * speed)
+                if change.kind == SUNK:
+                    await self.animate_sinking(change.slot, 0.5 * speed)
+            else:
+                self.ships[change.slot] = change.health
+                self.refresh_slot(change.slot)
+            self.remaining = change.remaining
+            if on_shot is not None and change.kind in (HIT, SUNK):
+                await on_shot()
+        if self._fleet is not None:
+            self.remaining = self._fleet.num_ships
+        
+    def refresh_slot(self, index: int) -> None:
+        """Repaint the area of one ship position, including its sinking frames."""
+        x, y = self._position(index)
+        for row in range(y, y + CELL_HEIGHT):
+            self._strips.pop(row, None)
+        self.refresh(Region(x, y, SHIP_WIDTH, CELL_HEIGHT))
+        
+    def refresh(self, *regions: Region, **kwargs) -> "ShipDisplay":
+        """Repaint the given regions, or drop every cached line when repainting all of it."""
+        if not regions:
+            self._strips.clear()
+        return super().refresh(*regions, **kwargs)
+        
+    @staticmethod
+    def _position(index: int) -> Tuple[int, int]:
+        """Top left corner of a ship position."""
+        return 10 + (index % 5) * 10, 6 if index < 5 else 12
+        
+    def _sprite(self, index: int) -> Optional[Sprite]:
+        """Current sprite frame of a position, or None if it is empty."""
+        if self.ships[index] <= 0:
+            return None
+        if self.explosions[index]:
+            return BLAST_SPRITE
+        if self.sinking[index]:
+            return SINK_SPRITES[self.sink_frames[index]]
+        return SHIP_SPRITE
+        
+    def get_content_height(self, container: Size, viewport: Size, width: int) -> int:
+        """Always the full height, so emptying the bottom row does not resize the widget."""
+        return DISPLAY_HEIGHT
+        
+    def render_line(self, y: int) -> Strip:
+        """Render one line of the display."""
+        strip = self._strips.get(y)
+        if strip is None:
+            strip = self._strips[y] = Strip([Segment(self._build_line(y))])
+        return strip
+        
+    def _build_line(self, y: int) -> str:
+        """Compose one line from the sprite rows of the positions that cover it."""
+        cells = [_BLANK] * 5
+        drawn = False
+        # Later positions are drawn over earlier ones where their cells overlap
+        for index in range(FLEET_SLOTS):
+            top = 6 if index < 5 else 12
+            if not top <= y < top + CELL_HEIGHT:
+                continue
+            sprite = self._sprite(index)
+            if sprite is None:
+                continue
+            row = sprite[y - top]
+            if row is not None:
+                cells[index % 5] = row
+                drawn = True
+        if not drawn:
+            return ""
+        return " " * 10 + "  ".join(cells)
+        
+    async def animate_sinking(self, index: int, delay: float = 0.5) -> None:
+        """Animate a ship sinking, then clear its position."""
         self.sinking[index] = True
         self.sink_frames[index] = 0
         
-        for frame in range(4):
+        for frame in range(SINK_FRAMES):
             self.sink_frames[index] = frame
-            self.refresh()
-            await asyncio.sleep(0.5)
+            self.refresh_slot(index)
+            await asyncio.sleep(delay)
             
         self.sinking[index] = False
         self.sink_frames[index] = 0
         self.ships[index] = 0
-        self.num_on_screen -= 1
-        self.num_ships -= 1
-        
-        # Backfill if there are still ships remaining
-        self.backfill_ships()
-        
-        self.refresh()
+        self.refresh_slot(index)
         
-    async def animate_explosion(self, index: int) -> None:
+    async def animate_explosion(self, index: int, delay: float = 0.1) -> None:
         """Animate an explosion."""
         self.explosions[index] = True
-        self.refresh()
-        await asyncio.sleep(0.1)
+        self.refresh_slot(index)
+        await asyncio.sleep(delay)
         self.explosions[index] = False
-        self.refresh()
+        self.refresh_slot(index)
 
 class BattleScreen(Screen):
     """Screen for handling sea battles."""
@@ -172,7 +224,6 @@ class BattleScreen(Screen):
     battle_status = reactive("")
     battle_message = reactive("")
     battle_orders = reactive("")
-    battle_ships = reactive("")
     
     CSS = """
     #battle-container {
@@ -228,21 +279,13 @@ class BattleScreen(Screen):
     ) -> None:
         super().__init__(name, id, classes)
         self.game_state = game_state
+        self.battle = Battle(game_state, num_ships, battle_type)
         self.battle_type = battle_type
-        self.num_ships = num_ships
-        self.original_ships = num_ships
         self.orders = 0
-        self.num_on_screen = 0
-        self.ships_on_screen = [0] * 10
-        self.ok = 0
-        self.ik = 1
-        self.time = ((self.game_state.year - 1860) * 12) + self.game_state.month
-        
-        # Calculate booty
-        self.booty = (self.time // 4 * 1000 * num_ships) + random.randint(0, 999) + 250
         
         self.long_pause = 1.5
         self.short_pause = 0.5
+        self.round_messages: List[str] = []  # Messages of the current round, for instant mode
     
     def compose(self) -> ComposeResult:
         """Create child widgets for the screen."""
@@ -261,8 +304,10 @@ class BattleScreen(Screen):
     
     def on_mount(self) -> None:
         """Set up the screen when it is mounted."""
-        self.battle_status = f"{self.num_ships} hostile ships approaching, Taipan!"
-        self.battle_orders = "Taipan, what shall we do??    (f=Fight, r=Run, t=Throw cargo)"
+        self.battle_status = f"{self.battle.num_ships} hostile ships approaching, Taipan!"
+        self.battle_orders = self._orders_prompt()
+        self.ship_display.observe(self.battle.fleet)
+        self._fill_ship_display()
         self._update_battle_status()
         
         # Explicitly update the widgets to reflect the initial values
@@ -284,12 +329,6 @@ class BattleScreen(Screen):
         if self.is_mounted:
             self.battle_orders_widget.update(orders)
     
-    def watch_battle_ships(self, ships: str) -> None:
-        """Called when battle_ships changes."""
-        if self.is_mounted:
-            self.ship_display.ships = [int(x) if x else 0 for x in ships.split(',')]
-            self.ship_display.refresh()
-    
     def _update_battle_status(self) -> None:
         """Update the battle status display."""
         status = 100 - ((self.game_state.damage / self.game_state.capacity) * 100)
@@ -301,86 +340,96 @@ class BattleScreen(Screen):
         
         self.battle_status = (
             f"Current seaworthiness: {status_text} ({int(status)}%)\n"
-            f"Ships remaining: {self.num_ships}\n"
+            f"Ships remaining: {self.ship_display.remaining}\n"
             f"Guns: {self.game_state.guns}\n"
             f"Hold: {self.game_state.hold}/{self.game_state.capacity}"
         )
     
+    @property
+    def speed(self) -> float:
+        """Multiplier for battle pauses and animations, from the app's animation speed."""
+        return ANIMATION_SPEEDS[getattr(self.app, "animation_speed", DEFAULT_ANIMATION_SPEED)]
+    
+    @property
+    def instant(self) -> bool:
+        """Whether rounds are resolved in one step without animation."""
+        return self.speed == 0
+    
     async def _update_battle_message(self, message: str, delay: float) -> None:
         """Update the battle message display."""
+        if self.instant:
+            # Show the whole round at once instead of one message at a time
+            self.round_messages.append(message.strip())
+            self.battle_message = "\n".join(self.round_messages)
+            return
         self.battle_message = message
-        await asyncio.sleep(delay)
+        await asyncio.sleep(delay * self.speed)
+    
+    def _orders_prompt(self) -> str:
+        """Ask for orders, with the advice of the battle odds table if the game has one."""
+        odds = getattr(self.app, "battle_odds", None)
+        if odds is None:
+            return ORDERS_PROMPT
+        advice = odds.recommend(self.battle)
+        return (
+            f"{ORDERS_PROMPT}\n"
+            f"Advice: {ADVICE_ORDERS[advice.order]} ({advice.survival:.0%} survive, "
+            f"{advice.damage:.0f} damage, ${advice.booty:,.0f} booty expected)"
+        )
     
     def _update_battle_orders(self, message: str) -> None:
         """Update the battle orders display."""
         self.battle_orders = message
     
+    def _fill_ship_display(self) -> None:
+        """Bring waiting ships into empty positions for the next round."""
+        self.battle.fill_slots()
+        self.ship_display.show_changes()
+    
+    async def _animate_shots(self, report: FightReport) -> None:
+        """Animate a round of firing one shot at a time."""
+        shots_left = len(report.shots)
+        
+        async def shot_shown() -> None:
+            nonlocal shots_left
+            shots_left -= 1
+            self._update_battle_status()
+            if shots_left > 0:
+                await self._update_battle_message(f"({shots_left} shots remaining.)", 0.5)
+        
+        await self.ship_display.play_changes(self.speed, shot_shown)
+    
+    def _show_changes(self) -> None:
+        """Bring the display up to date with the fleet without animating."""
+        self.ship_display.show_changes()
+        self._update_battle_status()
+    
     @work
     async def _handle_fight(self) -> None:
         """Handle fight orders."""
-        if self.game_state.guns == 0:
+        report = self.battle.fight()
+        if report.no_guns:
             await self._update_battle_message("We have no guns, Taipan!!", self.short_pause)
+            await self.after_action()
             return
         
         await self._update_battle_message("Aye, we'll fight 'em, Taipan.", self.short_pause)
         
         await self._update_battle_message("We're firing on 'em, Taipan!", self.short_pause)
         
-        sk = 0  # Ships sunk
-        for i in range(1, self.game_state.guns + 1):
-            if self.num_ships == 0:
-                break
-            
-            # Fill empty ship slots with new ships
-            if self.num_ships > self.num_on_screen:
-                for j in range(10):
-                    if self.ships_on_screen[j] == 0:
-                        self.ships_on_screen[j] = int((self.game_state.enemy_health * random.random()) + 20)
-                        self.num_on_screen += 1
-                        self.ship_display.ships[j] = self.ships_on_screen[j]
-                        self.ship_display.refresh()
-            
-            # Target a ship
-            targeted = random.randint(0, 9)
-            while self.ships_on_screen[targeted] == 0:
-                targeted = random.randint(0, 9)
-            
-            # Show explosion
-            await self.ship_display.animate_explosion(targeted)
-            
-            # Apply damage
-            self.ships_on_screen[targeted] -= random.randint(10, 40)
-            
-            if self.ships_on_screen[targeted] <= 0:
-                self.num_on_screen -= 1
-                self.num_ships -= 1
-                sk += 1
-                self.ships_on_screen[targeted] = 0
-                await self.ship_display.animate_sinking(targeted)
-            
-            # Update display
-            self._update_battle_status()
-            self.ship_display.refresh()
-            
-            if i < self.game_state.guns:
-                await self._update_battle_message(f"({self.game_state.guns - i} shots remaining.)", 0.5)
+        if self.instant:
+            self._show_changes()
+        else:
+            await self._animate_shots(report)
         
-        if sk > 0:
-            await self._update_battle_message(f"Sunk {sk} of the buggers, Taipan!", self.short_pause)
+        if report.sunk > 0:
+            await self._update_battle_message(f"Sunk {report.sunk} of the buggers, Taipan!", self.short_pause)
         else:
             await self._update_battle_message("Hit 'em, but didn't sink 'em, Taipan!", self.short_pause)
         
-        # Check if some ships run away
-        if (random.randint(1, self.original_ships) > (self.num_ships * 0.6 / self.battle_type) and 
-            self.num_ships > 2):
-            divisor = self.num_ships // 3 // self.battle_type
-            if divisor == 0:
-                divisor = 1
-            ran = random.randint(1, divisor)
-            self.num_ships -= ran
-            
-            self._update_battle_status()
-            await self._update_battle_message(f"{ran} ran away, Taipan!", self.short_pause)
+        if report.ran_away > 0:
+            self._show_changes()
+            await self._update_battle_message(f"{report.ran_away} ran away, Taipan!", self.short_pause)
             
         await self.after_action()
     
@@ -389,25 +438,17 @@ class BattleScreen(Screen):
         """Handle run orders."""
         await self._update_battle_message("Aye, we'll run, Taipan.", self.short_pause)
         
-        self.ok += self.ik
-        self.ik += 1
-        
-        if random.randint(1, self.ok) > random.randint(1, self.num_ships):
+        report = self.battle.run()
+        if report.escaped:
             await self._update_battle_message("We got away from 'em, Taipan!", self.short_pause)
-            self.num_ships = 0
         else:
             await self._update_battle_message("Couldn't lose 'em.", self.short_pause)
             
-            if self.num_ships > 2 and random.randint(1, 5) == 1:
-                lost = random.randint(1, self.num_ships // 2)
-                self.num_ships -= lost
-                
-                self._update_battle_status()
-                await self._update_battle_message(f"But we escaped from {lost} of 'em!", self.short_pause)
-                
-                # Get new orders
-                self.orders = 0
-                self._update_battle_orders("Taipan, what shall we do??    (f=Fight, r=Run, t=Throw cargo)")
+            if report.lost > 0:
+                self._show_changes()
+                await self._update_battle_message(f"But we escaped from {report.lost} of 'em!", self.short_pause)
+        
+        await self.after_action()
     
     @work
     async def _handle_throw_cargo(self) -> None:
@@ -417,69 +458,47 @@ class BattleScreen(Screen):
         # TODO: Handle cargo selection and amount
         pass
     
-    async def _handle_enemy_attack(self) -> BattleResult:
-        """Handle enemy attack."""
+    async def _handle_enemy_attack(self, attack: AttackReport) -> None:
+        """Show the enemy attack."""
         await self._update_battle_message("They're firing on us, Taipan!", self.short_pause)
         # TODO: Implement visual attack effect
         await self._update_battle_message("We've been hit, Taipan!!", self.short_pause)
         
-        # Calculate damage
-        i = min(15, self.num_ships)
-        if (self.game_state.guns > 0 and 
-            (random.randint(1, 100) < ((self.game_state.damage / self.game_state.capacity) * 100) or
-             ((self.game_state.damage / self.game_state.capacity) * 100) > 80)):
-            i = 1
-            self.game_state.guns -= 1
-            self.game_state.hold += 10
+        if attack.gun_hit:
             await self._update_battle_message("The buggers hit a gun, Taipan!!", self.short_pause)
         
-        damage = int((self.game_state.enemy_damage * i * self.battle_type * random.random()) + (i / 2))
-        self.game_state.damage += damage
-        
-        if self.battle_type == GENERIC and random.randint(1, 20) == 1:
-            self.app.switch_screen(CompleteTravelScreen(self.game_state))
-            return BATTLE_INTERRUPTED
-        
         self._update_battle_status()
-        return BATTLE_NOT_FINISHED
     
     async def after_action(self) -> None:
         # Handle enemy attack after player's action
-        if self.num_ships > 0:
-            result = await self._handle_enemy_attack()
-            if result != BATTLE_NOT_FINISHED:
-                if result == BATTLE_LOST:
-                    self.notify("Your ship has been lost!", severity="error")
-                self.app.switch_screen(CompleteTravelScreen(self.game_state))
-                return
-        
-        # Check if battle is won
-        if self.num_ships == 0:
-            if self.orders == 1:
-                await self._update_battle_message("We got 'em all, Taipan!", self.short_pause)
-                await self._update_battle_message("We captured some booty.\n",self.short_pause);
-                await self._update_battle_message(f"It's worth {self.booty}!", self.long_pause);
-                self.game_state.cash += self.booty
-                self.app.switch_screen(CompleteTravelScreen(self.game_state))
-                return
-            else:
-                self.app.switch_screen(CompleteTravelScreen(self.game_state))
-                return
-        
-        # Check if ship is lost
-        status = 100 - ((self.game_state.damage / self.game_state.capacity) * 100)
-        if status <= 0:
+        attack = self.battle.end_round()
+        if attack is not None:
+            await self._handle_enemy_attack(attack)
+        
+        result = self.battle.result
+        if result == BATTLE_WON:
+            await self._update_battle_message("We got 'em all, Taipan!", self.short_pause)
+            await self._update_battle_message("We captured some booty.\n", self.short_pause)
+            await self._update_battle_message(f"It's worth {self.battle.booty}!", self.long_pause)
+        elif result == BATTLE_LOST:
             self.notify("Your ship has been lost!", severity="error")
+        
+        if self.battle.finished:
+            if self.instant:
+                # The summary would be gone with the screen, so leave it as a notification
+                self.notify(self.battle_message)
             self.app.switch_screen(CompleteTravelScreen(self.game_state))
             return
         
         # Reset orders for next turn
+        self._fill_ship_display()
         self.orders = 0
-        self._update_battle_orders("Taipan, what shall we do??    (f=Fight, r=Run, t=Throw cargo)") 
+        self._update_battle_orders(self._orders_prompt()) 
     
     async def on_key(self, event: events.Key) -> None:
         """Handle key press events."""
         if self.orders == 0:
+            self.round_messages = []
             if event.key.lower() == 'f':
                 self.orders = 1
                 self._update_battle_orders("Fighting!")
@@ -493,5 +512,5 @@ class BattleScreen(Screen):
                 self._update_battle_orders("Throwing cargo!")
                 self._handle_throw_cargo()
             else:
-                self._update_battle_orders("Taipan, what shall we do??    (f=Fight, r=Run, t=Throw cargo)")
+                self._update_battle_orders(self._orders_prompt())
                 return
\ No newline at end of file
@@ -9,11 +9,30 @@ from textual.containers import Container
 from textual import events
 from rich.panel import Panel
 from rich.text import Text
+from rich.console import RenderableType
 from typing import Literal, Optional, Union, cast
 
 from ..game_state import GameState, ITEMS
-from ..utils import get_one
-from .port_screen import PortScreen
+from ..utils import ALL, get_one
+from ..engine import GameRuleError, affordable, buy
+from .port_screen import show_port
+from .panels import MarkupTemplate, panel_cache
+from .number_input import NumberInput
+
+BUY_TEMPLATE = MarkupTemplate("""
+[bold]Buy Cargo[/bold]
+
+Current Port: {port}
+Cash: ${cash}
+Hold Space: {hold}/{capacity}
+
+[bold]Available Cargo:[/bold]
+O) Opium: ${opium} per unit
+S) Silk: ${silk} per unit
+A) Arms: ${arms} per unit
+G) General: ${general} per unit
+
+Select cargo type (O/S/A/G) or press Q to quit:""")
 
 class BuyScreen(Screen):
     """Screen for buying cargo."""
@@ -21,7 +40,6 @@ class BuyScreen(Screen):
     def __init__(self, game_state: GameState):
         super().__init__()
         self.game_state = game_state
-        self.amount_input = ""
         self.selected_cargo = None
         self.amount_dialog = None
     
@@ -29,28 +47,27 @@ class BuyScreen(Screen):
         yield Header()
         yield Footer()
         yield Static(self.render_content())
+        yield NumberInput()
     
-    def render_content(self) -> str:
+    def render_content(self) -> RenderableType:
         """Render the buy screen content."""
-        content = f"""
-[bold]Buy Cargo[/bold]
-
-Current Port: {self.game_state.get_current_location()}
-Cash: ${self.game_state.format_money(self.game_state.cash)}
-Hold Space: {self.game_state.hold}/{self.game_state.capacity}
-
-[bold]Available Cargo:[/bold]
-O) Opium: ${self.game_state.format_money(self.game_state.price[0])} per unit
-S) Silk: ${self.game_state.format_money(self.game_state.price[1])} per unit
-A) Arms: ${self.game_state.format_money(self.game_state.price[2])} per unit
-G) General: ${self.game_state.format_money(self.game_state.price[3])} per unit
-
-Select cargo type (O/S/A/G) or press Q to quit:
-"""
-        if self.selected_cargo:
-            cargo_name = {"o": "Opium", "s": "Silk", "a": "Arms", "g": "General"}[self.selected_cargo]
-            content += f"\nEnter amount of {cargo_name} to buy: {self.amount_input}"
-        return content
+        gs = self.game_state
+        key = ("buy", gs.port, gs.cash, gs.hold, gs.capacity, tuple(gs.price))
+        return panel_cache.get(key, self._create_cargo_text)
+    
+    def _create_cargo_text(self) -> Text:
+        """Create the prices and cargo choices."""
+        gs = self.game_state
+        return BUY_TEMPLATE.render(
+            port=gs.get_current_location(),
+            cash=gs.format_money(gs.cash),
+            hold=gs.hold,
+            capacity=gs.capacity,
+            opium=gs.format_money(gs.price[0]),
+            silk=gs.format_money(gs.price[1]),
+            arms=gs.format_money(gs.price[2]),
+            general=gs.format_money(gs.price[3]),
+        )
     
     def on_key(self, event: events.Key) -> None:
         """Handle key presses."""
@@ -59,51 +76,28 @@ Select cargo type (O/S/A/G) or press Q to quit:
             return
         
         if self.selected_cargo is None:
-            # First key press - select cargo type
+            # First key press - select cargo type, then ask for the amount
             if event.key.lower() in ["o", "s", "a", "g"]:
                 self.selected_cargo = event.key.lower()
-                self.query_one(Static).update(self.render_content())
-                return
+                cargo_name = {"o": "Opium", "s": "Silk", "a": "Arms", "g": "General"}[self.selected_cargo]
+                self.query_one(NumberInput).start(f"Enter amount of {cargo_name} to buy (or press Enter for all you can afford): ")
+    
+    def on_number_input_submitted(self, message: NumberInput.Submitted) -> None:
+        """Buy the amount entered."""
+        if self.selected_cargo is None:
+            return  # No cargo has been chosen, so nothing was asked
+        cargo_index = {"o": 0, "s": 1, "a": 2, "g": 3}[self.selected_cargo]
+        self.selected_cargo = None
+        amount = affordable(self.game_state, cargo_index) if message.amount == ALL else message.amount
+        try:
+            buy(self.game_state, cargo_index, amount)
+        except GameRuleError as error:
+            self.notify(str(error), severity="error")
+            return
         
-        if self.selected_cargo is not None:
-            # Second key press - enter amount
-            if event.key.isdigit():
-                self.amount_input += event.key
-                self.query_one(Static).update(self.render_content())
-                return
-            
-            if event.key == "enter":
-                try:
-                    amount = int(self.amount_input)
-                    if amount <= 0:
-                        self.notify("Amount must be positive", severity="error")
-                        return
-                    
-                    # Calculate total cost
-                    cargo_index = {"o": 0, "s": 1, "a": 2, "g": 3}[self.selected_cargo]
-                    total_cost = amount * self.game_state.price[cargo_index]
-                    
-                    # Check if player can afford it
-                    if total_cost > self.game_state.cash:
-                        self.notify("Not enough cash", severity="error")
-                        return
-                    
-                    # Check if there's enough hold space
-                    if self.game_state.hold + amount > self.game_state.capacity:
-                        self.notify("Not enough hold space", severity="error")
-                        return
-                    
-                    # Make the purchase
-                    self.game_state.cash -= total_cost
-                    self.game_state.hold_[cargo_index] += amount
-                    self.game_state.hold += amount
-                    
-                    # Refresh port screen
-                    self.app.pop_screen()
-                    self.app.push_screen(PortScreen(self.game_state))
-                    
-                except ValueError:
-                    self.notify("Invalid amount", severity="error")
-                finally:
-                    self.amount_input = ""
-                    self.selected_cargo = None 
\ No newline at end of file
+        # Back to the port screen, which shows the new state
+        show_port(self.app, self.game_state)
+    
+    def on_number_input_cancelled(self, message: NumberInput.Cancelled) -> None:
+        """Go back to choosing a cargo."""
+        self.selected_cargo = None
@@ -7,10 +7,10 @@ from textual.app import ComposeResult
 from textual.screen import Screen
 from textual.widgets import Static
 from textual.containers import Container
-import random
 
 from ..game_state import GameState
-from .port_screen import PortScreen
+from ..engine import complete_voyage
+from .port_screen import show_port
 
 # Port locations
 LOCATIONS = {
@@ -50,52 +50,28 @@ class CompleteTravelScreen(Screen):
         self._update_travel_status()
         self._update_travel_message("Traveling...")
         
-        self.game_state.port = self.game_state.destination_port
-        # Check for storm
-        if random.randint(1, 10) == 1:  # 1 in 10 chance of storm
+        report = complete_voyage(self.game_state)
+        if report.storm:
             self.notify("Storm, Taipan!!", severity="warning")
             
-            # Check for sinking
-            if random.randint(1, 30) == 1:  # 1 in 30 chance of sinking
+            if report.going_down:
                 self.notify("   I think we're going down!!", severity="warning")
                 
-                # Check if we actually sink
-                if ((self.game_state.damage / self.game_state.capacity * 3) * random.random()) >= 1:
+                if report.sunk:
                     self.notify("We're going down, Taipan!!", severity="error")
                     # TODO: Implement final_stats
                     return
             
             self.notify("    We made it!!", severity="information")
             
-            # Check for being blown off course
-            if random.randint(1, 3) == 1:  # 1 in 3 chance of being blown off course                
-                while self.game_state.port == self.game_state.destination_port:
-                    self.game_state.port = random.randint(1, 7)
+            if report.blown_off_course:
                 self.notify(f"We've been blown off course\nto {LOCATIONS[self.game_state.port]}", severity="warning")
-            
-        
-        # Advance date
-        self.game_state.month += 1
-        if self.game_state.month == 13:
-            self.game_state.month = 1
-            self.game_state.year += 1
-            self.game_state.enemy_health += 10
-            self.game_state.enemy_damage += 0.5
-        
-        # Update debt and bank balance
-        self.game_state.debt = int(self.game_state.debt * 1.1)  # 10% increase
-        self.game_state.bank = int(self.game_state.bank * 1.005)  # 0.5% increase
         
         # Update location
         self.notify(f"Arriving at {LOCATIONS[self.game_state.port]}...", severity="information")
         
-        
-        # Update prices
-        self.game_state.set_prices()
-        
-        # Return to port screen
-        self.app.pop_screen()
-        self.app.push_screen(PortScreen(self.game_state))
+        # Return to the port screen for the new port
+        show_port(self.app, self.game_state, arrived=True)
     
     def _update_travel_status(self) -> None:
         """Update the travel status display."""
@@ -0,0 +1,106 @@
+"""
+Numeric entry line for Taipan.
+"""
+
+from typing import Generator, Optional, Union
+
+from rich.text import Text
+from textual import events
+from textual.message import Message
+from textual.widget import Widget
+
+from ..utils import get_num
+
+# Longest amount the C code accepts
+MAX_DIGITS = 9
+
+
+class NumberInput(Widget, can_focus=True):
+    """
+    A one-line prompt for an amount, driven by utils.get_num().
+    
+    While a prompt is showing the widget takes the keyboard: digits,
+    backspace, Enter and Escape are handled here and repaint only this line.
+    Enter on an empty line, or A, submits ALL.
+    """
+    
+    DEFAULT_CSS = """
+    NumberInput {
+        height: 1;
+        margin-top: 1;
+        display: none;
+    }
+    """
+    
+    class Submitted(Message):
+        """An amount was entered."""
+        
+        def __init__(self, number_input: "NumberInput", amount: int) -> None:
+            super().__init__()
+            self.number_input = number_input
+            self.amount = amount  # ALL when the player asked for everything
+    
+    class Cancelled(Message):
+        """The prompt was dismissed with Escape."""
+        
+        def __init__(self, number_input: "NumberInput") -> None:
+            super().__init__()
+            self.number_input = number_input
+    
+    def __init__(
+        self,
+        maxlen: int = MAX_DIGITS,
+        name: Union[str, None] = None,
+        id: Union[str, None] = None,
+        classes: Union[str, None] = None
+    ) -> None:
+        super().__init__(name=name, id=id, classes=classes)
+        self.maxlen = maxlen
+        self.prompt = Text()
+        self.typed = ""
+        self._entry: Optional[Generator[str, events.Key, Optional[int]]] = None
+    
+    @property
+    def active(self) -> bool:
+        """Whether a prompt is waiting for an amount."""
+        return self._entry is not None
+    
+    def start(self, prompt: Union[str, Text]) -> None:
+        """Show a prompt and take the keyboard until it is answered."""
+        self.prompt = Text(prompt) if isinstance(prompt, str) else prompt
+        self._entry = get_num(self.maxlen)
+        self.typed = next(self._entry)
+        self.display = True
+        self.focus()
+        self.refresh()
+    
+    def stop(self) -> None:
+        """Hide the prompt and give the keyboard back to the screen."""
+        self._entry = None
+        self.typed = ""
+        self.display = False
+        self.blur()
+    
+    def render(self) -> Text:
+        """Render the prompt and what has been typed."""
+        return Text.assemble(self.prompt, self.typed)
+    
+    def on_key(self, event: events.Key) -> None:
+        """Feed keys to get_num() while a prompt is showing."""
+        if self._entry is None:
+            return
+        event.stop()
+        event.prevent_default()
+        typed = self.typed
+        try:
+            self.typed = self._entry.send(event)
+        except StopIteration as done:
+            self.stop()
+            if done.value is None:
+                self.post_message(self.Cancelled(self))
+            else:
+                self.post_message(self.Submitted(self, done.value))
+            return
+        if self.typed != typed:
+            self.refresh()
+
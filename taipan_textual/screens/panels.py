@@ -0,0 +1,94 @@
+"""
+Shared rendering helpers for the Taipan screens.
+
+Panels are cached by the values they show, so redrawing a screen whose
+state has not changed reuses the Rich renderable built last time. Console
+markup is parsed once per template rather than on every update.
+"""
+
+from collections import OrderedDict
+from typing import Callable, Hashable, List, TypeVar, Union
+import re
+
+from rich.console import RenderableType
+from rich.text import Text
+
+# Number of rendered panels kept across all screens
+PANEL_CACHE_SIZE = 256
+
+R = TypeVar("R", bound=RenderableType)
+
+_FIELD = re.compile(r"\{(\w+)\}")
+
+
+class PanelCache:
+    """A bounded least-recently-used cache of rendered panels."""
+
+    def __init__(self, maxsize: int = PANEL_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._panels: "OrderedDict[Hashable, RenderableType]" = OrderedDict()
+
+    def get(self, key: Hashable, build: Callable[[], R]) -> R:
+        """
+        Get the panel for a key, building it on a miss.
+
+        Args:
+            key: Everything the panel shows, starting with the panel's name
+            build: Builds the panel from the current state
+
+        Returns:
+            The cached or newly built panel
+        """
+        panels = self._panels
+        panel = panels.get(key)
+        if panel is not None:
+            self.hits += 1
+            panels.move_to_end(key)
+            return panel  # type: ignore[return-value]
+        self.misses += 1
+        panel = panels[key] = build()
+        if len(panels) > self.maxsize:
+            panels.popitem(last=False)
+        return panel
+
+    def clear(self) -> None:
+        """Drop every cached panel."""
+        self._panels.clear()
+
+    def __len__(self) -> int:
+        return len(self._panels)
+
+
+class MarkupTemplate:
+    """
+    Console markup with ``{name}`` fields, parsed once.
+
+    Field values are inserted as plain text, so they are never read as
+    markup.
+    """
+
+    def __init__(self, markup: str) -> None:
+        text = Text.from_markup(markup)
+        self._parts: List[Union[Text, str]] = []  # Parsed pieces and field names, in order
+        position = 0
+        for match in _FIELD.finditer(text.plain):
+            self._parts.append(text[position:match.start()])
+            self._parts.append(match.group(1))
+            position = match.end()
+        self._parts.append(text[position:])
+
+    def render(self, **values: object) -> Text:
+        """Fill in the fields."""
+        result = Text()
+        for part in self._parts:
+            if isinstance(part, str):
+                result.append(str(values[part]))
+            else:
+                result.append_text(part)
+        return result
+
+
+# Shared by every screen
+panel_cache = PanelCache()
@@ -2,53 +2,136 @@
 Port screen for Taipan game.
 """
 
-from textual.app import ComposeResult
+from textual.app import App, ComposeResult
 from textual.screen import Screen
 from textual.widgets import Header, Footer, Static, Input
-from textual.containers import Container
+from textual.containers import Container, Vertical
 from rich.panel import Panel
 from rich.table import Table
 from rich.text import Text
 from rich.console import Group
-import random
-from typing import cast
+from typing import Optional, cast
 from textual import events
+from textual.message import Message
+
+from ..game_state import GameState, ObservableGameState, ITEMS, LOCATIONS
+from ..engine import GameRuleError, Offer, answer_li_yuen, answer_offer, arrive_in_port, plan_route
+from ..engine.advisor import ADVISOR_VOYAGES, describe_plan
+from ..journal import GOODS_STOLEN, GUN_OFFER, LI_YUEN_SUMMONS, OPIUM_SEIZED, PRICE_CHANGE, ROBBED
+from ..profiling import timed
+from .panels import panel_cache
+
+# Name the port screen is installed under
+PORT_SCREEN = "port"
+
+# Game state fields shown by each panel
+PANEL_FIELDS = {
+    "status": ("month", "year", "port", "cash", "bank", "debt", "damage", "capacity", "guns", "hold", "warehouse", "hold_"),
+    "prices": ("price",),
+    "advisor": ("port", "price", "cash", "capacity", "hold", "hold_", "warehouse"),
+    "actions": ("port",),
+}
+
+# Keys for the actions available in port
+PORT_ACTIONS = {
+    'b': 'buy',
+    's': 'sell',
+    'v': 'visit_bank',
+    't': 'transfer',
+    'q': 'quit',
+    'w': 'wheedle',
+    'r': 'retire'
+}
+
+
+def arrival_message(game_state: GameState, code: int, values: tuple) -> Optional[str]:
+    """The Comprador's report of an arrival event, or None if the player is not told."""
+    money = game_state.format_money
+    if code == OPIUM_SEIZED:
+        return f"Bad Joss!!\nThe local authorities have seized your\nOpium cargo and have also fined you\n${money(values[1])}, Taipan!"
+    if code == GOODS_STOLEN:
+        return "Messenger reports large theft\nfrom warehouse, Taipan."
+    if code == LI_YUEN_SUMMONS:
+        return "Li Yuen has sent a Lieutenant,\nTaipan.  He says his admiral wishes\nto see you in Hong Kong, posthaste!"
+    if code == PRICE_CHANGE:
+        item, old_price, price = values
+        change = "dropped" if price < old_price else "risen"
+        return f"Taipan!!  The price of {ITEMS[item]}\nhas {change} to {money(price)}!!"
+    if code == ROBBED:
+        return f"You've been beaten up and\nrobbed of ${money(values[0])} in cash, Taipan!!"
+    return None
 
-from ..game_state import GameState, ITEMS, LOCATIONS
 
 class PortScreen(Screen):
     """Screen showing the current port status and available actions."""
     
+    class Arrived(Message):
+        """Posted when the ship has arrived in port and the arrival events have run."""
+    
     def __init__(self, game_state: GameState):
         super().__init__()
         self.game_state = game_state
+        self._stale = set(PANEL_FIELDS)  # Panels to rebuild on the next refresh
     
     def compose(self) -> ComposeResult:
         """Create child widgets for the port screen."""
         yield Header()
         yield Container(
-            Static(self._create_status_panel(), id="status"),
-            Static(self._create_prices_panel(), id="prices"),
-            Static(self._create_actions_panel(), id="actions"),
+            Static(self._panel("status"), id="status"),
+            Vertical(
+                Static(self._panel("prices"), id="prices"),
+                Static(self._panel("advisor"), id="advisor"),
+                id="market"
+            ),
+            Static(self._panel("actions"), id="actions"),
             id="port-container"
         )
         yield Footer()
     
+    def on_mount(self) -> None:
+        """Follow changes to the fields the panels show."""
+        if isinstance(self.game_state, ObservableGameState):
+            fields = {name for names in PANEL_FIELDS.values() for name in names}
+            self.game_state.subscribe(self._on_state_change, *fields)
+    
+    def on_unmount(self) -> None:
+        """Stop following the game state."""
+        if isinstance(self.game_state, ObservableGameState):
+            self.game_state.unsubscribe(self._on_state_change)
+    
+    def _on_state_change(self, name: str) -> None:
+        """Mark the panels that show a changed field."""
+        for panel, fields in PANEL_FIELDS.items():
+            if name in fields:
+                self._stale.add(panel)
+    
     def refresh(self, *args, **kwargs) -> None:
-        """Refresh the port screen display."""
+        """Refresh the port screen display, rebuilding only panels whose fields changed."""
+        if not isinstance(self.game_state, ObservableGameState):
+            # Without change events every panel may be out of date
+            self._stale.update(PANEL_FIELDS)
         # Only try to update widgets if they exist
         try:
-            if status_widget := self.query_one("#status", Static):
-                status_widget.update(self._create_status_panel())
-            if prices_widget := self.query_one("#prices", Static):
-                prices_widget.update(self._create_prices_panel())
-            if actions_widget := self.query_one("#actions", Static):
-                actions_widget.update(self._create_actions_panel())
+            if "status" in self._stale and (status_widget := self.query_one("#status", Static)):
+                status_widget.update(self._panel("status"))
+            if "prices" in self._stale and (prices_widget := self.query_one("#prices", Static)):
+                prices_widget.update(self._panel("prices"))
+            if "advisor" in self._stale and (advisor_widget := self.query_one("#advisor", Static)):
+                advisor_widget.update(self._panel("advisor"))
+            if "actions" in self._stale and (actions_widget := self.query_one("#actions", Static)):
+                actions_widget.update(self._panel("actions"))
+            self._stale.clear()
         except Exception:
             # If widgets don't exist yet, just pass
             pass
         super().refresh(*args, **kwargs)
     
+    def _panel(self, name: str) -> Panel:
+        """Get a panel from the shared cache, building it if the fields it shows changed."""
+        values = (getattr(self.game_state, field) for field in PANEL_FIELDS[name])
+        key = (f"port-{name}",) + tuple(tuple(value) if isinstance(value, list) else value for value in values)
+        return panel_cache.get(key, getattr(self, f"_create_{name}_panel"))
+    
     def _create_status_panel(self) -> Panel:
         """Create the panel showing current status."""
         text = Text()
@@ -94,6 +177,20 @@ class PortScreen(Screen):
             border_style="yellow"
         )
     
+    def _create_advisor_panel(self) -> Panel:
+        """Create the panel with the best trade route over the next voyages."""
+        plan = plan_route(self.game_state)
+        text = Text()
+        for number, line in enumerate(describe_plan(plan), 1):
+            text.append(f"{number}. {line}\n")
+        text.append(f"\nExpected cash: ${self.game_state.format_money(plan.cash)}", style="bold")
+        
+        return Panel(
+            text,
+            title=f"Advisor ({ADVISOR_VOYAGES} voyages)",
+            border_style="green"
+        )
+    
     def _create_actions_panel(self) -> Panel:
         """Create the panel with available actions."""
         actions = [
@@ -114,108 +211,133 @@ class PortScreen(Screen):
         action_text = "\n".join(f"{action} ({key})" for action, key in actions)
         
         return Panel(
-            action_text,
+            Text(action_text),
             title="Actions",
             border_style="yellow"
         )
     
-    def on_mount(self) -> None:
-        """Set up the screen when it is mounted."""
-        # Check for random events when arriving at port
+    def on_screen_resume(self) -> None:
+        """Show changes made by the screen that was on top."""
+        self.refresh()
+    
+    @property
+    def pending_question(self) -> Optional[str]:
+        """
+        What the player is being asked on arrival and must answer Y or N to.
+        
+        Returns:
+            "li_yuen" for Li Yuen's demand, which is asked first, "offer" for a
+            ship or gun offered, or None when nothing is being asked
+        """
+        if hasattr(self, '_li_yuen_amount'):
+            return "li_yuen"
+        if hasattr(self, '_offer'):
+            return "offer"
+        return None
+    
+    def arrive(self) -> None:
+        """Show the port the ship has just arrived at and run the arrival events."""
+        self.refresh()
         self._check_random_events()
+        self.post_message(self.Arrived())
     
+    @timed("PortScreen._check_random_events")
     def _check_random_events(self) -> None:
         """Check for random events that can occur when arriving at a port."""
-        # Li Yuen extortion (only in Hong Kong, if not already paid, and have cash)
-        if (self.game_state.port == 1 and 
-            self.game_state.li_yuen_relation == 0 and 
-            self.game_state.cash > 0):
-            self._li_yuen_extortion()
-        
-        # TODO: Implement mchenry (ship repair in Hong Kong)
-        if self.game_state.port == 1 and self.game_state.damage > 0:
-            pass  # TODO: Implement mchenry
-        
-        # TODO: Implement Elder Brother Wu warning
-        if (self.game_state.port == 1 and 
-            self.game_state.debt >= 10000 and 
-            self.game_state.wu_warn == 0):
-            pass  # TODO: Implement Wu warning
-        
-        # TODO: Implement Elder Brother Wu visit
-        if self.game_state.port == 1:
-            pass  # TODO: Implement Elder Brother Wu
-        
-        # TODO: Implement new ship/gun offers
-        if random.randint(1, 4) == 1:
-            pass  # TODO: Implement new ship/gun offers
-        
-        # TODO: Implement opium seizure
-        if (self.game_state.port != 1 and 
-            random.randint(1, 18) == 1 and 
-            self.game_state.hold_[0] > 0):
-            pass  # TODO: Implement opium seizure
-        
-        # TODO: Implement warehouse theft
-        if (random.randint(1, 50) == 1 and 
-            sum(self.game_state.warehouse) > 0):
-            pass  # TODO: Implement warehouse theft
-        
-        # TODO: Implement Li Yuen relation decay
-        if random.randint(1, 20) == 1:
-            pass  # TODO: Implement Li Yuen relation decay
-        
-        # TODO: Implement Li Yuen summons
-        if (self.game_state.port != 1 and 
-            self.game_state.li_yuen_relation == 0 and 
-            random.randint(1, 4) != 1):
-            pass  # TODO: Implement Li Yuen summons
-        
-        # TODO: Implement good prices
-        if random.randint(1, 9) == 1:
-            pass  # TODO: Implement good prices
-        
-        # TODO: Implement robbery
-        if (self.game_state.cash > 25000 and 
-            random.randint(1, 20) == 1):
-            pass  # TODO: Implement robbery
+        report = arrive_in_port(self.game_state)
+        for code, *values in report.events:
+            message = arrival_message(self.game_state, code, tuple(values))
+            if message is not None:
+                severity = "information" if code == PRICE_CHANGE else "warning"
+                self.notify(f"Comprador's Report\n\n{message}", severity=severity)
+        if report.offer is not None:
+            self._offer = report.offer
+        if report.li_yuen_demand is not None:
+            self._li_yuen_extortion(report.li_yuen_demand)
+        elif report.offer is not None:
+            self._ask_offer(report.offer)
     
-    def _li_yuen_extortion(self) -> None:
+    def _li_yuen_extortion(self, amount: int) -> None:
         """Handle Li Yuen's extortion attempt."""
-        time = ((self.game_state.year - 1860) * 12) + self.game_state.month
-        i = 1.8
-        j = 0
-        
-        if time > 12:
-            j = random.randint(1000 * time, 2000 * time)
-            i = 1
-        
-        amount = int((self.game_state.cash / i) * random.random() + j)
-        
         self.notify(f"Comprador's Report\n\nLi Yuen asks ${self.game_state.format_money(amount)} in donation\nto the temple of Tin Hau, the Sea\nGoddess.  Will you pay? (Y/N)", severity="warning")
         
         # Store the amount for the key handler
         self._li_yuen_amount = amount 
-
+    
+    def _ask_offer(self, offer: Offer) -> None:
+        """Ask whether the player buys the ship or gun offered."""
+        price = self.game_state.format_money(offer.price)
+        if offer.kind == GUN_OFFER:
+            question = f"Do you wish to buy a ship's gun\nfor ${price}, Taipan? (Y/N)"
+        else:
+            condition = "damaged" if self.game_state.damage else "fine"
+            question = f"Do you wish to trade in your {condition}\nship for one with 50 more capacity by\npaying an additional ${price}, Taipan? (Y/N)"
+        self.notify(f"Comprador's Report\n\n{question}", severity="warning")
+    
+    def _answer_offer(self, accept: bool) -> None:
+        """Buy or turn down the ship or gun offered."""
+        offer = self._offer
+        del self._offer
+        try:
+            answer_offer(self.game_state, offer, accept)
+        except GameRuleError as error:
+            self.notify(str(error), severity="error")
+    
     def on_key(self, event: events.Key) -> None:
         """Handle key press events."""
         if event.key == "escape":
             self.app.exit()
-        elif hasattr(self, '_li_yuen_amount'):
+        elif hasattr(self, '_offer') and not hasattr(self, '_li_yuen_amount'):
+            if event.key.lower() in ('y', 'n'):
+                self._answer_offer(accept=event.key.lower() == 'y')
+        elif not hasattr(self, '_li_yuen_amount'):
+            if action := PORT_ACTIONS.get(event.key.lower()):
+                self.app.handle_action(action)  # type: ignore[attr-defined]
+        else:
             # Handle Li Yuen extortion choice
             if event.key.lower() == 'y':
-                if self._li_yuen_amount <= self.game_state.cash:
-                    self.game_state.cash -= self._li_yuen_amount
-                    self.game_state.li_yuen_relation = 1
+                if answer_li_yuen(self.game_state, self._li_yuen_amount, pay=True):
                     self.notify("Thank you, Taipan.", severity="information")
                 else:
-                    # TODO: Implement Elder Brother Wu loan option
-                    self.game_state.cash = 0
                     self.notify("You don't have enough cash!", severity="error")
             elif event.key.lower() == 'n':
+                answer_li_yuen(self.game_state, self._li_yuen_amount, pay=False)
                 self.notify("Very well, Taipan.", severity="information")
             else:
                 return  # Ignore other keys
             
             # Clear the stored amount
-            del self._li_yuen_amount 
\ No newline at end of file
+            del self._li_yuen_amount
+            if hasattr(self, '_offer'):
+                self._ask_offer(self._offer)
+
+
+def show_port(app: App, game_state: GameState, arrived: bool = False) -> PortScreen:
+    """
+    Return to the port screen, creating it the first time.
+    
+    The port screen lives for the whole game. Screens opened from it are
+    popped off rather than covered by a new port screen, so the stack never
+    grows past the port and the screen it opened.
+    
+    Args:
+        app: The running app
+        game_state: The game, used when the port screen is created
+        arrived: Whether the ship has just arrived, which runs the arrival events
+    
+    Returns:
+        The port screen
+    """
+    if not app.is_screen_installed(PORT_SCREEN):
+        app.install_screen(PortScreen(game_state), PORT_SCREEN)
+    port = cast(PortScreen, app.get_screen(PORT_SCREEN))
+    if port in app.screen_stack:
+        while app.screen is not port:
+            app.pop_screen()
+    elif len(app.screen_stack) > 1:
+        app.switch_screen(port)
+    else:
+        app.push_screen(port)  # Resuming a saved game, over the app's default screen
+    if arrived:
+        port.arrive()
+    return port
@@ -8,10 +8,9 @@ from textual.screen import Screen
 from textual.widgets import Static
 from textual.containers import Container
 from textual import events
-import random
 
 from ..game_state import GameState, BATTLE_NOT_FINISHED, BATTLE_WON, BATTLE_INTERRUPTED, BATTLE_FLED, BATTLE_LOST
-from .battle_screen import BattleScreen, LI_YUEN
+from ..engine import GameRuleError, travel
 from .complete_travel_screen import CompleteTravelScreen
 
 # Port locations
@@ -83,15 +82,15 @@ class QuitScreen(Screen):
     
     def _handle_travel(self, port: int) -> None:
         """Handle travel to a new port."""
-        self.game_state.destination_port = port
-        # Check for battle
-        if self.game_state.battle_probability > 0 and random.randint(0, self.game_state.battle_probability - 1) == 0:
-            # Calculate number of ships
-            num_ships = random.randint(1, (self.game_state.capacity // 10) + self.game_state.guns)
-            if num_ships > 9999:
-                num_ships = 9999
-                        
-            # Start battle
+        try:
+            num_ships = travel(self.game_state, port)
+        except GameRuleError as error:
+            self.notify(str(error), severity="error")
+            return
+        
+        if num_ships > 0:
+            # Start battle; the battle screen is only loaded once pirates are met
+            from .battle_screen import BattleScreen
             battle_screen = BattleScreen(self.game_state, num_ships=num_ships)
             self.app.switch_screen(battle_screen)
         else:
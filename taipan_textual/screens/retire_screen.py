@@ -8,6 +8,7 @@ from textual.widgets import Static
 from textual.containers import Container
 from rich.panel import Panel
 from rich.text import Text
+from textual import events
 
 from ..game_state import GameState
 
@@ -35,4 +36,9 @@ class RetireScreen(Screen):
             text,
             title="Retirement",
             border_style="yellow"
-        ) 
\ No newline at end of file
+        )
+    
+    def on_key(self, event: events.Key) -> None:
+        """Go back to port on Q or Escape."""
+        if event.key in ("q", "escape"):
+            self.app.pop_screen()
@@ -10,7 +10,7 @@ from textual.containers import Container
 from textual import events
 from ..game_state import GameState
 from ..utils import get_one
-from ..screens.port_screen import PortScreen
+from ..engine import start_game
 
 class SetupScreen(Screen):
     """Screen for initial game setup."""
@@ -46,29 +46,12 @@ class SetupScreen(Screen):
                 return
             
             if choice in ['1', '2']:
-                if choice == '1':
-                    # Start with cash and debt
-                    self.game_state.cash = 400
-                    self.game_state.debt = 5000
-                    self.game_state.capacity = 60  # Set capacity to 60
-                    self.game_state.hold = 0  # Start with empty hold
-                    self.game_state.guns = 0
-                    self.game_state.li_yuen_relation = 0
-                    self.game_state.battle_probability = 10
-                else:
-                    # Start with guns and no cash
-                    self.game_state.cash = 0
-                    self.game_state.debt = 0
-                    self.game_state.capacity = 10  # Set capacity to 10
-                    self.game_state.hold = 0  # Start with empty hold
-                    self.game_state.guns = 5
-                    self.game_state.li_yuen_relation = 1
-                    #self.game_state.battle_probability = 7
-                    self.game_state.battle_probability = 1
+                start_game(self.game_state, with_guns=(choice == '2'))
                 
-                # Pop the setup screen and push the port screen
-                self.app.pop_screen()
-                self.app.push_screen(PortScreen(self.game_state))
+                # Replace the setup screen with the port screen, which is
+                # loaded here so it is not part of the game's start-up
+                from .port_screen import show_port
+                show_port(self.app, self.game_state, arrived=True)
     
     def on_input_submitted(self, event: Input.Submitted) -> None:
         """Handle input submission."""
@@ -0,0 +1,124 @@
+"""
+Timings overlay for Taipan.
+"""
+
+from textual.app import ComposeResult
+from textual.screen import ModalScreen
+from textual.widgets import Static
+from rich.console import Group
+from rich.panel import Panel
+from rich.table import Table
+from textual import events
+
+from ..monitor import LoopMonitor, monitor
+from ..profiling import Profiler, profiler
+
+# Spans shown, the most time spent first
+TIMINGS_SHOWN = 20
+
+# Stalls shown, the latest first
+STALLS_SHOWN = 5
+
+# Seconds between updates of the table
+TIMINGS_INTERVAL = 0.5
+
+
+class TimingsScreen(ModalScreen):
+    """Overlay showing where the game has spent its time and how the event loop is keeping up."""
+
+    CSS = """
+    TimingsScreen {
+        align: right top;
+    }
+
+    #timings {
+        width: auto;
+        max-width: 90%;
+        height: auto;
+        background: $panel;
+    }
+    """
+
+    def __init__(self, source: Profiler = profiler, loop_monitor: LoopMonitor = monitor):
+        super().__init__()
+        self.source = source
+        self.loop_monitor = loop_monitor
+
+    def compose(self) -> ComposeResult:
+        """Create child widgets for the timings screen."""
+        yield Static(self._create_timings_panel(), id="timings")
+
+    def on_mount(self) -> None:
+        """Keep the table up to date while it is shown."""
+        self.set_interval(TIMINGS_INTERVAL, self._update)
+
+    def _update(self) -> None:
+        self.query_one("#timings", Static).update(self._create_timings_panel())
+
+    def _create_timings_panel(self) -> Panel:
+        """Create the panel with the tables of timings."""
+        parts = []
+        if self.source.enabled or self.source.stats:
+            parts.append(self._create_spans_table())
+        if self.loop_monitor.enabled:
+            parts.append(self._create_loop_table())
+            parts.append(self._create_stalls_table())
+
+        return Panel(
+            Group(*parts),
+            title="Timings (F3 to close)",
+            border_style="yellow"
+        )
+
+    def _create_spans_table(self) -> Table:
+        """Create the table of the spans that took the most time."""
+        table = Table(box=None, padding=(0, 1))
+        table.add_column("Span")
+        for column in ("Calls", "Mean ms", "Max ms", "Total ms"):
+            table.add_column(column, justify="right")
+        for name, stats in self.source.report(TIMINGS_SHOWN):
+            table.add_row(
+                name,
+                str(stats.count),
+                f"{stats.mean * 1000:.2f}",
+                f"{stats.longest * 1000:.2f}",
+                f"{stats.total * 1000:.1f}",
+            )
+        if not self.source.stats:
+            table.add_row("Nothing timed yet", "", "", "", "")
+        return table
+
+    def _create_loop_table(self) -> Table:
+        """Create the table of event loop lag and frame times."""
+        table = Table(box=None, padding=(0, 1))
+        table.add_column("Event loop")
+        for column in ("Count", "p50 ms", "p99 ms", "p99.9 ms", "Max ms"):
+            table.add_column(column, justify="right")
+        for name, histogram in (("Loop lag", self.loop_monitor.lag), ("Frame time", self.loop_monitor.frames)):
+            table.add_row(
+                name,
+                str(histogram.count),
+                f"{histogram.percentile(50):.2f}",
+                f"{histogram.percentile(99):.2f}",
+                f"{histogram.percentile(99.9):.2f}",
+                f"{histogram.max / 1000:.2f}",
+            )
+        return table
+
+    def _create_stalls_table(self) -> Table:
+        """Create the table of the latest stalls."""
+        table = Table(box=None, padding=(0, 1))
+        table.add_column(f"Stalls over {self.loop_monitor.stall_ms:g} ms")
+        table.add_column("ms", justify="right")
+        stalls = list(self.loop_monitor.stalls)[-STALLS_SHOWN:]
+        for stall in reversed(stalls):
+            table.add_row(stall.where, f"{stall.ms:.0f}")
+        if not stalls:
+            table.add_row("None", "")
+        return table
+
+    def on_key(self, event: events.Key) -> None:
+        """Close on F3 or Escape; a modal screen does not see the app's bindings."""
+        if event.key in ("f3", "escape"):
+            event.stop()
+            self.app.pop_screen()
@@ -9,11 +9,32 @@ from textual.containers import Container
 from textual import events
 from rich.panel import Panel
 from rich.text import Text
+from rich.console import RenderableType
 from typing import Literal, Optional, Union, cast
 
 from ..game_state import GameState, ITEMS
-from ..utils import get_one
-from .port_screen import PortScreen
+from ..utils import ALL, get_one
+from ..engine import WAREHOUSE_CAPACITY, GameRuleError, transfer
+from .port_screen import show_port
+from .panels import MarkupTemplate, panel_cache
+from .number_input import NumberInput
+
+TRANSFER_TEMPLATE = MarkupTemplate("""
+[bold]Comprador's Report[/bold]
+
+Current Port: {port}
+Hold Space: {hold}/{capacity}
+Warehouse Space: {warehouse}/{warehouse_capacity}
+
+[bold]Current Cargo:[/bold]
+""")
+
+CARGO_TEMPLATE = MarkupTemplate("{item}: {hold} in hold, {warehouse} in warehouse\n")
+
+PROMPT_TEMPLATES = {
+    "to_warehouse": MarkupTemplate("How much {cargo} shall I move to the warehouse, Taipan? "),
+    "to_ship": MarkupTemplate("How much {cargo} shall I move aboard ship, Taipan? "),
+}
 
 class TransferScreen(Screen):
     """Screen for transferring cargo between ship and warehouse."""
@@ -21,7 +42,6 @@ class TransferScreen(Screen):
     def __init__(self, game_state: GameState):
         super().__init__()
         self.game_state = game_state
-        self.amount_input = ""
         self.current_cargo: int = 0
         self.direction: Optional[Literal["to_warehouse", "to_ship"]] = None
     
@@ -29,28 +49,27 @@ class TransferScreen(Screen):
         yield Header()
         yield Footer()
         yield Static(self.render_content())
+        yield NumberInput()
     
-    def render_content(self) -> str:
+    def render_content(self) -> RenderableType:
         """Render the transfer screen content."""
-        content = f"""
-[bold]Comprador's Report[/bold]
-
-Current Port: {self.game_state.get_current_location()}
-Hold Space: {self.game_state.hold}/{self.game_state.capacity}
-Warehouse Space: {sum(self.game_state.warehouse)}/10000
-
-[bold]Current Cargo:[/bold]
-"""
+        gs = self.game_state
+        key = ("transfer", gs.port, gs.hold, gs.capacity, tuple(gs.hold_), tuple(gs.warehouse))
+        return panel_cache.get(key, self._create_cargo_text)
+    
+    def _create_cargo_text(self) -> Text:
+        """Create the cargo in the hold and the warehouse."""
+        gs = self.game_state
+        text = TRANSFER_TEMPLATE.render(
+            port=gs.get_current_location(),
+            hold=gs.hold,
+            capacity=gs.capacity,
+            warehouse=gs.total_warehouse,
+            warehouse_capacity=WAREHOUSE_CAPACITY,
+        )
         for i, item in enumerate(ITEMS):
-            content += f"{item}: {self.game_state.hold_[i]} in hold, {self.game_state.warehouse[i]} in warehouse\n"
-        
-        if self.direction is not None:
-            cargo_name = ITEMS[self.current_cargo]
-            if self.direction == "to_warehouse":
-                content += f"\nHow much {cargo_name} shall I move to the warehouse, Taipan? {self.amount_input}"
-            else:
-                content += f"\nHow much {cargo_name} shall I move aboard ship, Taipan? {self.amount_input}"        
-        return content
+            text.append_text(CARGO_TEMPLATE.render(item=item, hold=gs.hold_[i], warehouse=gs.warehouse[i]))
+        return text
     
     def on_mount(self) -> None:
         """Set up the screen when it is mounted."""
@@ -68,102 +87,60 @@ Warehouse Space: {sum(self.game_state.warehouse)}/10000
         """Check the next cargo type for transfer."""
         if self.current_cargo >= len(ITEMS):
             # All cargo types processed, return to port
-            self.app.pop_screen()
-            self.app.push_screen(PortScreen(self.game_state))
+            show_port(self.app, self.game_state)
             return
         
         # Check hold for this cargo type
         if self.game_state.hold_[self.current_cargo] > 0:
-            self.direction = "to_warehouse"
-            self.query_one(Static).update(self.render_content())
+            self._ask("to_warehouse")
             return
         
         # Check warehouse for this cargo type
         if self.game_state.warehouse[self.current_cargo] > 0:
-            self.direction = "to_ship"
-            self.query_one(Static).update(self.render_content())
+            self._ask("to_ship")
             return
         
         # Move to next cargo type
         self.current_cargo += 1
         self._check_next_cargo()
     
-    def on_key(self, event: events.Key) -> None:
-        """Handle key presses."""
-        if event.key.isdigit():
-            self.amount_input += event.key
-            self.query_one(Static).update(self.render_content())
+    def _ask(self, direction: Literal["to_warehouse", "to_ship"]) -> None:
+        """Show the cargo and ask how much of the current item to move."""
+        self.direction = direction
+        self.query_one(Static).update(self.render_content())
+        prompt = PROMPT_TEMPLATES[direction].render(cargo=ITEMS[self.current_cargo])
+        self.query_one(NumberInput).start(prompt)
+    
+    def on_number_input_submitted(self, message: NumberInput.Submitted) -> None:
+        """Move the amount entered; zero moves nothing."""
+        direction = self.direction
+        if direction is None:
+            return  # Nothing was asked
+        item = self.current_cargo
+        if direction == "to_warehouse":
+            available = self.game_state.hold_[item]
+        else:
+            available = self.game_state.warehouse[item]
+        amount = available if message.amount == ALL else message.amount
+        
+        try:
+            if amount > 0:
+                transfer(self.game_state, item, amount, direction)
+        except GameRuleError as error:
+            self.notify(str(error), severity="error")
+            self._ask(direction)
             return
         
-        if event.key == "enter":
-            try:
-                if self.direction is None:
-                    return
-                    
-                if self.direction == "to_warehouse":
-                    # Moving to warehouse
-                    if not self.amount_input:
-                        amount = self.game_state.hold_[self.current_cargo]
-                    else:
-                        amount = int(self.amount_input)
-                    
-                    if amount < 0:
-                        self.notify("Amount must be positive", severity="error")
-                        return
-                    
-                    if amount > self.game_state.hold_[self.current_cargo]:
-                        self.notify(f"You have only {self.game_state.hold_[self.current_cargo]}, Taipan.", severity="error")
-                        return
-                    
-                    in_use = sum(self.game_state.warehouse)
-                    if in_use + amount > 10000:
-                        if in_use == 10000:
-                            self.notify("Your warehouse is full, Taipan!", severity="error")
-                        else:
-                            self.notify(f"Your warehouse will only hold an additional {10000 - in_use}, Taipan!", severity="error")
-                        return
-                    
-                    self.game_state.hold_[self.current_cargo] -= amount
-                    self.game_state.warehouse[self.current_cargo] += amount
-                    self.game_state.hold -= amount  # Decrease hold space when moving to warehouse
-                    
-                    # After moving to warehouse, check if we can move from warehouse
-                    if self.game_state.warehouse[self.current_cargo] > 0:
-                        self.direction = "to_ship"
-                        self.amount_input = ""
-                        self.query_one(Static).update(self.render_content())
-                        return
-                    
-                else:
-                    # Moving to ship
-                    if not self.amount_input:
-                        amount = self.game_state.warehouse[self.current_cargo]
-                    else:
-                        amount = int(self.amount_input)
-                    
-                    if amount < 0:
-                        self.notify("Amount must be positive", severity="error")
-                        return
-                    
-                    if amount > self.game_state.warehouse[self.current_cargo]:
-                        self.notify(f"You have only {self.game_state.warehouse[self.current_cargo]}, Taipan.", severity="error")
-                        return
-                    
-                    if self.game_state.hold + amount > self.game_state.capacity:
-                        self.notify("Not enough hold space", severity="error")
-                        return
-                    
-                    self.game_state.warehouse[self.current_cargo] -= amount
-                    self.game_state.hold_[self.current_cargo] += amount
-                    self.game_state.hold += amount  # Increase hold space when moving to ship
-                
-                # Move to next cargo type
-                self.amount_input = ""
-                self.current_cargo += 1
-                self.direction = None
-                self._check_next_cargo()
-                    
-            except ValueError:
-                self.notify("Invalid amount", severity="error")
-            finally:
-                self.amount_input = ""
+        # After moving to warehouse, check if we can move from warehouse
+        if direction == "to_warehouse" and self.game_state.warehouse[item] > 0:
+            self._ask("to_ship")
+            return
+        
+        # Move to next cargo type
+        self.current_cargo += 1
+        self.direction = None
+        self._check_next_cargo()
+    
+    def on_number_input_cancelled(self, message: NumberInput.Cancelled) -> None:
+        """Stop transferring and go back to port."""
+        show_port(self.app, self.game_state)
@@ -0,0 +1,43 @@
+"""
+Runtime settings for Taipan.
+"""
+
+import logging
+import os
+
+# Battle animation speeds: multiplier applied to every battle pause and
+# animation frame. "instant" resolves a round in one step and only shows
+# its summary.
+ANIMATION_SPEEDS = {
+    "normal": 1.0,
+    "fast": 0.25,
+    "instant": 0.0,
+}
+DEFAULT_ANIMATION_SPEED = "normal"
+
+
+def next_animation_speed(speed: str) -> str:
+    """Get the speed that follows ``speed`` when cycling through them."""
+    speeds = list(ANIMATION_SPEEDS)
+    return speeds[(speeds.index(speed) + 1) % len(speeds)]
+
+# Debugging, from the environment (see .env.example). DEBUG turns on the
+# handler timings and debug logging; LOG_LEVEL overrides the log level.
+DEBUG = os.environ.get("DEBUG", "").strip().lower() in ("1", "true", "yes", "on")
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "").strip().upper() or ("DEBUG" if DEBUG else "WARNING")
+
+
+def configure_logging(level: str = LOG_LEVEL) -> None:
+    """
+    Send the game's log to the Textual console (``textual console``).
+
+    Raises:
+        ValueError: If the level is not a logging level name
+    """
+    from textual.logging import TextualHandler
+
+    if not isinstance(logging.getLevelName(level), int):
+        raise ValueError(f"Unknown LOG_LEVEL {level!r}")
+    logger = logging.getLogger("taipan_textual")
+    logger.setLevel(level)
+    logger.addHandler(TextualHandler())
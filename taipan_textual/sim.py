@@ -0,0 +1,128 @@
+"""
+Monte Carlo runner for Taipan.
+
+Plays many headless games across worker processes and reports throughput
+and the distribution of final net worth:
+
+    python -m taipan_textual.sim --seeds 0:100000 --workers 8 --strategy greedy
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Iterable, Iterator, List, Optional
+import argparse
+import csv
+import os
+import statistics
+import sys
+import time
+
+from .game_state import GameState
+from .rng import GameRandom
+from .engine import STRATEGIES, GameResult, play_game, start_game
+
+
+def run_game(seed: int, strategy: str, voyages: int, with_guns: bool) -> GameResult:
+    """
+    Play one seeded game from the start.
+
+    The game and the computer player draw from their own streams of the
+    seed, so every strategy faces the same prices and events for a seed.
+    """
+    game_state = GameState(rng=GameRandom(seed))
+    start_game(game_state, with_guns)
+    player = STRATEGIES[strategy](game_state.rng.stream("strategy"))
+    return play_game(game_state, player, voyages, seed=seed)
+
+
+def run_games(seeds: range, strategy: str, voyages: int, with_guns: bool, workers: int) -> Iterator[GameResult]:
+    """
+    Play a game for every seed, yielding results as they finish.
+
+    Seeds are handed to the workers in large contiguous chunks so that
+    inter-process traffic stays small compared to the games themselves.
+    """
+    play = partial(run_game, strategy=strategy, voyages=voyages, with_guns=with_guns)
+    if workers <= 1:
+        yield from map(play, seeds)
+        return
+
+    chunksize = max(1, len(seeds) // (workers * 16))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(play, seeds, chunksize=chunksize)
+
+
+def parse_seeds(text: str) -> range:
+    """Parse ``START:STOP`` or a game count ``N`` (seeds 0 to N-1)."""
+    try:
+        if ":" in text:
+            start, stop = text.split(":", 1)
+            return range(int(start), int(stop))
+        return range(int(text))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid seed range: {text!r}")
+
+
+def summarize(results: List[GameResult], elapsed: float) -> str:
+    """Format throughput and net worth statistics."""
+    worths = sorted(result.net_worth for result in results)
+    lines = [
+        f"Games:       {len(results):,} in {elapsed:.2f}s ({len(results) / elapsed:,.0f} games/sec)",
+        f"Sunk:        {sum(result.sunk for result in results) / len(results):.1%}",
+        f"Battles:     {statistics.fmean(result.battles for result in results):.2f} per game",
+        f"Months:      {statistics.fmean(result.months for result in results):.1f} on average",
+        "",
+        "Net worth:",
+        f"  mean       {statistics.fmean(worths):>16,.0f}",
+        f"  min        {worths[0]:>16,}",
+    ]
+    if len(worths) > 1:
+        percentiles = statistics.quantiles(worths, n=100, method="inclusive")
+        for p in (1, 10, 25, 50, 75, 90, 99):
+            lines.append(f"  p{p:<9} {percentiles[p - 1]:>16,.0f}")
+    lines.append(f"  max        {worths[-1]:>16,}")
+    return "\n".join(lines)
+
+
+def write_results(path: str, results: Iterable[GameResult]) -> Iterator[GameResult]:
+    """Write results to a CSV file as they stream past."""
+    with open(path, "w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["seed", "net_worth", "months", "voyages", "battles", "sunk"])
+        for result in results:
+            writer.writerow([result.seed, result.net_worth, result.months, result.voyages, result.battles, int(result.sunk)])
+            yield result
+
+
+# For --help; the module docstring is stripped under python -OO
+DESCRIPTION = "Monte Carlo runner for Taipan."
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the simulation from the command line."""
+    parser = argparse.ArgumentParser(prog="python -m taipan_textual.sim", description=DESCRIPTION)
+    parser.add_argument("--seeds", type=parse_seeds, default=range(1000), help="seed range START:STOP, or a game count (default: 1000)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes (default: CPU count)")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="greedy", help="computer player (default: greedy)")
+    parser.add_argument("--voyages", type=int, default=120, help="voyages per game (default: 120)")
+    parser.add_argument("--guns", action="store_true", help="start with five guns instead of cash and a debt")
+    parser.add_argument("--results", metavar="CSV", help="also write one row per game to this file")
+    args = parser.parse_args(argv)
+
+    if len(args.seeds) == 0:
+        parser.error("the seed range is empty")
+
+    started = time.perf_counter()
+    results: Iterable[GameResult] = run_games(args.seeds, args.strategy, args.voyages, args.guns, args.workers)
+    if args.results:
+        results = write_results(args.results, results)
+    collected = list(results)
+    elapsed = time.perf_counter() - started
+
+    print(f"Strategy {args.strategy}, {args.voyages} voyages, {args.workers} worker(s)")
+    print(summarize(collected, elapsed))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -27,39 +27,43 @@ def get_one(event: events.Key) -> Optional[str]:
     
     return None
 
-def get_num(maxlen: int) -> Generator[None, events.Key, int]:
+# get_num() result for "all": Enter on an empty line, or A, as in the C code
+ALL = -1
+
+def get_num(maxlen: int) -> Generator[str, events.Key, Optional[int]]:
     """
     Get a numeric input, handling backspace and escape.
     Similar to the C code's get_num() function.
     
+    Send key events into the generator; after each one it yields the
+    text typed so far, for display.
+    
     Args:
         maxlen: Maximum length of the number
         
     Returns:
-        The number if valid, -1 if escape or invalid
+        The number, ALL for Enter on an empty line or A, or None on escape
     """
     result = ""
     
     while True:
-        event = yield
+        event = yield result
         if event.key == "escape":
-            return -1
+            return None
         
         if event.key == "backspace":
-            if result:
-                result = result[:-1]
+            result = result[:-1]
             continue
         
         if event.key == "enter":
-            if not result:
-                return 0
-            try:
-                return int(result)
-            except ValueError:
-                return -1
+            if not result or result == "A":
+                return ALL
+            return int(result)
         
-        if event.character and len(event.character) == 1 and event.character.isdigit():
-            if len(result) < maxlen:
-                result += event.character
-    
-    return -1 
\ No newline at end of file
+        character = event.character
+        if not character or len(character) != 1 or len(result) >= maxlen or result == "A":
+            continue
+        if character.isdigit():
+            result += character
+        elif character in "aA" and not result and maxlen > 1:
+            result = "A"
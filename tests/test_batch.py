@@ -0,0 +1,101 @@
+"""Tests for batched NumPy simulation."""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from taipan_textual.game_state import BASE_PRICES, GameState
+from taipan_textual.engine import fight_or_run
+from taipan_textual.engine.batch import _BATCH_EVENTS, GameStateBatch
+from taipan_textual.engine.port import PORT_EVENTS, VISIT_DRAWS, run_port_events
+
+
+def test_round_trip_through_game_state():
+    game_state = GameState(cash=400, debt=5000, guns=2, month=12)
+    game_state.hold_[2] = 7
+    batch = GameStateBatch.from_game_state(game_state, 3, seed=1)
+
+    copy = batch.game_state(2)
+    assert (copy.cash, copy.debt, copy.guns, copy.month, copy.hold_) == (400, 5000, 2, 12, [0, 0, 7, 0])
+
+
+def test_voyage_applies_interest_and_calendar():
+    game_state = GameState(debt=5000, bank=1000, month=12)
+    batch = GameStateBatch.from_game_state(game_state, 100, seed=2)
+    report = batch.voyage(2)
+
+    arrived = ~report.sunk
+    assert np.all(batch.debt[arrived] == int(5000 * 1.1))
+    assert np.all(batch.bank[arrived] == int(1000 * 1.005))
+    assert np.all(batch.month[arrived] == 1)
+    assert np.all(batch.year[arrived] == 1861)
+    assert np.all(batch.enemy_health[arrived] == 30.0)
+
+
+def test_prices_follow_base_prices():
+    batch = GameStateBatch(500, seed=3)
+    batch.voyage(np.full(500, 4))
+    for i in range(4):
+        base = np.array(BASE_PRICES[i])[batch.port] // 2 * BASE_PRICES[i][0]
+        multiplier = batch.price[:, i] // base
+        assert np.all(batch.price[:, i] % base == 0)
+        assert np.all((multiplier >= 1) & (multiplier <= 3))
+
+
+def test_blown_off_course_changes_port():
+    batch = GameStateBatch(2000, seed=4)
+    report = batch.voyage(3)
+    assert report.blown_off_course.any()
+    assert np.all(batch.port[report.blown_off_course] != 3)
+    assert np.all(batch.port[~report.blown_off_course & ~report.sunk] == 3)
+
+
+def test_battles_are_rolled_and_resolved():
+    game_state = GameState(battle_probability=1, guns=5, capacity=100)
+    batch = GameStateBatch.from_game_state(game_state, 50, seed=5)
+    report = batch.voyage(2, strategy=fight_or_run)
+    assert np.all(report.num_ships >= 1)
+    assert np.all(report.battle_result != 0)
+
+
+def test_rejects_current_port():
+    batch = GameStateBatch(4, seed=6)
+    with pytest.raises(ValueError):
+        batch.voyage(1)
+
+
+def _varied_batch(size: int, seed: int) -> GameStateBatch:
+    batch = GameStateBatch(size, seed=seed)
+    rng = np.random.default_rng(seed + 1)
+    batch.port[:] = rng.integers(1, 8, batch.size)
+    batch.cash[:] = rng.integers(0, 60000, batch.size)
+    batch.hold_[:, 0] = rng.integers(0, 3, batch.size)
+    batch.hold[:] = batch.hold_.sum(axis=1)
+    batch.warehouse[:] = rng.integers(0, 50, (batch.size, 4))
+    batch.li_yuen_relation[:] = rng.integers(0, 4, batch.size)
+    return batch
+
+
+def test_batch_events_follow_the_port_events():
+    assert list(_BATCH_EVENTS) == [event.name for event in PORT_EVENTS]
+    batch = _varied_batch(500, seed=7)
+    games = [batch.game_state(i) for i in range(batch.size)]
+    for event in PORT_EVENTS:
+        condition, _ = _BATCH_EVENTS[event.name]
+        expected = [bool(event.condition(game_state)) for game_state in games]
+        assert condition(batch).tolist() == expected, event.name
+
+
+def test_arrival_events_match_the_scalar_rules():
+    batch = _varied_batch(2000, seed=5)
+    draws = np.random.default_rng(8).random((batch.size, VISIT_DRAWS))
+    games = [batch.game_state(i) for i in range(batch.size)]
+
+    report = batch.arrive(draws)
+    for i, game_state in enumerate(games):
+        run_port_events(game_state, draws[i].tolist())
+        copy = batch.game_state(i)
+        for name in ("cash", "hold", "hold_", "warehouse", "price", "li_yuen_relation"):
+            assert getattr(copy, name) == getattr(game_state, name), (i, name)
+    for name in ("opium_seized", "goods_stolen", "li_yuen_decay", "good_prices", "robbery"):
+        assert report.happened[name].any()
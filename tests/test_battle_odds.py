@@ -0,0 +1,87 @@
+"""Tests for the precomputed battle odds table."""
+
+import asyncio
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from textual.app import App
+
+from taipan_textual.battle_odds import (
+    BOOTY, CELLS, DAMAGE, GUNS, ORDERS, SHAPE, SHIPS, SURVIVAL, BattleOdds, build_table, simulate_cell
+)
+from taipan_textual.engine import FIGHT, GENERIC, RUN, Battle
+from taipan_textual.engine.voyage import MAX_SHIPS
+from taipan_textual.game_state import GameState
+from taipan_textual.rng import GameRandom
+from taipan_textual.screens.battle_screen import BattleScreen
+
+
+@pytest.fixture(scope="module")
+def odds(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("odds") / "battle_odds.npy")
+    build_table(path, trials=1)
+    return BattleOdds(path)
+
+
+def test_running_beats_fighting_without_guns():
+    cell = int(np.ravel_multi_index((0, SHIPS.index(8), GUNS.index(0), DAMAGE.index(0.4), 0, 1), SHAPE[:-2]))
+    stats = simulate_cell(cell, trials=100)
+    fight, run = stats[ORDERS.index(FIGHT)], stats[ORDERS.index(RUN)]
+    assert run[SURVIVAL] > fight[SURVIVAL]
+    assert fight[BOOTY] == 0
+
+
+def test_orders_are_compared_on_the_same_battles(monkeypatch):
+    import taipan_textual.battle_odds as battle_odds
+
+    seeds = []
+
+    def recording_random(seed: int) -> GameRandom:
+        seeds.append(seed)
+        return GameRandom(seed)
+
+    monkeypatch.setattr(battle_odds, "GameRandom", recording_random)
+    simulate_cell(5, trials=3, seed=1)
+    trials = len(seeds) // len(ORDERS)
+    assert trials == 3
+    assert seeds[:trials] == seeds[trials:]
+    assert len(set(seeds)) == trials
+
+
+def test_table_is_memory_mapped_and_looked_up(odds):
+    assert isinstance(odds.table, np.memmap)
+    assert odds.table.shape == SHAPE and CELLS == np.prod(SHAPE[:-2])
+    assert ((odds.table[..., SURVIVAL] >= 0) & (odds.table[..., SURVIVAL] <= 1)).all()
+
+    game_state = GameState(rng=GameRandom(1), guns=3, capacity=60, damage=20)
+    lookup = odds.lookup(Battle(game_state, 6, GENERIC))
+    assert [entry.order for entry in lookup] == list(ORDERS)
+    assert odds.recommend(Battle(game_state, 6, GENERIC)) in lookup
+
+
+def test_large_fleets_have_their_own_buckets():
+    # Every bucket spans at most a doubling, up to the largest fleet
+    assert all(high <= 2 * low for low, high in zip(SHIPS, SHIPS[1:] + (MAX_SHIPS,)))
+
+
+def test_battle_screen_shows_advice(odds):
+    class OddsApp(App):
+        def __init__(self) -> None:
+            super().__init__()
+            self.animation_speed = "instant"
+            self.battle_odds = odds
+            self.game_state = GameState(rng=GameRandom(3), guns=5, capacity=100, destination_port=2)
+
+        def on_mount(self) -> None:
+            self.push_screen(BattleScreen(self.game_state, num_ships=4))
+
+    async def check() -> str:
+        app = OddsApp()
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            assert isinstance(app.screen, BattleScreen)
+            return app.screen.battle_orders
+
+    assert "Advice: " in asyncio.run(asyncio.wait_for(check(), timeout=10))
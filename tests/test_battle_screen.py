@@ -0,0 +1,56 @@
+"""Tests for the battle screen."""
+
+import asyncio
+
+from textual.app import App
+
+from taipan_textual.game_state import GameState
+from taipan_textual.rng import GameRandom
+from taipan_textual.screens.battle_screen import BattleScreen
+
+
+class BattleApp(App):
+    """App that opens straight into a battle."""
+
+    def __init__(self, animation_speed: str) -> None:
+        super().__init__()
+        self.animation_speed = animation_speed
+        self.game_state = GameState(rng=GameRandom(3), guns=40, capacity=2000, destination_port=2)
+
+    def on_mount(self) -> None:
+        self.push_screen(BattleScreen(self.game_state, num_ships=30))
+
+
+def test_instant_battle_resolves_without_pauses():
+    async def fight() -> int:
+        app = BattleApp("instant")
+        async with app.run_test() as pilot:
+            rounds = 0
+            while isinstance(app.screen, BattleScreen) and rounds < 20:
+                if app.screen.orders == 0:
+                    await pilot.press("f")
+                    rounds += 1
+                await pilot.pause(0.05)
+            assert not isinstance(app.screen, BattleScreen)
+            return rounds
+
+    assert asyncio.run(asyncio.wait_for(fight(), timeout=10)) >= 1
+
+
+def test_ship_display_repaints_changed_positions():
+    async def check() -> None:
+        app = BattleApp("normal")
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            screen = app.screen
+            assert isinstance(screen, BattleScreen)
+            display = screen.ship_display
+            assert display.render_line(6).text.startswith(" " * 10 + "-|-_|_  ")
+            assert display.render_line(12).text.count("-|-_|_") == 5
+
+            screen.battle.fleet.hit(0, 1000)
+            display.show_changes()
+            assert display.render_line(6).text.startswith(" " * 20 + "-|-_|_")
+            assert display.remaining == 29
+
+    asyncio.run(asyncio.wait_for(check(), timeout=10))
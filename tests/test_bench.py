@@ -0,0 +1,39 @@
+"""Tests for the keypress latency benchmarks."""
+
+import json
+
+from taipan_textual.bench import compare, main, measure_startup
+
+
+def test_run_writes_results_and_compares(tmp_path, capsys):
+    results = tmp_path / "results.json"
+    assert main(["run", "--scripts", "setup", "--repeat", "1", "--output", str(results)]) == 0
+    setup = json.loads(results.read_text())["scripts"]["setup"]
+    assert setup["keys"] == 7
+    assert 0 < setup["p50_ms"] <= setup["p99_ms"]
+
+    assert main(["compare", str(results), str(results)]) == 0
+    assert "setup" in capsys.readouterr().out
+
+
+def test_compare_flags_slower_scripts():
+    baseline = {"buy": {"p50_ms": 5.0, "p99_ms": 20.0, "wall_ms": 300.0}}
+    results = {"buy": {"p50_ms": 10.0, "p99_ms": 30.0, "wall_ms": 300.5}}
+    _, slower = compare(baseline, results)
+    assert len(slower) == 1
+    assert slower[0].startswith("buy        p50")
+
+
+def test_startup_loads_no_screens():
+    result = measure_startup(1)
+    assert "taipan_textual.screens" in result.modules
+    assert not [name for name in result.modules if name.startswith("taipan_textual.screens.")]
+    assert "taipan_textual.engine" not in result.modules
+
+
+def test_every_exported_screen_can_be_loaded():
+    from taipan_textual import screens
+
+    assert sorted(screens.__all__) == sorted(screens._SCREEN_MODULES)
+    for name in screens.__all__:
+        assert getattr(screens, name).__name__ == name
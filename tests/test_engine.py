@@ -0,0 +1,290 @@
+"""Tests for the headless game engine."""
+
+import subprocess
+import sys
+
+import pytest
+
+from taipan_textual.rng import GameRandom
+from taipan_textual.game_state import MAX_MONEY, GameState, BATTLE_NOT_FINISHED, BATTLE_WON, BATTLE_INTERRUPTED, BATTLE_FLED
+from taipan_textual.engine import (
+    ARRIVED,
+    FIGHT,
+    HIT,
+    LEFT,
+    RUN,
+    SUNK,
+    Battle,
+    EnemyFleet,
+    GameRuleError,
+    Offer,
+    answer_offer,
+    arrive_in_port,
+    bank,
+    buy,
+    complete_voyage,
+    compound,
+    fast_forward,
+    plan_route,
+    resolve_battle,
+    sell,
+    transfer,
+    travel
+)
+from taipan_textual.engine.advisor import _bounds, _trades, expected_price
+from taipan_textual.engine.port import EVENT_SLOTS, VISIT_DRAWS, run_port_events
+from taipan_textual.journal import GUN_OFFER, OPIUM_SEIZED, ROBBED
+
+
+def make_state(seed: int = 0, **kwargs) -> GameState:
+    """Create a seeded game state with fixed prices."""
+    game_state = GameState(rng=GameRandom(seed), **kwargs)
+    game_state.price = [1000, 100, 10, 1]
+    return game_state
+
+
+def test_engine_does_not_import_textual():
+    code = "import sys, taipan_textual.engine; print('textual' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "False"
+
+
+def test_buy_and_sell():
+    game_state = make_state(cash=5000)
+    buy(game_state, 0, 3)
+    assert (game_state.cash, game_state.hold_[0], game_state.hold) == (2000, 3, 3)
+
+    sell(game_state, 0, 2)
+    assert (game_state.cash, game_state.hold_[0], game_state.hold) == (4000, 1, 1)
+
+
+@pytest.mark.parametrize("cash, amount, message", [
+    (5000, 0, "Amount must be positive"),
+    (500, 1, "Not enough cash"),
+    (100000, 61, "Not enough hold space"),
+])
+def test_buy_rejects(cash, amount, message):
+    game_state = make_state(cash=cash)
+    with pytest.raises(GameRuleError, match=message):
+        buy(game_state, 0, amount)
+    assert game_state.cash == cash
+
+
+def test_bank_deposits_then_withdraws():
+    game_state = make_state(cash=1000, bank=50)
+    bank(game_state, deposit_amount=400, withdraw_amount=100)
+    assert (game_state.cash, game_state.bank) == (700, 350)
+
+    with pytest.raises(GameRuleError, match="in the bank"):
+        bank(game_state, withdraw_amount=1000)
+
+
+def test_transfer_round_trip():
+    game_state = make_state()
+    game_state.hold_[1] = 10
+    game_state.hold = 10
+    transfer(game_state, 1, 10, "to_warehouse")
+    assert (game_state.hold_[1], game_state.warehouse[1], game_state.hold) == (0, 10, 0)
+
+    transfer(game_state, 1, 4, "to_ship")
+    assert (game_state.hold_[1], game_state.warehouse[1], game_state.hold) == (4, 6, 4)
+
+    with pytest.raises(GameRuleError, match="You have only 6"):
+        transfer(game_state, 1, 7, "to_ship")
+
+
+def test_travel_and_complete_voyage():
+    game_state = make_state(1, debt=1000, bank=1000, battle_probability=0)
+    assert travel(game_state, 2) == 0
+    assert game_state.destination_port == 2
+
+    report = complete_voyage(game_state)
+    assert not report.sunk
+    assert game_state.month == 2
+    assert game_state.debt == 1100
+    assert game_state.bank == int(1000 * 1.005)
+
+    with pytest.raises(GameRuleError):
+        travel(game_state, game_state.port)
+
+
+def test_fight_keeps_fleet_consistent():
+    game_state = make_state(2, guns=3)
+    battle = Battle(game_state, 25)
+    battle.fill_slots()
+    report = battle.fight()
+    assert len(report.shots) == 3
+    assert battle.num_on_screen == sum(1 for ship in battle.ships_on_screen if ship > 0)
+    assert battle.num_on_screen <= battle.num_ships
+
+
+def test_resolve_battle_finishes():
+    for seed in range(20):
+        game_state = make_state(seed, guns=5, capacity=100)
+        result = resolve_battle(game_state, 10)
+        assert result != BATTLE_NOT_FINISHED
+
+
+def test_winning_fight_pays_booty():
+    game_state = make_state(3, guns=50, capacity=1000, cash=0)
+    result = resolve_battle(game_state, 1, strategy=lambda battle: FIGHT)
+    assert result == BATTLE_WON
+    assert game_state.cash > 0
+
+
+def test_running_flees():
+    game_state = make_state(4, capacity=1000)
+    result = resolve_battle(game_state, 1, strategy=lambda battle: RUN)
+    assert result in (BATTLE_FLED, BATTLE_INTERRUPTED)
+
+
+def test_losing_a_gun_frees_its_cargo_space():
+    # Badly damaged, so the enemy always hits a gun, as in the C code
+    game_state = make_state(guns=5, capacity=10, damage=9)
+    report = Battle(game_state, 3).enemy_attack()
+    assert report.gun_hit
+    assert (game_state.guns, game_state.capacity, game_state.hold) == (4, 20, 0)
+
+
+def test_fleet_targets_only_live_ships():
+    fleet = EnemyFleet(3)
+    fleet.fill(lambda: 50)
+    assert fleet.live_slots() == [0, 1, 2]
+    assert fleet.hit(1, 60)
+    rng = GameRandom(0).combat
+    assert {fleet.pick_target(rng) for _ in range(50)} == {0, 2}
+
+
+def test_fleet_backfills_from_free_list():
+    fleet = EnemyFleet(12)
+    assert len(fleet.fill(lambda: 30)) == 10
+    assert fleet.waiting == 2
+    fleet.hit(4, 30)
+    assert fleet.fill(lambda: 25) == [(4, 25)]
+    assert fleet.waiting == 1
+
+    assert len(fleet.leave(9)) == 8
+    assert fleet.num_ships == fleet.num_on_screen == 2
+    assert sum(1 for health in fleet.health if health > 0) == 2
+
+
+def test_fleet_reports_changes_in_order():
+    fleet = EnemyFleet(3, slots=2)
+    changes = []
+    fleet.subscribe(changes.append)
+    fleet.fill(lambda: 30)
+    fleet.hit(0, 10)
+    fleet.hit(1, 40)
+    fleet.leave(2)
+    assert [(c.kind, c.slot, c.health, c.remaining) for c in changes] == [
+        (ARRIVED, 0, 30, 3),
+        (ARRIVED, 1, 30, 3),
+        (HIT, 0, 20, 3),
+        (SUNK, 1, 0, 2),
+        (LEFT, 0, 0, 0),
+    ]
+
+    fleet.unsubscribe(changes.append)
+    fleet.fill(lambda: 30)
+    assert len(changes) == 5
+
+
+def test_arrival_draws_the_same_numbers_whatever_happens():
+    quiet = make_state(seed=4, port=2, li_yuen_relation=1)
+    busy = make_state(seed=4, port=2, cash=90000, warehouse=[10, 10, 10, 10])
+    busy.hold_[0] = 5
+    busy.hold = 5
+    for game_state in (quiet, busy):
+        for _ in range(20):
+            arrive_in_port(game_state)
+    assert quiet.rng.events.random() == busy.rng.events.random()
+
+
+def test_port_events_apply_their_effects():
+    game_state = make_state(port=2, cash=36000)
+    game_state.hold_[0] = 5
+    game_state.hold = 5
+    draws = [0.99] * VISIT_DRAWS
+    draws[EVENT_SLOTS["opium_seized"]:EVENT_SLOTS["opium_seized"] + 2] = [0.0, 0.5]
+    draws[EVENT_SLOTS["robbery"]:EVENT_SLOTS["robbery"] + 2] = [0.0, 0.7]
+
+    report = run_port_events(game_state, draws)
+    assert report.events == [(OPIUM_SEIZED, 5, 10001), (ROBBED, 12999)]
+    assert (game_state.cash, game_state.hold, game_state.hold_[0]) == (13000, 0, 0)
+
+
+def test_answer_offer_buys_a_gun():
+    game_state = make_state(cash=1000, capacity=60, hold=50)
+    answer_offer(game_state, Offer(GUN_OFFER, 600), accept=True)
+    assert (game_state.cash, game_state.guns, game_state.capacity) == (400, 1, 50)
+    with pytest.raises(GameRuleError):
+        answer_offer(game_state, Offer(GUN_OFFER, 300), accept=True)
+
+
+@pytest.mark.parametrize("debt,bank,month", [(1000, 1000, 1), (9, 199, 12), (12345, 400, 7), (0, 10 ** 12, 3)])
+def test_fast_forward_matches_month_by_month(debt, bank, month):
+    stepped = make_state(debt=debt, bank=bank, month=month)
+    for _ in range(100):
+        stepped.month += 1
+        if stepped.month == 13:
+            stepped.month = 1
+            stepped.year += 1
+            stepped.enemy_health += 10
+            stepped.enemy_damage += 0.5
+        stepped.debt = int(stepped.debt * 1.1)
+        stepped.bank = int(stepped.bank * 1.005)
+
+    jumped = make_state(debt=debt, bank=bank, month=month)
+    assert fast_forward(jumped, 100) == 8 + (month > 8)
+    fields = ("debt", "bank", "month", "year", "enemy_health", "enemy_damage")
+    assert [getattr(jumped, name) for name in fields] == [getattr(stepped, name) for name in fields]
+
+
+def test_compound_truncates_every_month():
+    amount = 1000
+    for _ in range(40):
+        amount = int(amount * 1.005)
+    assert compound(1000, 1.005, 40) == amount != int(1000 * 1.005 ** 40)
+
+
+def test_fast_forward_saturates_over_a_long_horizon():
+    game_state = make_state(debt=1000, bank=1000, month=1)
+    assert fast_forward(game_state, 12 * 1000 + 5) == 1000
+    assert (game_state.debt, game_state.bank) == (MAX_MONEY, MAX_MONEY)
+    assert (game_state.month, game_state.year) == (6, 2860)
+    assert compound(5000, 1.1, 10 ** 9) == MAX_MONEY
+
+
+@pytest.mark.parametrize("cash", [150, 3000, 2000000])
+def test_plan_route_finds_the_best_route(cash):
+    game_state = make_state(cash=cash, capacity=40, port=2)
+    plan = plan_route(game_state, voyages=3)
+    assert len(plan.legs) == 3 and plan.legs[0].port == 2
+
+    def best(port, prices, cash, voyages):
+        # Every route and every single-item purchase, without memoization
+        if voyages == 0:
+            return cash
+        results = []
+        for destination in range(1, 8):
+            if destination == port:
+                continue
+            sell = [expected_price(item, destination) for item in range(4)]
+            for item in range(4):
+                amount = min(40, cash // prices[item]) if sell[item] > prices[item] else 0
+                after = cash + amount * (sell[item] - prices[item])
+                results.append(best(destination, sell, after, voyages - 1))
+        return max(results)
+
+    assert plan.cash == best(2, game_state.price, cash, 3)
+
+
+def test_plan_route_reuses_its_tables_after_a_price_or_cash_change():
+    game_state = make_state(cash=20000, port=3)
+    plan_route(game_state)
+    game_state.price[2] += 1
+    game_state.cash += 7
+    bounds, trades = _bounds.cache_info(), _trades.cache_info()
+    plan_route(game_state)
+    assert _bounds.cache_info().misses == bounds.misses and _bounds.cache_info().hits > bounds.hits
+    assert _trades.cache_info().misses == trades.misses and _trades.cache_info().hits > trades.hits
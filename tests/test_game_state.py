@@ -0,0 +1,46 @@
+"""Tests for the game state."""
+
+import copy
+import pickle
+
+import pytest
+
+from taipan_textual.game_state import ObservableGameState
+from taipan_textual.rng import GameRandom
+
+
+def test_observable_state_reports_field_changes():
+    game_state = ObservableGameState(rng=GameRandom(0))
+    changes = []
+    game_state.subscribe(changes.append, "cash", "hold_")
+    version = game_state.version
+
+    game_state.cash += 100
+    game_state.hold_[2] += 5
+    game_state.guns = 3
+    game_state.cash = game_state.cash  # No change, no event
+
+    assert changes == ["cash", "hold_"]
+    assert game_state.version == version + 3
+
+    game_state.unsubscribe(changes.append)
+    game_state.cash = 0
+    assert changes == ["cash", "hold_"]
+
+
+def test_observable_state_rejects_unknown_fields():
+    with pytest.raises(ValueError):
+        ObservableGameState(rng=GameRandom(0)).subscribe(print, "gold")
+
+
+def test_observable_state_copies_do_not_share_listeners():
+    game_state = ObservableGameState(rng=GameRandom(0))
+    changes = []
+    game_state.subscribe(changes.append)
+
+    for duplicate in (copy.deepcopy(game_state), pickle.loads(pickle.dumps(game_state))):
+        assert duplicate == game_state
+        duplicate.hold_[0] = 7
+        assert duplicate.version == game_state.version + 1
+    assert changes == []
+    assert game_state.hold_[0] == 0
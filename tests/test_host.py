@@ -0,0 +1,75 @@
+"""Tests for hosting many games in one process."""
+
+import asyncio
+
+from taipan_textual.host import DATA, Host, SharedParseCache, pack_frame, pack_size
+
+
+async def _wait_for(predicate, timeout: float = 5.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.02)
+
+
+def test_host_plays_separate_games(tmp_path):
+    path = str(tmp_path / "taipan.sock")
+
+    async def play() -> None:
+        host = Host(path, animation_speed="instant")
+        await host.start()
+        try:
+            clients = []
+            for _ in range(2):
+                reader, writer = await asyncio.open_unix_connection(path)
+                writer.write(pack_size(100, 40))
+                clients.append((reader, writer))
+            await _wait_for(lambda: len(host.sessions) == 2 and all(app.screen_stack[1:] for app in host.sessions))
+
+            # Set up the first game only
+            _, writer = clients[0]
+            for key in "Acme\r1":
+                writer.write(pack_frame(DATA, key.encode()))
+                await asyncio.sleep(0.05)
+            await _wait_for(lambda: any(app.game_state.cash for app in host.sessions))
+            assert sorted(app.game_state.firm_name for app in host.sessions) == ["Acme", "Your Firm"]
+
+            # A player leaving ends their session and closes the connection
+            writer.close()
+            await _wait_for(lambda: len(host.sessions) == 1)
+            reader, writer = clients[1]
+            writer.close()
+            await _wait_for(lambda: not host.sessions)
+            assert host.served == 2
+        finally:
+            await host.close()
+
+    asyncio.run(asyncio.wait_for(play(), timeout=30))
+
+
+def test_host_turns_away_connections_when_full(tmp_path):
+    path = str(tmp_path / "taipan.sock")
+
+    async def connect() -> bytes:
+        host = Host(path, max_sessions=0)
+        await host.start()
+        try:
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(pack_size(80, 24))
+            reply = await reader.read()
+            writer.close()
+            return reply
+        finally:
+            await host.close()
+
+    assert b"full" in asyncio.run(asyncio.wait_for(connect(), timeout=10))
+
+
+def test_parse_cache_lets_old_variables_go():
+    cache = SharedParseCache(max_variables=4)
+    themes = [{"primary": f"#00000{n}"} for n in range(10)]
+    keys = [cache._variables_key(variables) for variables in themes]
+
+    assert len(cache._variable_keys) == 4
+    assert cache._variables_key(themes[-1]) is keys[-1]
+    assert cache._variables_key(dict(themes[0])) == keys[0]
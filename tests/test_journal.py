@@ -0,0 +1,78 @@
+"""Tests for the game journal."""
+
+import pytest
+
+import taipan_textual.__main__ as entry
+from taipan_textual.engine import play_game, start_game
+from taipan_textual.engine.autoplay import GreedyTrader
+from taipan_textual.game_state import ObservableGameState
+from taipan_textual.journal import ARRIVE, BUY, STATE, START, TRAVEL, Journal, read_journal, record_state
+from taipan_textual.rng import GameRandom
+
+
+def play(path, seed: int = 5) -> ObservableGameState:
+    game_state = ObservableGameState(rng=GameRandom(seed))
+    with Journal(str(path)) as journal:
+        game_state.journal = journal
+        start_game(game_state, with_guns=False)
+        play_game(game_state, GreedyTrader(), 10, seed)
+    return game_state
+
+
+def test_journal_records_a_game(tmp_path):
+    path = tmp_path / "game.journal"
+    game_state = play(path)
+    entries = list(read_journal(str(path)))
+
+    assert entries[0].kind == START
+    assert {entry.seed for entry in entries} == {5}
+    assert {BUY, TRAVEL, ARRIVE} <= {entry.kind for entry in entries}
+    versions = [entry.version for entry in entries]
+    assert versions == sorted(versions)
+    assert versions[-1] <= game_state.version
+
+
+def test_journal_ignores_a_cut_off_record(tmp_path):
+    path = tmp_path / "game.journal"
+    play(path)
+    count = len(list(read_journal(str(path))))
+    data = path.read_bytes()
+    path.write_bytes(data[:-3])
+    assert len(list(read_journal(str(path)))) == count - 1
+
+
+def test_reopening_drops_a_cut_off_record(tmp_path):
+    path = tmp_path / "game.journal"
+    game_state = ObservableGameState(rng=GameRandom(7))
+    with Journal(str(path)) as journal:
+        for amount in (1, 2, 3):
+            journal.write(BUY, game_state, (0, amount))
+    path.write_bytes(path.read_bytes()[:-5])
+
+    with Journal(str(path)) as journal:
+        for amount in (4, 5, 6):
+            journal.write(BUY, game_state, (0, amount))
+    entries = list(read_journal(str(path)))
+    assert [entry.args for entry in entries] == [(0, 1), (0, 2), (0, 4), (0, 5), (0, 6)]
+    assert {(entry.kind, entry.seed) for entry in entries} == {(BUY, 7)}
+
+
+def test_journal_saturates_huge_money(tmp_path):
+    path = tmp_path / "game.journal"
+    game_state = ObservableGameState(rng=GameRandom(7), debt=10 ** 20)
+    with Journal(str(path)) as journal:
+        game_state.journal = journal
+        record_state(game_state)
+    (entry,) = read_journal(str(path))
+    assert entry.kind == STATE and (1 << 63) - 1 in entry.args
+
+
+def test_main_closes_the_journal_when_the_app_fails(tmp_path, monkeypatch):
+    def broken_app(**kwargs):
+        raise RuntimeError("no terminal")
+
+    monkeypatch.setattr(entry, "TaipanApp", broken_app)
+    path = tmp_path / "game.journal"
+    with pytest.raises(RuntimeError, match="no terminal"):
+        entry.main(["--journal", str(path)])
+    assert list(read_journal(str(path))) == []
@@ -0,0 +1,22 @@
+"""Tests for the load generator."""
+
+import asyncio
+
+from taipan_textual.load import main, run_sessions
+
+
+def test_sessions_play_and_are_measured():
+    result = asyncio.run(run_sessions(3, duration=1.0, speed="instant"))
+    assert result.sessions == 3
+    assert result.failures == 0
+    assert result.actions > 3
+    assert len(result.latencies) == result.keys >= result.actions
+    assert result.lags
+    assert result.memory_per_session >= 0
+
+
+def test_main_reports_the_summary(capsys):
+    assert main(["--sessions", "2", "--duration", "0.5", "--speed", "instant"]) == 0
+    out = capsys.readouterr().out
+    for heading in ("Throughput:", "Latency:", "Loop lag:", "Memory:"):
+        assert heading in out
@@ -0,0 +1,72 @@
+"""Tests for the event loop monitor."""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from taipan_textual.game_ui import TaipanApp
+from taipan_textual.monitor import Histogram, LoopMonitor, monitor
+from taipan_textual.screens.timings_screen import TimingsScreen
+
+
+@pytest.fixture
+def monitoring():
+    monitor.clear()
+    monitor.enable(stall_ms=30)
+    yield monitor
+    monitor.stop()
+    monitor.enabled = False
+    monitor.clear()
+
+
+def test_histogram_percentiles_keep_two_digits():
+    histogram = Histogram()
+    for ms in range(1, 1001):
+        histogram.record(ms / 1000)
+    assert histogram.count == 1000
+    assert histogram.percentile(50) == pytest.approx(500, rel=0.02)
+    assert histogram.percentile(99) == pytest.approx(990, rel=0.02)
+    assert histogram.percentile(100) == 1000
+    assert histogram.mean == pytest.approx(500.5)
+    assert sum(count for _, count in histogram.to_dict()["buckets"]) == 1000
+
+
+def test_stalls_name_the_blocking_code():
+    loop_monitor = LoopMonitor()
+    loop_monitor.enable(stall_ms=30)
+
+    def block_the_loop() -> None:
+        time.sleep(0.15)
+
+    async def run() -> None:
+        loop_monitor.start()
+        await asyncio.sleep(0.05)
+        asyncio.get_running_loop().call_soon(block_the_loop)
+        await asyncio.sleep(0.1)
+        loop_monitor.stop()
+
+    asyncio.run(run())
+    (stall,) = loop_monitor.stalls
+    assert stall.where.endswith("in block_the_loop")
+    assert stall.ms >= 100
+    assert loop_monitor.lag.max >= 100_000
+
+
+def test_app_records_frames_and_shows_them(monitoring, tmp_path):
+    async def play() -> None:
+        app = TaipanApp(seed=3)
+        async with app.run_test() as pilot:
+            await pilot.press(*"Acme", "enter", "1", "n", "f3")
+            await pilot.pause()
+            assert isinstance(app.screen, TimingsScreen)
+            await pilot.press("f3")
+
+    asyncio.run(asyncio.wait_for(play(), timeout=10))
+    path = tmp_path / "monitor.json"
+    monitoring.write_json(str(path))
+    report = json.loads(path.read_text())
+    assert report["frame_time"]["count"] > 0
+    assert report["loop_lag"]["count"] > 0
+    assert report["stall_ms"] == 30
@@ -0,0 +1,53 @@
+"""Tests for numeric entry."""
+
+import asyncio
+
+from textual import events
+
+from taipan_textual.game_ui import TaipanApp
+from taipan_textual.screens.port_screen import PortScreen
+from taipan_textual.utils import ALL, get_num
+
+
+def type_keys(maxlen, *keys):
+    entry = get_num(maxlen)
+    shown = [next(entry)]
+    try:
+        for key in keys:
+            character = key if len(key) == 1 else None
+            shown.append(entry.send(events.Key(key, character)))
+    except StopIteration as done:
+        return done.value, shown
+    raise AssertionError("entry did not finish")
+
+
+def test_get_num_edits_and_limits_length():
+    assert type_keys(3, "1", "2", "backspace", "3", "4", "5", "enter") == (134, ["", "1", "12", "1", "13", "134", "134"])
+    assert type_keys(9, "x", "7", "enter")[0] == 7
+
+
+def test_get_num_all_and_escape():
+    assert type_keys(9, "enter")[0] == ALL
+    assert type_keys(9, "a", "5", "enter")[0] == ALL
+    assert type_keys(9, "4", "escape")[0] is None
+
+
+def test_bank_takes_amounts_from_number_input():
+    async def visit_bank() -> None:
+        app = TaipanApp(seed=3)
+        async with app.run_test() as pilot:
+            await pilot.press(*"Acme", "enter", "1", "n")
+            await pilot.pause()
+            cash = app.game_state.cash
+
+            await pilot.press("v", "1", "0", "9", "backspace", "0", "enter")
+            await pilot.pause()
+            assert app.game_state.bank == 100
+            assert app.game_state.cash == cash - 100
+
+            await pilot.press("enter")  # Withdraw everything
+            await pilot.pause()
+            assert isinstance(app.screen, PortScreen)
+            assert (app.game_state.cash, app.game_state.bank) == (cash, 0)
+
+    asyncio.run(asyncio.wait_for(visit_bank(), timeout=10))
@@ -0,0 +1,29 @@
+"""Tests for the shared panel cache and markup templates."""
+
+from taipan_textual.screens.panels import MarkupTemplate, PanelCache
+
+
+def test_panel_cache_evicts_least_recently_used():
+    cache = PanelCache(maxsize=2)
+    builds = []
+
+    def build(name):
+        return lambda: builds.append(name) or name
+
+    cache.get("a", build("a"))
+    cache.get("b", build("b"))
+    cache.get("a", build("a"))
+    cache.get("c", build("c"))  # Evicts b
+    cache.get("a", build("a"))
+    cache.get("b", build("b"))
+
+    assert builds == ["a", "b", "c", "b"]
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (2, 4)
+
+
+def test_markup_template_keeps_values_plain():
+    template = MarkupTemplate("[bold]Firm:[/bold] {name}, cash ${cash}")
+    text = template.render(name="[red]Jardine[/red]", cash="1,000")
+    assert text.plain == "Firm: [red]Jardine[/red], cash $1,000"
+    assert [(span.start, span.end, str(span.style)) for span in text.spans] == [(0, 5, "bold")]
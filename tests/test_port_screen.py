@@ -0,0 +1,65 @@
+"""Tests for the port screen."""
+
+import asyncio
+
+from taipan_textual.game_ui import TaipanApp
+from taipan_textual.screens import port_screen
+from taipan_textual.screens.port_screen import PortScreen
+
+
+def test_port_screen_is_reused_after_trading():
+    async def trade() -> None:
+        app = TaipanApp(seed=3)
+        async with app.run_test() as pilot:
+            await pilot.press(*"Acme", "enter", "1")
+            await pilot.pause()
+            port = app.screen
+            assert isinstance(port, PortScreen)
+            # Li Yuen asks for a donation on arrival in Hong Kong
+            assert port.pending_question == "li_yuen"
+            await pilot.press("n")
+            assert port.pending_question is None
+            depth = len(app.screen_stack)
+
+            for _ in range(3):
+                await pilot.press("b", "g", "1", "enter")
+                await pilot.pause()
+                assert app.screen is port
+                assert len(app.screen_stack) == depth
+            assert app.game_state.hold_[3] == 3
+
+            await pilot.press("v", "escape")
+            await pilot.pause()
+            assert app.screen is port
+
+    asyncio.run(asyncio.wait_for(trade(), timeout=10))
+
+
+def test_advisor_is_solved_only_when_its_inputs_change(monkeypatch):
+    solves = []
+
+    def plan_route(game_state):
+        solves.append(game_state.cash)
+        return real_plan_route(game_state)
+
+    real_plan_route = port_screen.plan_route
+    monkeypatch.setattr(port_screen, "plan_route", plan_route)
+
+    async def play() -> None:
+        app = TaipanApp(seed=8)
+        async with app.run_test() as pilot:
+            await pilot.press(*"Hong", "enter", "1")
+            await pilot.pause()
+            await pilot.press("n")
+            await pilot.pause()
+            before = len(solves)
+            await pilot.press("v", "escape")
+            await pilot.pause()
+            app.screen.refresh()
+            assert len(solves) == before
+
+            await pilot.press("b", "g", "1", "enter")
+            await pilot.pause()
+            assert len(solves) == before + 1
+
+    asyncio.run(asyncio.wait_for(play(), timeout=10))
@@ -0,0 +1,76 @@
+"""Tests for handler and rule timings."""
+
+import asyncio
+import json
+
+import pytest
+
+from taipan_textual.engine import Battle
+from taipan_textual.game_state import GameState
+from taipan_textual.game_ui import TaipanApp
+from taipan_textual.profiling import Profiler, profiler, timed
+from taipan_textual.screens.timings_screen import TimingsScreen
+
+
+@pytest.fixture
+def profiling():
+    profiler.clear()
+    profiler.enable()
+    yield profiler
+    profiler.disable()
+    profiler.clear()
+
+
+@timed("test.add")
+def add(a: int, b: int) -> int:
+    return a + b
+
+
+@timed("test.count")
+def count(n: int):
+    yield from range(n)
+
+
+def test_timed_functions_only_record_while_enabled(profiling):
+    profiling.disable()
+    assert add(1, 2) == 3
+    assert profiling.stats == {}
+
+    profiling.enable()
+    assert add(1, 2) == 3
+    assert list(count(3)) == [0, 1, 2]
+    assert {name: stats.count for name, stats in profiling.report()} == {"test.add": 1, "test.count": 1}
+
+
+def test_battle_rules_are_timed(profiling):
+    battle = Battle(GameState(guns=5, capacity=100), 3)
+    battle.fight()
+    battle.end_round()
+    assert {"Battle.fight", "Battle.end_round"} <= set(profiling.stats)
+
+
+def test_chrome_trace(tmp_path):
+    source = Profiler()
+    source.add("PortScreen.on_key", source._origin + 0.5, 0.002)
+    path = tmp_path / "trace.json"
+    source.write_chrome_trace(str(path))
+    (event,) = json.loads(path.read_text())["traceEvents"]
+    assert (event["name"], event["cat"], event["ph"]) == ("PortScreen.on_key", "PortScreen", "X")
+    assert event["ts"] == pytest.approx(500000)
+    assert event["dur"] == pytest.approx(2000)
+
+
+def test_app_times_screens_and_shows_them(profiling):
+    async def play() -> None:
+        app = TaipanApp(seed=3)
+        async with app.run_test() as pilot:
+            await pilot.press(*"Acme", "enter", "1", "n", "f3")
+            await pilot.pause()
+            assert isinstance(app.screen, TimingsScreen)
+            await pilot.press("f3")
+            await pilot.pause()
+            assert not isinstance(app.screen, TimingsScreen)
+
+    asyncio.run(asyncio.wait_for(play(), timeout=10))
+    names = set(profiling.stats)
+    assert {"SetupScreen.compose", "PortScreen.on_key", "PortScreen._check_random_events", "GameState.set_prices"} <= names
@@ -1,27 +1,47 @@
 """Tests for the QuitScreen functionality."""
 
+import asyncio
+
+from textual.app import App
+
 from taipan_textual.game_state import GameState
+from taipan_textual.rng import GameRandom
+from taipan_textual.screens.port_screen import PortScreen
 from taipan_textual.screens.quit_screen import QuitScreen
-from textual.app import App
 
-class TestApp(App):
-    """Test app for Li Yuen extortion."""
-    
+
+class QuitApp(App):
+    """App that opens straight onto the quit screen in Hong Kong."""
+
+    def __init__(self, game_state: GameState) -> None:
+        super().__init__()
+        self.game_state = game_state
+
     def on_mount(self) -> None:
-        """Set up the test."""
-        # Create game state with different cash amounts
-        self.game_state = GameState()
-        self.game_state.port = 1  # Hong Kong
-        self.game_state.li_yuen_relation = 0  # Not paid yet
-        
-        # Test case 1: Enough cash
-        self.game_state.cash = 10000
-        self.push_screen(QuitScreen(self.game_state))
-        
-        # After first test completes, test case 2: Not enough cash
-        self.game_state.cash = 100
         self.push_screen(QuitScreen(self.game_state))
 
-if __name__ == "__main__":
-    app = TestApp()
-    app.run() 
\ No newline at end of file
+
+def run_keys(game_state: GameState, *keys: str) -> type:
+    """Press keys on the quit screen and return the type of the screen left showing."""
+
+    async def press() -> type:
+        app = QuitApp(game_state)
+        async with app.run_test() as pilot:
+            await pilot.press(*keys)
+            await pilot.pause()
+            return type(app.screen)
+
+    return asyncio.run(asyncio.wait_for(press(), timeout=10))
+
+
+def test_sailing_without_pirates_arrives_in_port():
+    game_state = GameState(rng=GameRandom(1), battle_probability=0, li_yuen_relation=1)
+    assert run_keys(game_state, "3") is PortScreen
+    assert game_state.destination_port == 3
+    assert game_state.month == 2
+
+
+def test_sailing_to_the_current_port_stays():
+    game_state = GameState(rng=GameRandom(1))
+    assert run_keys(game_state, "1") is QuitScreen
+    assert game_state.month == 1
@@ -0,0 +1,87 @@
+"""Tests for replaying recorded games."""
+
+import asyncio
+
+import pytest
+
+import taipan_textual.replay as replay
+from taipan_textual.engine import play_game, start_game
+from taipan_textual.engine.autoplay import Fighter
+from taipan_textual.game_state import ObservableGameState
+from taipan_textual.game_ui import TaipanApp
+from taipan_textual.journal import ARRIVE, EVENT, LI_YUEN_PAID, STATE, Journal, read_journal
+from taipan_textual.rng import GameRandom
+
+
+def record_games(path, seeds) -> None:
+    with Journal(str(path)) as journal:
+        for seed in seeds:
+            game_state = ObservableGameState(rng=GameRandom(seed))
+            game_state.journal = journal
+            start_game(game_state, with_guns=seed % 2 == 0)
+            play_game(game_state, Fighter(game_state.rng.stream("strategy")), 30, seed)
+
+
+def test_recorded_games_replay_exactly(tmp_path):
+    path = tmp_path / "games.journal"
+    record_games(path, range(20))
+    games = list(replay.split_games(read_journal(str(path))))
+    assert [game[0].seed for game in games] == list(range(20))
+    for game in games:
+        assert replay.replay_game(game).voyages > 0
+
+
+def test_replay_catches_a_rule_change(tmp_path, monkeypatch):
+    path = tmp_path / "games.journal"
+    record_games(path, [1])
+
+    def costly_voyage(game_state):
+        report = complete_voyage(game_state)
+        game_state.debt += 1
+        return report
+
+    complete_voyage = replay.complete_voyage
+    monkeypatch.setattr(replay, "complete_voyage", costly_voyage)
+    game = next(replay.split_games(read_journal(str(path))))
+    with pytest.raises(replay.ReplayError, match="seed 1, entry"):
+        replay.replay_game(game)
+
+
+def test_answer_after_sinking_is_a_mismatch(tmp_path, monkeypatch):
+    path = tmp_path / "games.journal"
+    record_games(path, [1])
+    game = next(replay.split_games(read_journal(str(path))))
+
+    # Pretend the first voyage sank, then answer Li Yuen after it
+    arrive = next(index for index, entry in enumerate(game) if entry.kind == ARRIVE)
+    assert game[arrive + 1].kind == STATE
+    sunk = game[arrive]._replace(args=game[arrive].args[:3] + (1,) + game[arrive].args[4:])
+    answer = game[arrive]._replace(kind=EVENT, args=(LI_YUEN_PAID, 100))
+    tampered = game[:arrive] + [sunk, game[arrive + 1], answer]
+
+    def sinking_voyage(game_state):
+        report = complete_voyage(game_state)
+        report.sunk = True
+        return report
+
+    complete_voyage = replay.complete_voyage
+    monkeypatch.setattr(replay, "complete_voyage", sinking_voyage)
+    with pytest.raises(replay.ReplayError, match="Li Yuen asked for nothing"):
+        replay.replay_game(tampered)
+
+
+def test_game_played_in_the_app_replays(tmp_path, capsys):
+    path = tmp_path / "app.journal"
+
+    async def play() -> None:
+        with Journal(str(path)) as journal:
+            app = TaipanApp(seed=3, journal=journal)
+            async with app.run_test() as pilot:
+                await pilot.press(*"Acme", "enter", "1")
+                await pilot.pause()
+                await pilot.press("y", "b", "g", "1", "enter")
+                await pilot.pause()
+
+    asyncio.run(asyncio.wait_for(play(), timeout=10))
+    assert replay.main([str(path)]) == 0
+    assert "Replayed 1 games" in capsys.readouterr().out
@@ -0,0 +1,126 @@
+"""Tests for saved games."""
+
+import asyncio
+from dataclasses import fields
+from typing import List
+
+import pytest
+
+from taipan_textual.engine import fast_forward, play_game, start_game
+from taipan_textual.engine.autoplay import GreedyTrader
+from taipan_textual.game_state import GameState, ObservableGameState
+from taipan_textual.game_ui import TaipanApp
+from taipan_textual.rng import GameRandom
+from taipan_textual.save import SAVE_FIELDS, Autosaver, dumps, load_game, loads, save_game
+from taipan_textual.screens.port_screen import PortScreen
+
+
+def played_game() -> GameState:
+    game_state = GameState(rng=GameRandom(11), firm_name="Jardine")
+    start_game(game_state, with_guns=False)
+    play_game(game_state, GreedyTrader(game_state.rng.stream("strategy")), 15)
+    return game_state
+
+
+def test_every_field_is_saved():
+    assert {name for name, _ in SAVE_FIELDS} | {"firm_name", "rng", "journal"} == {f.name for f in fields(GameState)}
+
+
+def test_loaded_game_plays_on_identically(tmp_path):
+    game_state = played_game()
+    path = str(tmp_path / "game.save")
+    save_game(game_state, path)
+    loaded = load_game(path)
+    assert loaded == game_state
+
+    for game in (game_state, loaded):
+        play_game(game, GreedyTrader(game.rng.stream("strategy")), 15)
+    assert loaded == game_state
+
+
+def test_damaged_save_is_rejected():
+    data = dumps(played_game())
+    with pytest.raises(ValueError, match="Damaged"):
+        loads(data[:100])
+    with pytest.raises(ValueError, match="Not a Taipan save"):
+        loads(b"nonsense")
+
+
+def test_huge_balances_are_saturated():
+    game_state = played_game()
+    fast_forward(game_state, 370)
+    game_state.cash = 10 ** 20
+    loaded = loads(dumps(game_state))
+    assert (loaded.cash, loaded.debt) == ((1 << 63) - 1, game_state.debt)
+    assert loaded.rng.getstate() == game_state.rng.getstate()
+
+
+def test_autosaver_keeps_the_newest_snapshot(tmp_path):
+    path = str(tmp_path / "game.save")
+    game_state = played_game()
+    autosaver = Autosaver(path)
+    for cash in range(5):
+        game_state.cash = cash
+        autosaver.save(game_state)
+    autosaver.close()
+    assert 1 <= autosaver.saves <= 5
+    assert load_game(path).cash == 4
+
+
+def test_app_autosaves_on_arrival_and_resumes(tmp_path):
+    path = str(tmp_path / "game.save")
+
+    async def play() -> None:
+        autosaver = Autosaver(path)
+        app = TaipanApp(seed=3, autosaver=autosaver)
+        async with app.run_test() as pilot:
+            await pilot.press(*"Acme", "enter", "1")
+            await pilot.pause()
+        autosaver.close()
+        assert autosaver.saves == 1
+
+        resumed = TaipanApp(game_state=load_game(path, ObservableGameState))
+        async with resumed.run_test() as pilot:
+            await pilot.pause()
+            assert isinstance(resumed.screen, PortScreen)
+            assert resumed.game_state.firm_name == "Acme"
+            assert resumed.game_state == app.game_state
+
+    asyncio.run(asyncio.wait_for(play(), timeout=10))
+
+
+def test_failed_autosave_keeps_the_game_running(tmp_path):
+    async def play() -> bool:
+        autosaver = Autosaver(str(tmp_path / "game.save"))
+        autosaver.close()
+        app = TaipanApp(seed=3, autosaver=autosaver)
+        async with app.run_test() as pilot:
+            await pilot.press(*"Acme", "enter", "1")
+            await pilot.pause()
+            return isinstance(app.screen, PortScreen)
+
+    assert asyncio.run(asyncio.wait_for(play(), timeout=10))
+
+
+def test_failed_autosave_write_is_reported(tmp_path):
+    autosaver = Autosaver(str(tmp_path / "missing" / "game.save"))
+    autosaver.save(played_game())
+    autosaver.close()
+    assert autosaver.saves == 0
+    assert isinstance(autosaver.take_error(), OSError)
+    assert autosaver.take_error() is None
+
+    async def play() -> List[str]:
+        autosaver = Autosaver(str(tmp_path / "missing" / "game.save"))
+        app = TaipanApp(seed=3, autosaver=autosaver)
+        notes: List[str] = []
+        app.notify = lambda message, **kwargs: notes.append(message)  # type: ignore[method-assign]
+        async with app.run_test() as pilot:
+            await pilot.press(*"Acme", "enter", "1")
+            await pilot.pause()
+            autosaver.close()  # Waits for the write
+            app.check_autosave()
+        return notes
+
+    notes = asyncio.run(asyncio.wait_for(play(), timeout=10))
+    assert any("could not be saved" in note for note in notes)
@@ -0,0 +1,26 @@
+"""Tests for the Monte Carlo runner."""
+
+from taipan_textual.sim import main, parse_seeds, run_game, run_games
+
+
+def test_games_are_reproducible_by_seed():
+    assert run_game(7, "greedy", 30, False) == run_game(7, "greedy", 30, False)
+
+
+def test_parse_seeds():
+    assert parse_seeds("5") == range(5)
+    assert parse_seeds("10:20") == range(10, 20)
+
+
+def test_workers_return_every_seed():
+    results = list(run_games(range(20), "runner", 10, False, workers=2))
+    assert [result.seed for result in results] == list(range(20))
+
+
+def test_main_prints_summary(capsys, tmp_path):
+    results = tmp_path / "results.csv"
+    assert main(["--seeds", "0:25", "--workers", "1", "--voyages", "5", "--results", str(results)]) == 0
+    output = capsys.readouterr().out
+    assert "games/sec" in output
+    assert "p50" in output
+    assert len(results.read_text().splitlines()) == 26